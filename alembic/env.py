@@ -8,6 +8,7 @@ from alembic import context
 from src.models.base import BaseMixin
 from src.models.video import Video
 from src.database import Base
+from src.settings import settings
 
 import os
 import sys
@@ -23,6 +24,9 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the local store the application is configured for
+config.set_main_option("sqlalchemy.url", settings.DB_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -53,6 +57,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -74,7 +79,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite cannot ALTER most columns; recreate tables instead
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
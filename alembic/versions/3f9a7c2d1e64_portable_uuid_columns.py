@@ -0,0 +1,78 @@
+"""Portable UUID columns
+
+Revision ID: 3f9a7c2d1e64
+Revises: 8d4b6f0e3a21
+Create Date: 2026-10-18 23:41:19.530872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a7c2d1e64'
+down_revision: Union[str, None] = '8d4b6f0e3a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, type before this revision)
+UUID_COLUMNS = [
+    ('heygen_templates', 'id', sa.UUID()),
+    ('scripts', 'id', sa.UUID()),
+    ('videos', 'id', sa.UUID()),
+    ('videos', 'script_id', sa.UUID()),
+    ('deployment_package_extensions', 'heygen_template_id', sa.Integer()),
+]
+
+
+def upgrade() -> None:
+    # heygen_template_id was created as an integer that could never match
+    # a template id, on every backend
+    if op.get_context().dialect.name != 'sqlite':
+        op.alter_column(
+            'deployment_package_extensions',
+            'heygen_template_id',
+            existing_type=sa.Integer(),
+            type_=sa.Uuid(),
+            existing_nullable=True,
+            postgresql_using='NULL',
+        )
+        # The other columns are already native uuid columns
+        return
+
+    # SQLite declared the other columns as UUID (numeric affinity)
+    op.execute(
+        "UPDATE deployment_package_extensions SET heygen_template_id = NULL "
+        "WHERE heygen_template_id NOT IN (SELECT id FROM heygen_templates)"
+    )
+
+    for table, column, existing_type in UUID_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=existing_type,
+                type_=sa.Uuid(),
+            )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'sqlite':
+        op.alter_column(
+            'deployment_package_extensions',
+            'heygen_template_id',
+            existing_type=sa.Uuid(),
+            type_=sa.Integer(),
+            existing_nullable=True,
+            postgresql_using='NULL',
+        )
+        return
+
+    for table, column, existing_type in reversed(UUID_COLUMNS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Uuid(),
+                type_=existing_type,
+            )
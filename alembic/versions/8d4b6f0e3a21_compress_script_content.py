@@ -0,0 +1,148 @@
+"""Compress script prompt_used and scene_dialogue
+
+Revision ID: 8d4b6f0e3a21
+Revises: 5c1e8f2a9b47
+Create Date: 2026-10-18 22:58:07.402316
+
+"""
+import zlib
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4b6f0e3a21'
+down_revision: Union[str, None] = '5c1e8f2a9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPRESSION_LEVEL = 6
+BATCH_SIZE = 500
+
+
+def _rewrite_rows(convert, type_) -> None:
+    """Apply convert to the content columns of every script, page by page"""
+    if op.get_context().as_sql:
+        # Offline (--sql) mode has no rows to rewrite
+        return
+    bind = op.get_bind()
+    # Untyped for reading: rows may hold text or bytes
+    stored = sa.table(
+        'scripts',
+        sa.column('id'),
+        sa.column('prompt_used'),
+        sa.column('scene_dialogue'),
+    )
+    scripts = sa.table(
+        'scripts',
+        sa.column('id'),
+        sa.column('prompt_used', type_),
+        sa.column('scene_dialogue', type_),
+    )
+    update = (
+        scripts.update()
+        .where(scripts.c.id == sa.bindparam('script_id'))
+        .values(
+            prompt_used=sa.bindparam('prompt'),
+            scene_dialogue=sa.bindparam('dialogue'),
+        )
+    )
+
+    # Page by id so only one batch of scripts is in memory at a time
+    last_id = None
+    while True:
+        page = (
+            sa.select(
+                stored.c.id, stored.c.prompt_used, stored.c.scene_dialogue
+            )
+            .order_by(stored.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            page = page.where(stored.c.id > last_id)
+        rows = bind.execute(page).fetchall()
+        if not rows:
+            return
+
+        bind.execute(update, [
+            {
+                'script_id': row.id,
+                'prompt': convert(row.prompt_used),
+                'dialogue': convert(row.scene_dialogue),
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def _compress(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    try:
+        zlib.decompress(value)
+        return value
+    except zlib.error:
+        return zlib.compress(value, COMPRESSION_LEVEL)
+
+
+def _decompress(value):
+    if value is None or isinstance(value, str):
+        return value
+    try:
+        return zlib.decompress(value).decode('utf-8')
+    except zlib.error:
+        return bytes(value).decode('utf-8')
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('scripts') as batch_op:
+        batch_op.alter_column(
+            'prompt_used',
+            existing_type=sa.String(),
+            type_=sa.LargeBinary(),
+            existing_nullable=False,
+            postgresql_using="convert_to(prompt_used, 'UTF8')",
+        )
+        batch_op.alter_column(
+            'scene_dialogue',
+            existing_type=sa.JSON(),
+            type_=sa.LargeBinary(),
+            existing_nullable=False,
+            postgresql_using="convert_to(scene_dialogue::text, 'UTF8')",
+        )
+
+    _rewrite_rows(_compress, sa.LargeBinary())
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        # SQLite keeps the value's own storage class, so text can be
+        # written before the column type changes
+        _rewrite_rows(_decompress, sa.Text())
+    else:
+        _rewrite_rows(
+            lambda value: None if value is None
+            else _decompress(value).encode('utf-8'),
+            sa.LargeBinary(),
+        )
+
+    with op.batch_alter_table('scripts') as batch_op:
+        batch_op.alter_column(
+            'prompt_used',
+            existing_type=sa.LargeBinary(),
+            type_=sa.String(),
+            existing_nullable=False,
+            postgresql_using="convert_from(prompt_used, 'UTF8')",
+        )
+        batch_op.alter_column(
+            'scene_dialogue',
+            existing_type=sa.LargeBinary(),
+            type_=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using="convert_from(scene_dialogue, 'UTF8')::json",
+        )
@@ -0,0 +1,163 @@
+# benchmarks/decode.py
+"""
+Compare decoding paths for the select_student_deployment() JSON columns.
+
+"dict" is the json.loads + StudentDeployment(**dict) path, "validate_json"
+validates the raw JSON text with pydantic TypeAdapters. Payloads are
+synthetic and sized like large deployment packages.
+
+Usage:
+    python -m benchmarks.decode --steps 16 64 256 --text-size 4000
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from typing import Dict, List, Optional
+
+from benchmarks.environment import configure
+from benchmarks.run import Stage, measure, print_results
+
+
+def build_columns(
+    components: int, steps: int, text_size: int, seed: int = 0
+) -> Dict[str, str]:
+    """Raw JSON column values as returned by the MySQL aggregate query"""
+    from benchmarks.itp_data import COMPONENT_TITLES, TextSource
+
+    rng = random.Random(seed)
+    text = TextSource(rng, text_size)
+    steps_per_component = max(steps // components, 1)
+
+    component_rows = []
+    for component_id in range(1, components + 1):
+        category = COMPONENT_TITLES[(component_id - 1) % len(COMPONENT_TITLES)]
+        step_rows = [
+            {
+                "step_name": f"Step {component_id}.{n}",
+                "grading": text(),
+                "grading_data": text(),
+                "score": round(rng.uniform(0, 100), 1),
+                "objectives": text(200),
+                "instructions": text(200),
+                "deployment_component_id": component_id,
+                "component_category": category,
+            }
+            for n in range(steps_per_component)
+        ]
+        component_rows.append(
+            {
+                "id": component_id,
+                "component_category": category,
+                "description": text(200),
+                "grading": text(),
+                "score": round(rng.uniform(0, 100), 1),
+                "steps": step_rows,
+            }
+        )
+
+    return {
+        "components_data": json.dumps(component_rows),
+        "deployment_package_data": json.dumps(
+            {"id": 1, "name": "Benchmark", "notes": text(200),
+             "objectives": text(400)}
+        ),
+    }
+
+
+SCALAR_FIELDS = {
+    "student": {"first_name": "A", "last_name": "B", "email": "a@b.c"},
+    "cohort": {"id": 1, "name": "Cohort 1"},
+    "id": 1,
+    "acc_score": 80.0,
+}
+
+
+def decode_dict(columns: Dict[str, str]):
+    from src.schema.itp import StudentDeployment
+
+    return StudentDeployment(
+        **SCALAR_FIELDS,
+        components=json.loads(columns["components_data"]),
+        deployment_package=json.loads(columns["deployment_package_data"]),
+    )
+
+
+def decode_validate_json(columns: Dict[str, str]):
+    from src.api.dependencies.db import components_adapter
+    from src.schema.itp import DeploymentPackage, StudentDeployment
+
+    return StudentDeployment(
+        **SCALAR_FIELDS,
+        components=components_adapter.validate_json(
+            columns["components_data"]
+        ),
+        deployment_package=DeploymentPackage.model_validate_json(
+            columns["deployment_package_data"]
+        ),
+    )
+
+
+DECODERS = {"dict": decode_dict, "validate_json": decode_validate_json}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--steps", type=int, nargs="+", default=[16, 64, 256]
+    )
+    parser.add_argument("--components", type=int, default=8)
+    parser.add_argument("--text-size", type=int, default=4000)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--allocation-iterations", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure()
+
+    stages = []
+    for steps in args.steps:
+        columns = build_columns(args.components, steps, args.text_size)
+        for name, decoder in DECODERS.items():
+            stages.append(
+                Stage(
+                    f"{name} steps={steps}",
+                    lambda decoder=decoder, columns=columns: decoder(columns),
+                )
+            )
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = {
+            "metadata": {
+                "components": args.components,
+                "text_size": args.text_size,
+            },
+            "stages": {
+                stage.name: measure(
+                    stage,
+                    args.iterations,
+                    args.warmup,
+                    args.allocation_iterations,
+                    loop,
+                )
+                for stage in stages
+            },
+        }
+    finally:
+        loop.close()
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
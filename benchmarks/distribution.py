@@ -0,0 +1,134 @@
+# benchmarks/distribution.py
+"""
+Time the cohort score-distribution endpoint's service on a large group.
+
+Seeds one (cohort, package) group of synthetic cohort_scores rows in a
+fresh local store, then times the uncached path (one query plus the NumPy
+pass), the NumPy pass alone and the cached path.
+
+Usage:
+    python -m benchmarks.distribution --deployments 10000 --iterations 20
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from datetime import datetime
+from typing import List, Optional
+
+from tabulate import tabulate
+
+from benchmarks.environment import configure
+from benchmarks.run import percentile
+
+COHORT_ID = 1
+PACKAGE_ID = 1
+
+
+def seed(db, deployments: int, rng: random.Random):
+    from sqlalchemy import insert
+
+    from src.models.cohort import CohortScore, CohortScoreStats
+
+    now = datetime.utcnow()
+
+    def score(missing: float = 0.05) -> Optional[float]:
+        if rng.random() < missing:
+            return None
+        return round(min(100.0, max(0.0, rng.gauss(70, 15))), 2)
+
+    db.execute(insert(CohortScore), [
+        {
+            "student_deployment_id": i,
+            "cohort_id": COHORT_ID,
+            "deployment_package_id": PACKAGE_ID,
+            "student_id": i,
+            "acc_score": score(),
+            "otd_score": score(),
+            "opt_score": score(),
+            "func_score": score(),
+            "source_modified": now,
+        }
+        for i in range(1, deployments + 1)
+    ])
+    db.add(CohortScoreStats(
+        cohort_id=COHORT_ID,
+        deployment_package_id=PACKAGE_ID,
+        total_students=deployments,
+        version=1,
+    ))
+    db.commit()
+
+
+def time_ms(operation, iterations: int) -> List[float]:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deployments", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--include-z-scores", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Directory for the SQLite files")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure(args.workdir or tempfile.mkdtemp(prefix="fvs-dist-"))
+
+    from src.database import Base, SessionLocalSQLite, sqlite_engine
+    from src.services import distribution
+    from src.services.cohort import load_group_scores
+
+    Base.metadata.create_all(bind=sqlite_engine)
+    db = SessionLocalSQLite()
+    try:
+        seed(db, args.deployments, random.Random(args.seed))
+        options = dict(bins=args.bins, include_z_scores=args.include_z_scores)
+
+        def uncached():
+            distribution._cache.clear()
+            distribution.get_score_distribution(
+                COHORT_ID, PACKAGE_ID, db, **options
+            )
+
+        ids, scores = load_group_scores(COHORT_ID, PACKAGE_ID, db)
+
+        def compute():
+            distribution.compute_distribution(ids, scores, **options)
+
+        def cached():
+            distribution.get_score_distribution(
+                COHORT_ID, PACKAGE_ID, db, **options
+            )
+
+        rows = []
+        for name, operation in (
+            ("uncached", uncached),
+            ("numpy pass", compute),
+            ("cached", cached),
+        ):
+            latencies = time_ms(operation, args.iterations)
+            rows.append([
+                name,
+                round(percentile(latencies, 50), 3),
+                round(percentile(latencies, 99), 3),
+            ])
+    finally:
+        db.close()
+
+    print(f"{args.deployments} deployments, {args.iterations} iterations")
+    print(tabulate(rows, headers=["path", "p50 ms", "p99 ms"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/environment.py
+import os
+import tempfile
+
+# Settings required by src.settings.Settings that have no bearing on
+# benchmark results. Real values from the environment take precedence.
+BENCHMARK_ENV = {
+    "ENVIRONMENT": "benchmark",
+    "SECRET_KEY": "benchmark",
+    "API_VERSION": "v1",
+    "SSH_HOST": "localhost",
+    "SSH_USERNAME": "benchmark",
+    "SSH_KEY_PATH": "/dev/null",
+    "SSH_TUNNEL_ENABLED": "false",
+    "OPENAI_API_KEY": "benchmark",
+    "HEYGEN_API_KEY": "benchmark",
+    "HEYGEN_TEMPLATE_ID": "benchmark-template",
+    "HEYGEN_WEBHOOK_SECRET": "benchmark",
+    "DESCRIPT_API_KEY": "benchmark",
+}
+
+
+def configure(workdir: str = None, itp_url: str = None) -> str:
+    """
+    Point the application at local SQLite files before any src module
+    is imported. The ITP copy and the local store live in separate files
+    so that the MySQL and SQLite engines stay independent.
+
+    Args:
+        workdir: Directory for the SQLite files (a temporary one by default)
+        itp_url: Use this database as the ITP copy instead of a SQLite file
+
+    Returns:
+        The directory holding the benchmark databases
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="fvs-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(workdir, 'local.db')}"
+    os.environ["MYSQL_URL"] = (
+        itp_url or f"sqlite:///{os.path.join(workdir, 'itp.db')}"
+    )
+    os.environ["SSH_TUNNEL_ENABLED"] = "false"
+
+    return workdir
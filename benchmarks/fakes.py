@@ -0,0 +1,182 @@
+# benchmarks/fakes.py
+import asyncio
+import json
+import uuid
+
+from typing import Any, Dict
+
+import httpx
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+
+class json_arrayagg(GenericFunction):
+    """
+    MySQL JSON_ARRAYAGG, registered so the SQLite copy of the ITP schema
+    can run the same queries as the remote server.
+    """
+    inherit_cache = True
+
+
+@compiles(json_arrayagg, "sqlite")
+def _compile_json_arrayagg_sqlite(element, compiler, **kw):
+    # json() restores the JSON subtype lost when the value passes
+    # through a subquery, so objects are not re-quoted as strings
+    return "json_group_array(json(%s))" % compiler.process(
+        element.clauses, **kw
+    )
+
+
+SCENES = [f"scene_{n}" for n in range(1, 9)]
+
+
+def build_scene_dialogue(sentences: int = 6) -> Dict[str, str]:
+    """Deterministic dialogue for every scene of the feedback script"""
+    return {
+        scene: " ".join(
+            f"This is sentence {n} of {scene}." for n in range(sentences)
+        )
+        for scene in SCENES
+    }
+
+
+class FakeScriptChain:
+    """Stands in for the LangChain LLMChain returned by create_script_chain"""
+
+    def __init__(self, response: str, latency: float = 0.0):
+        self.response = response
+        self.latency = latency
+
+    async def arun(self, inputs: Dict[str, Any]) -> str:
+        # Rendering the prompt is part of the real call's cost
+        str(inputs["prompt"])
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.response
+
+
+class FakeSceneChain(FakeScriptChain):
+    """Stands in for create_scene_chain: writes the scene it is asked for"""
+
+    async def arun(self, inputs: Dict[str, Any]) -> str:
+        await super().arun(inputs)
+        return build_scene_dialogue()[inputs["scene"]]
+
+
+# Simulated completion time of one scene, set by benchmarks.run
+# --llm-scene-ms. A whole script takes as long as all of its scenes.
+SCENE_LATENCY = 0.0
+
+
+def create_fake_script_chain() -> FakeScriptChain:
+    return FakeScriptChain(
+        "```json\n" + json.dumps(build_scene_dialogue()) + "\n```",
+        latency=SCENE_LATENCY * len(SCENES),
+    )
+
+
+def create_fake_outline_chain() -> FakeScriptChain:
+    outline = {scene: f"What {scene} covers." for scene in SCENES}
+    return FakeScriptChain(
+        "```json\n" + json.dumps(outline) + "\n```",
+        latency=SCENE_LATENCY,
+    )
+
+
+def create_fake_scene_chain() -> FakeSceneChain:
+    return FakeSceneChain("", latency=SCENE_LATENCY)
+
+
+def heygen_handler(request: httpx.Request) -> httpx.Response:
+    """Minimal HeyGen v2 template API"""
+    if request.method == "GET" and request.url.path.startswith("/v2/template/"):
+        return httpx.Response(
+            200,
+            json={
+                "error": None,
+                "data": {
+                    "variables": {
+                        "student_name": {},
+                        "cohort_percentile": {},
+                        "cohort_otd_percentile": {},
+                        "package_percentile": {},
+                        "top_and_bottom_steps": {},
+                        **{scene: {} for scene in SCENES},
+                    }
+                },
+            },
+        )
+
+    if request.method == "POST" and request.url.path.endswith("/generate"):
+        return httpx.Response(
+            200,
+            json={"error": None, "data": {"video_id": uuid.uuid4().hex}},
+        )
+
+    return httpx.Response(404, json={"error": "not found"})
+
+
+# Simulated HeyGen round trip, set by benchmarks.run --heygen-ms
+HEYGEN_LATENCY = 0.0
+
+
+async def delayed_heygen_handler(request: httpx.Request) -> httpx.Response:
+    if HEYGEN_LATENCY:
+        await asyncio.sleep(HEYGEN_LATENCY)
+    return heygen_handler(request)
+
+
+def create_fake_heygen_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url="https://api.heygen.com",
+        transport=httpx.MockTransport(delayed_heygen_handler),
+    )
+
+
+def template_variable_mappings() -> Dict[str, Any]:
+    """Variable mappings exercising every source model kind"""
+    mappings = [
+        {
+            "variable_name": "student_name",
+            "source_model": "student",
+            "source_field": "first_name",
+        },
+        {
+            "variable_name": "cohort_percentile",
+            "source_model": "cohort_comparison",
+            "source_field": "percentile",
+            "transformation_type": "format_number",
+            "transformation_config": {"format": "{:.1f}"},
+        },
+        {
+            "variable_name": "cohort_otd_percentile",
+            "source_model": "cohort_comparison",
+            "source_field": "otd_score.percentile",
+            "transformation_type": "format_number",
+            "transformation_config": {"format": "{:.1f}"},
+        },
+        {
+            "variable_name": "package_percentile",
+            "source_model": "package_comparison",
+            "source_field": "percentile",
+            "transformation_type": "format_number",
+            "transformation_config": {"format": "{:.0f}"},
+        },
+        {
+            "variable_name": "top_and_bottom_steps",
+            "source_model": "special",
+            "source_field": "get_top_and_bottom_steps_text",
+            "transformation_type": "method_call",
+            "transformation_config": {"object": "student_deployment"},
+        },
+    ]
+    mappings.extend(
+        {
+            "variable_name": scene,
+            "source_model": "script",
+            "source_field": f"scene_dialogue.{scene}",
+        }
+        for scene in SCENES
+    )
+    return {"mappings": mappings}
@@ -0,0 +1,132 @@
+# benchmarks/generate.py
+"""
+Generate a synthetic ITP dataset for scale testing.
+
+Fills the tables from src/models/itp.py with cohorts, students and
+deployments at a configurable scale and skew, using bulk inserts.
+
+Usage:
+    python -m benchmarks.generate --url sqlite:///./itp_synthetic.db \\
+        --cohorts 20 --students 2000 --steps 4 --max-steps 12 \\
+        --text-size 3000 --text-skew 0.8
+"""
+import argparse
+import time
+
+from typing import List, Optional
+
+from benchmarks.environment import configure
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--url",
+        default="sqlite:///./itp_synthetic.db",
+        help="SQLAlchemy URL of the database to fill",
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="Drop existing ITP tables first",
+    )
+    parser.add_argument("--cohorts", type=int, default=10)
+    parser.add_argument(
+        "--students", type=int, default=100, help="Students per cohort"
+    )
+    parser.add_argument("--packages", type=int, default=1)
+    parser.add_argument(
+        "--components", type=int, default=4, help="Components per package"
+    )
+    parser.add_argument(
+        "--steps", type=int, default=4, help="Minimum steps per component"
+    )
+    parser.add_argument(
+        "--max-steps", type=int, help="Maximum steps per component"
+    )
+    parser.add_argument(
+        "--text-size",
+        type=int,
+        default=2000,
+        help="Mean size of the grading/grading_data text columns",
+    )
+    parser.add_argument(
+        "--text-skew",
+        type=float,
+        default=0.0,
+        help="Sigma of the log-normal text size distribution",
+    )
+    parser.add_argument(
+        "--score-alpha",
+        type=float,
+        default=5.0,
+        help="Alpha of the beta score distribution",
+    )
+    parser.add_argument(
+        "--score-beta",
+        type=float,
+        default=2.0,
+        help="Beta of the beta score distribution",
+    )
+    parser.add_argument(
+        "--ungraded",
+        type=float,
+        default=0.0,
+        help="Fraction of deployments without an acc_score",
+    )
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure(itp_url=args.url)
+
+    # Imported here so the environment is configured first
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from benchmarks.itp_data import (
+        ITP_TABLES,
+        create_foreign_key_indexes,
+        seed_itp,
+    )
+    from src.database import Base
+
+    engine = create_engine(args.url)
+    if args.drop:
+        Base.metadata.drop_all(engine, tables=ITP_TABLES)
+    Base.metadata.create_all(engine, tables=ITP_TABLES)
+    create_foreign_key_indexes(engine)
+
+    start = time.perf_counter()
+    with Session(engine) as db:
+        ids = seed_itp(
+            db,
+            cohorts=args.cohorts,
+            students_per_cohort=args.students,
+            packages=args.packages,
+            components=args.components,
+            steps_per_component=args.steps,
+            max_steps_per_component=args.max_steps,
+            text_size=args.text_size,
+            text_skew=args.text_skew,
+            score_alpha=args.score_alpha,
+            score_beta=args.score_beta,
+            ungraded=args.ungraded,
+            batch_size=args.batch_size,
+            seed=args.seed,
+        )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Generated {len(ids['cohorts'])} cohorts, "
+        f"{len(ids['deployment_packages'])} packages and "
+        f"{len(ids['student_deployments'])} student deployments "
+        f"in {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# benchmarks/itp_data.py
+import math
+import random
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Index, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.models.itp import (
+    Cohort,
+    DeploymentComponent,
+    DeploymentPackage,
+    DeploymentPackageStep,
+    Student,
+    StudentDeployment,
+    StudentDeploymentComponent,
+    StudentDeploymentStep,
+)
+
+ITP_TABLES = [
+    Cohort.__table__,
+    Student.__table__,
+    DeploymentPackage.__table__,
+    DeploymentComponent.__table__,
+    DeploymentPackageStep.__table__,
+    StudentDeployment.__table__,
+    StudentDeploymentComponent.__table__,
+    StudentDeploymentStep.__table__,
+]
+
+COMPONENT_TITLES = [
+    "Infrastructure",
+    "CI/CD Pipeline",
+    "Monitoring",
+    "Security",
+    "Networking",
+    "Containerization",
+    "Configuration Management",
+    "Documentation",
+]
+
+WORDS = (
+    "the deployment pipeline uses terraform to provision a vpc with public "
+    "and private subnets jenkins builds the application and pushes the "
+    "artifact the student configured monitoring with prometheus and grafana "
+    "security groups were scoped correctly but the load balancer health "
+    "check path was missing resulting in intermittent failures"
+).split()
+
+
+def create_foreign_key_indexes(engine: Engine):
+    """
+    Index every foreign key column, as InnoDB does implicitly on the
+    ITP server. Without these SQLite copies are not representative.
+    """
+    for table in ITP_TABLES:
+        for fk in table.foreign_keys:
+            column = fk.parent
+            Index(f"ix_{table.name}_{column.name}", column).create(
+                engine, checkfirst=True
+            )
+
+
+class TextSource:
+    """
+    Cheap pseudo-prose: slices of one pre-built corpus, so generating
+    millions of grading columns does not dominate the run time.
+    """
+
+    def __init__(
+        self,
+        rng: random.Random,
+        mean_size: int,
+        skew: float = 0.0,
+        corpus_size: int = 1 << 20,
+    ):
+        self.rng = rng
+        self.mean_size = mean_size
+        self.skew = skew
+        words = [rng.choice(WORDS) for _ in range(corpus_size // 6)]
+        self.corpus = " ".join(words)
+
+    def size(self) -> int:
+        """Log-normally distributed size whose mean is mean_size"""
+        if self.skew <= 0:
+            return self.mean_size
+        mu = math.log(max(self.mean_size, 1)) - self.skew ** 2 / 2
+        return int(self.rng.lognormvariate(mu, self.skew))
+
+    def __call__(self, size: Optional[int] = None) -> str:
+        size = self.size() if size is None else size
+        size = min(size, len(self.corpus))
+        start = self.rng.randrange(len(self.corpus) - size + 1)
+        return self.corpus[start:start + size]
+
+
+class ScoreSource:
+    """Scores on 0-100 drawn from a beta distribution"""
+
+    def __init__(
+        self,
+        rng: random.Random,
+        alpha: float = 5.0,
+        beta: float = 2.0,
+        ungraded: float = 0.0,
+    ):
+        self.rng = rng
+        self.alpha = alpha
+        self.beta = beta
+        self.ungraded = ungraded
+
+    def __call__(self, allow_ungraded: bool = False) -> Optional[float]:
+        if allow_ungraded and self.rng.random() < self.ungraded:
+            return None
+        return round(self.rng.betavariate(self.alpha, self.beta) * 100, 1)
+
+
+def seed_itp(
+    db: Session,
+    cohorts: int = 1,
+    students_per_cohort: int = 30,
+    packages: int = 1,
+    components: int = 4,
+    steps_per_component: int = 4,
+    max_steps_per_component: Optional[int] = None,
+    text_size: int = 2000,
+    text_skew: float = 0.0,
+    score_alpha: float = 5.0,
+    score_beta: float = 2.0,
+    ungraded: float = 0.0,
+    batch_size: int = 200,
+    seed: int = 0,
+) -> Dict[str, List[int]]:
+    """
+    Fill the ITP tables with a deterministic synthetic dataset.
+    Every student gets one deployment of every deployment package.
+    Rows are written with bulk inserts, one batch of students at a time,
+    so memory use stays flat at any scale.
+
+    Args:
+        db: Session bound to the ITP database
+        cohorts: Number of cohorts
+        students_per_cohort: Students per cohort
+        packages: Number of deployment packages
+        components: Components per deployment package
+        steps_per_component: Minimum steps per component
+        max_steps_per_component: Maximum steps per component; each package
+            component draws its step count uniformly between the two
+        text_size: Mean size of each grading text column
+        text_skew: Sigma of the log-normal text size distribution (0 = fixed)
+        score_alpha: Alpha of the beta distribution used for scores
+        score_beta: Beta of the beta distribution used for scores
+        ungraded: Fraction of deployments without an acc_score
+        batch_size: Students written per bulk insert
+        seed: Random seed
+
+    Returns:
+        Dictionary of generated ids keyed by table kind
+    """
+    rng = random.Random(seed)
+    text = TextSource(rng, text_size, text_skew)
+    score = ScoreSource(rng, score_alpha, score_beta, ungraded)
+    max_steps_per_component = max(
+        max_steps_per_component or steps_per_component, steps_per_component
+    )
+    today = date(2025, 1, 1)
+
+    db.execute(
+        insert(DeploymentComponent),
+        [
+            {
+                "id": component_id,
+                "title": COMPONENT_TITLES[
+                    (component_id - 1) % len(COMPONENT_TITLES)
+                ],
+                "description": text(200),
+            }
+            for component_id in range(1, components + 1)
+        ],
+    )
+
+    package_rows = []
+    package_steps: Dict[int, List[dict]] = {}
+    step_id = 0
+    for package_id in range(1, packages + 1):
+        package_steps[package_id] = []
+        for component_id in range(1, components + 1):
+            step_count = rng.randint(
+                steps_per_component, max_steps_per_component
+            )
+            for position in range(step_count):
+                step_id += 1
+                package_steps[package_id].append(
+                    {
+                        "id": step_id,
+                        "deployment_package_id": package_id,
+                        "deployment_step_id": step_id,
+                        "deployment_component_id": component_id,
+                        "max_score": 100,
+                        "component_name": (
+                            f"Step {component_id}.{position + 1}"
+                        ),
+                        "component_category": COMPONENT_TITLES[
+                            (component_id - 1) % len(COMPONENT_TITLES)
+                        ],
+                    }
+                )
+        package_rows.append(
+            {
+                "id": package_id,
+                "name": f"Benchmark Deployment {package_id}",
+                "difficulty_id": 1,
+                "deployment_category": 1,
+                "deployment_type": 1,
+                "objectives": text(400),
+                "notes": text(200),
+                "application_id": 1,
+                "infra_template_id": 1,
+                "number_of_steps": len(package_steps[package_id]),
+            }
+        )
+
+    db.execute(insert(DeploymentPackage), package_rows)
+    db.execute(
+        insert(DeploymentPackageStep),
+        [step for steps in package_steps.values() for step in steps],
+    )
+
+    cohort_rows = [
+        {
+            "id": cohort_id,
+            "name": f"Cohort {cohort_id}",
+            "students_estimate": students_per_cohort,
+            "start_date": today,
+            "end_date": today + timedelta(days=120),
+            "budget_per_student": 100.0,
+        }
+        for cohort_id in range(1, cohorts + 1)
+    ]
+    db.execute(insert(Cohort), cohort_rows)
+    db.commit()
+
+    deployment_ids = []
+    student_rows = []
+    deployment_rows = []
+    component_rows = []
+    step_rows = []
+    component_count = 0
+    step_count = 0
+
+    def flush():
+        db.execute(insert(Student), student_rows)
+        db.execute(insert(StudentDeployment), deployment_rows)
+        db.execute(insert(StudentDeploymentComponent), component_rows)
+        if step_rows:
+            db.execute(insert(StudentDeploymentStep), step_rows)
+        db.commit()
+        for rows in (student_rows, deployment_rows, component_rows, step_rows):
+            rows.clear()
+
+    student_id = 0
+    for cohort_id in range(1, cohorts + 1):
+        for _ in range(students_per_cohort):
+            student_id += 1
+            student_rows.append(
+                {
+                    "id": student_id,
+                    "cohort_id": cohort_id,
+                    "first_name": f"Student{student_id}",
+                    "last_name": "Benchmark",
+                    "gender_id": 1,
+                    "age_id": 1,
+                    "background_id": 1,
+                    "email": f"student{student_id}@example.com",
+                    "telephone": "555-0100",
+                    "address_line_1": "1 Main St",
+                    "city": "Springfield",
+                    "country_id": 1,
+                }
+            )
+
+            for package_id in range(1, packages + 1):
+                deployment_id = len(deployment_ids) + 1
+                deployment_ids.append(deployment_id)
+                deployment_rows.append(
+                    {
+                        "id": deployment_id,
+                        "deployment_package_id": package_id,
+                        "student_id": student_id,
+                        "student_group_id": 1,
+                        "infra_template_id": 1,
+                        "start_date": today,
+                        "end_date": today + timedelta(days=7),
+                        "grade": "B",
+                        "notes": "",
+                        "acc_grading": text(),
+                        "acc_score": score(allow_ungraded=True),
+                        "otd_grading": text(),
+                        "otd_score": score(),
+                        "opt_grading": text(),
+                        "opt_score": score(),
+                        "func_grading": text(),
+                        "func_score": score(),
+                    }
+                )
+
+                student_component_ids = {}
+                for component_id in range(1, components + 1):
+                    component_count += 1
+                    student_component_ids[component_id] = component_count
+                    component_rows.append(
+                        {
+                            "id": component_count,
+                            "student_deployment_id": deployment_id,
+                            "deployment_component_id": component_id,
+                            "deployment_package_id": package_id,
+                            "score": score(),
+                            "grading": text(),
+                        }
+                    )
+
+                for package_step in package_steps[package_id]:
+                    step_count += 1
+                    step_rows.append(
+                        {
+                            "id": step_count,
+                            "student_deployment_id": deployment_id,
+                            "deployment_package_id": package_id,
+                            "deployment_package_step_id": package_step["id"],
+                            "deployment_step_id": (
+                                package_step["deployment_step_id"]
+                            ),
+                            "student_deployment_component_id": (
+                                student_component_ids[
+                                    package_step["deployment_component_id"]
+                                ]
+                            ),
+                            "objectives": text(200),
+                            "instructions": text(200),
+                            "grading": text(),
+                            "grading_data": text(),
+                            "score": score(),
+                        }
+                    )
+
+            if len(student_rows) >= batch_size:
+                flush()
+
+    if student_rows:
+        flush()
+
+    return {
+        "cohorts": [row["id"] for row in cohort_rows],
+        "deployment_packages": [row["id"] for row in package_rows],
+        "student_deployments": deployment_ids,
+    }
@@ -0,0 +1,461 @@
+# benchmarks/run.py
+"""
+Benchmark the video creation pipeline against local fakes.
+
+The ITP schema is seeded into a SQLite file, HeyGen is served by an
+httpx.MockTransport and the LLM is replaced by a deterministic fake,
+so results only reflect our own code and the local databases.
+
+Usage:
+    python -m benchmarks.run --iterations 50 --output results.json
+    python -m benchmarks.run --compare results.json
+"""
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import logging
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+import uuid
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from tabulate import tabulate
+
+from benchmarks.environment import configure
+
+
+class Stage:
+    """A named unit of work with an optional untimed setup step"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        setup: Optional[Callable[[], Any]] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.setup = setup
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _call(func: Callable[[], Any], loop: asyncio.AbstractEventLoop) -> Any:
+    result = func()
+    if inspect.isawaitable(result):
+        result = loop.run_until_complete(result)
+    return result
+
+
+def measure(
+    stage: Stage,
+    iterations: int,
+    warmup: int,
+    allocation_iterations: int,
+    loop: asyncio.AbstractEventLoop,
+) -> Dict[str, Any]:
+    """
+    Time a stage and sample its allocations.
+    Allocations are measured in a separate pass because tracemalloc
+    slows down every allocation and would distort the timings.
+
+    Returns:
+        Latency percentiles in milliseconds and allocation figures in bytes
+    """
+    for _ in range(warmup):
+        if stage.setup:
+            stage.setup()
+        _call(stage.func, loop)
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    for _ in range(iterations):
+        if stage.setup:
+            stage.setup()
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter_ns()
+        _call(stage.func, loop)
+        timings.append((time.perf_counter_ns() - start) / 1_000_000)
+        if gc_was_enabled:
+            gc.enable()
+
+    peaks = []
+    blocks = []
+    for _ in range(allocation_iterations):
+        if stage.setup:
+            stage.setup()
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        snapshot_before = tracemalloc.take_snapshot()
+        _call(stage.func, loop)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot_after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        peaks.append(peak - before)
+        blocks.append(
+            sum(
+                max(stat.count_diff, 0)
+                for stat in snapshot_after.compare_to(
+                    snapshot_before, "filename"
+                )
+            )
+        )
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "min_ms": round(timings[0], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p90_ms": round(percentile(timings, 90), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "max_ms": round(timings[-1], 3),
+        "peak_alloc_bytes": int(statistics.fmean(peaks)) if peaks else None,
+        "retained_blocks": int(statistics.fmean(blocks)) if blocks else None,
+    }
+
+
+def build_stages(args: argparse.Namespace) -> List[Stage]:
+    """
+    Seed the benchmark databases, swap in the fakes and
+    return the pipeline stages to measure.
+    """
+    # Imported here so the environment is configured first
+    from benchmarks import fakes
+    from sqlalchemy import select
+
+    from benchmarks.itp_data import (
+        ITP_TABLES,
+        create_foreign_key_indexes,
+        seed_itp,
+    )
+    from src.database import (
+        Base,
+        SessionLocalMySQL,
+        SessionLocalSQLite,
+        mysql_engine,
+        sqlite_engine,
+    )
+    from src.models.video import (
+        DeploymentPackageExt,
+        HeyGenTemplate,
+        Script as ORMScript,
+        ScriptScene,
+        Video,
+    )
+    from src.api.dependencies.db import select_cohort_score_columns
+    from src.services import cohort as cohort_service
+    from src.schema.video import Script, ScriptStatus
+    from src.services.dialogue import script as script_service
+    from src.services.dialogue import video as video_service
+    from src.settings import settings
+
+    from src.models.itp import StudentDeployment as ORMStudentDeployment
+
+    local_tables = [
+        table for table in Base.metadata.sorted_tables
+        if table not in ITP_TABLES
+    ]
+    Base.metadata.drop_all(sqlite_engine, tables=local_tables)
+    Base.metadata.create_all(sqlite_engine, tables=local_tables)
+
+    itp_db = SessionLocalMySQL()
+    if args.itp_url:
+        # Use an existing dataset, e.g. one made by benchmarks.generate
+        student_deployment_id = args.student_deployment_id or 1
+    else:
+        Base.metadata.drop_all(mysql_engine, tables=ITP_TABLES)
+        Base.metadata.create_all(mysql_engine, tables=ITP_TABLES)
+        create_foreign_key_indexes(mysql_engine)
+        ids = seed_itp(
+            itp_db,
+            students_per_cohort=args.students,
+            components=args.components,
+            steps_per_component=args.steps,
+            text_size=args.text_size,
+        )
+        student_deployment_id = (
+            args.student_deployment_id or ids["student_deployments"][0]
+        )
+    package_id = itp_db.get(
+        ORMStudentDeployment, student_deployment_id
+    ).deployment_package_id
+    itp_db.close()
+
+    db = SessionLocalSQLite()
+    db.add(
+        HeyGenTemplate(
+            template_id=settings.HEYGEN_TEMPLATE_ID,
+            name="Benchmark template",
+            variable_mappings=fakes.template_variable_mappings(),
+        )
+    )
+    db.add(
+        DeploymentPackageExt(
+            deployment_package_id=package_id,
+            prompt_template="Write an eight scene feedback script.",
+        )
+    )
+    db.commit()
+
+    # Materialize cohort standings as the periodic refresh would
+    cohort_service.refresh_cohort_scores(db)
+
+    settings.SCRIPT_GENERATION_MODE = args.script_mode
+    fakes.SCENE_LATENCY = args.llm_scene_ms / 1000
+    fakes.HEYGEN_LATENCY = args.heygen_ms / 1000
+    script_service.create_script_chain = fakes.create_fake_script_chain
+    script_service.create_outline_chain = fakes.create_fake_outline_chain
+    script_service.create_scene_chain = fakes.create_fake_scene_chain
+    video_service.create_heygen_client = fakes.create_fake_heygen_client
+
+    payload = video_service.get_script_request_payload(
+        student_deployment_id, db
+    )
+    cohort_scores = select_cohort_score_columns(
+        cohort_id=payload.student_deployment.cohort.id,
+        package_id=payload.student_deployment.deployment_package.id,
+    )
+    script = Script(
+        id=uuid.uuid4(),
+        student_deployment_id=student_deployment_id,
+        prompt_used="",
+        scene_dialogue=fakes.build_scene_dialogue(),
+        status=ScriptStatus.COMPLETE,
+    )
+
+    def reset_video():
+        db.query(Video).filter(
+            Video.student_deployment_id == student_deployment_id
+        ).delete()
+        db.commit()
+
+    def reset_video_and_script():
+        reset_video()
+        script_ids = select(ORMScript.id).where(
+            ORMScript.student_deployment_id == student_deployment_id
+        )
+        db.query(ScriptScene).filter(
+            ScriptScene.script_id.in_(script_ids)
+        ).delete(synchronize_session=False)
+        db.query(ORMScript).filter(
+            ORMScript.student_deployment_id == student_deployment_id
+        ).delete()
+        db.commit()
+
+    return [
+        Stage(
+            "get_script_request_payload",
+            lambda: video_service.get_script_request_payload(
+                student_deployment_id, db
+            ),
+        ),
+        Stage(
+            "calculate_cohort_comparison",
+            lambda: video_service.calculate_cohort_comparison(
+                payload.student_deployment, cohort_scores
+            ),
+        ),
+        Stage(
+            "get_cohort_comparison",
+            lambda: cohort_service.get_cohort_comparison(
+                payload.student_deployment, db
+            ),
+        ),
+        Stage(
+            "get_package_comparison",
+            lambda: cohort_service.get_package_comparison(
+                payload.student_deployment, db
+            ),
+        ),
+        Stage(
+            "build_heygen_payload",
+            lambda: video_service.build_heygen_payload(
+                template_id=settings.HEYGEN_TEMPLATE_ID,
+                student_deployment=payload.student_deployment,
+                cohort_comparison=payload.cohort_comparison,
+                script=script,
+                db=db,
+                package_comparison=payload.package_comparison,
+            ),
+        ),
+        Stage(
+            "create",
+            lambda: video_service.create(student_deployment_id, db),
+            setup=reset_video_and_script,
+        ),
+        Stage(
+            # Unchanged inputs: the previous script is reused as it is
+            "create_script_reused",
+            lambda: video_service.create(student_deployment_id, db),
+            setup=reset_video,
+        ),
+    ]
+
+
+def print_results(
+    results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None
+):
+    headers = ["stage", "p50 ms", "p90 ms", "p99 ms", "mean ms", "peak KiB"]
+    if baseline:
+        headers.append("p50 vs baseline")
+
+    rows = []
+    for name, stats in results["stages"].items():
+        row = [
+            name,
+            stats["p50_ms"],
+            stats["p90_ms"],
+            stats["p99_ms"],
+            stats["mean_ms"],
+            round(stats["peak_alloc_bytes"] / 1024, 1)
+            if stats["peak_alloc_bytes"] is not None else "-",
+        ]
+        if baseline:
+            previous = baseline["stages"].get(name)
+            if previous and previous["p50_ms"]:
+                change = (stats["p50_ms"] / previous["p50_ms"] - 1) * 100
+                row.append(f"{change:+.1f}%")
+            else:
+                row.append("-")
+        rows.append(row)
+
+    print(tabulate(rows, headers=headers))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--allocation-iterations",
+        type=int,
+        default=5,
+        help="Iterations run under tracemalloc",
+    )
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--components", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument(
+        "--text-size",
+        type=int,
+        default=2000,
+        help="Approximate size of each grading text column",
+    )
+    parser.add_argument(
+        "--stage",
+        action="append",
+        help="Only run the named stage (repeatable)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="Root log level while benchmarking",
+    )
+    parser.add_argument(
+        "--itp-url",
+        help="Existing ITP dataset to use instead of seeding one",
+    )
+    parser.add_argument(
+        "--student-deployment-id",
+        type=int,
+        help="Deployment to run the pipeline for",
+    )
+    parser.add_argument(
+        "--script-mode",
+        choices=["single", "per_scene"],
+        default="single",
+        help="SCRIPT_GENERATION_MODE used by the create stages",
+    )
+    parser.add_argument(
+        "--llm-scene-ms",
+        type=float,
+        default=0.0,
+        help="Simulated LLM time to write one scene",
+    )
+    parser.add_argument(
+        "--heygen-ms",
+        type=float,
+        default=0.0,
+        help="Simulated round trip of each HeyGen request",
+    )
+    parser.add_argument("--workdir", help="Directory for the SQLite files")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    workdir = configure(args.workdir, itp_url=args.itp_url)
+
+    stages = build_stages(args)
+    logging.getLogger().setLevel(args.log_level)
+    if args.stage:
+        stages = [stage for stage in stages if stage.name in args.stage]
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = {
+            "metadata": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "workdir": workdir,
+                "config": {
+                    "itp_url": args.itp_url,
+                    "student_deployment_id": args.student_deployment_id,
+                    "students": args.students,
+                    "components": args.components,
+                    "steps": args.steps,
+                    "text_size": args.text_size,
+                    "script_mode": args.script_mode,
+                    "llm_scene_ms": args.llm_scene_ms,
+                    "heygen_ms": args.heygen_ms,
+                },
+            },
+            "stages": {
+                stage.name: measure(
+                    stage,
+                    args.iterations,
+                    args.warmup,
+                    args.allocation_iterations,
+                    loop,
+                )
+                for stage in stages
+            },
+        }
+    finally:
+        loop.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
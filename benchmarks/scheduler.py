@@ -0,0 +1,119 @@
+# benchmarks/scheduler.py
+"""
+Simulate the generation scheduler under a large batch submission.
+
+One big cohort submits its whole batch at once, a small cohort submits a
+batch shortly after, and interactive requests arrive throughout. Jobs
+sleep for a fixed time instead of running the pipeline. The same load runs
+through a plain FIFO semaphore and through the scheduler, and the table
+compares the latency of the interactive requests and of the small
+cohort's batch.
+
+Usage:
+    python -m benchmarks.scheduler --big-batch 200 --small-batch 20
+"""
+import argparse
+import asyncio
+import time
+
+from typing import Dict, List, Optional
+
+from tabulate import tabulate
+
+from benchmarks.environment import configure
+from benchmarks.run import percentile
+
+BIG_COHORT = 1
+SMALL_COHORT = 2
+INTERACTIVE_COHORT = 3
+
+
+async def simulate(args: argparse.Namespace, fair: bool) -> Dict[str, List[float]]:
+    from src.schema.video import GenerationLane
+    from src.services.scheduler import GenerationScheduler
+
+    scheduler = GenerationScheduler(args.concurrency, speculative_slots=1)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    job_seconds = args.job_ms / 1000
+    latencies: Dict[str, List[float]] = {
+        "interactive": [], "big batch": [], "small batch": []
+    }
+
+    async def job(name: str, lane: GenerationLane, cohort_id: int):
+        start = time.perf_counter()
+        if fair:
+            async with scheduler.slot(lane, cohort_id):
+                await asyncio.sleep(job_seconds)
+        else:
+            async with semaphore:
+                await asyncio.sleep(job_seconds)
+        latencies[name].append((time.perf_counter() - start) * 1000)
+
+    jobs = [
+        job("big batch", GenerationLane.BATCH, BIG_COHORT)
+        for _ in range(args.big_batch)
+    ]
+
+    async def small_batch():
+        await asyncio.sleep(job_seconds)
+        await asyncio.gather(*(
+            job("small batch", GenerationLane.BATCH, SMALL_COHORT)
+            for _ in range(args.small_batch)
+        ))
+
+    async def interactive():
+        for _ in range(args.interactive):
+            await asyncio.sleep(job_seconds * 2)
+            asyncio.ensure_future(
+                job("interactive", GenerationLane.INTERACTIVE,
+                    INTERACTIVE_COHORT)
+            )
+
+    await asyncio.gather(*jobs, small_batch(), interactive())
+    # Let the last interactive requests finish
+    while len(latencies["interactive"]) < args.interactive:
+        await asyncio.sleep(job_seconds)
+    return latencies
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--big-batch", type=int, default=200)
+    parser.add_argument("--small-batch", type=int, default=20)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--job-ms", type=float, default=20.0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure()
+
+    rows = []
+    for name, fair in (("fifo", False), ("scheduler", True)):
+        latencies = asyncio.run(simulate(args, fair))
+        row = [name]
+        for key in ("interactive", "small batch", "big batch"):
+            values = sorted(latencies[key])
+            row += [
+                round(percentile(values, 50), 1),
+                round(percentile(values, 99), 1),
+            ]
+        rows.append(row)
+
+    print(
+        f"{args.big_batch} + {args.small_batch} batch jobs, "
+        f"{args.interactive} interactive, {args.concurrency} slots, "
+        f"{args.job_ms} ms per job"
+    )
+    print(tabulate(rows, headers=[
+        "queue",
+        "interactive p50", "interactive p99",
+        "small batch p50", "small batch p99",
+        "big batch p50", "big batch p99",
+    ]))
+
+
+if __name__ == "__main__":
+    main()
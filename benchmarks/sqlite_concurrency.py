@@ -0,0 +1,216 @@
+# benchmarks/sqlite_concurrency.py
+"""
+Stress the local SQLite database with concurrent readers and writers.
+
+Writer threads update video rows the way the HeyGen webhook and the
+create pipeline do, reader threads run the video listing query. Each
+profile gets a fresh database file: "default" is a plain
+create_engine(), "tuned" applies the SQLITE_* settings.
+
+Usage:
+    python -m benchmarks.sqlite_concurrency --readers 8 --writers 4 --duration 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from tabulate import tabulate
+
+from benchmarks.environment import configure
+from benchmarks.run import percentile
+
+
+class Worker(threading.Thread):
+    """Repeat an operation until stopped, recording latencies and errors"""
+
+    def __init__(self, operation, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.operation = operation
+        self.stop = stop
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def run(self):
+        rng = random.Random(self.ident)
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            try:
+                self.operation(rng)
+            except Exception as e:
+                message = str(getattr(e, "orig", e))
+                self.errors[message] = self.errors.get(message, 0) + 1
+                continue
+            self.latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run_profile(
+    name: str,
+    pragmas: Dict[str, Any],
+    args: argparse.Namespace,
+    workdir: str,
+) -> Dict[str, Any]:
+    from sqlalchemy import create_engine, insert, select, update
+
+    from src.database import Base, configure_sqlite_engine
+    from src.models.video import Script, Video
+
+    path = os.path.join(workdir, f"{name}.db")
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(
+        f"sqlite:///{path}",
+        pool_size=args.readers + args.writers,
+    )
+    configure_sqlite_engine(engine, pragmas)
+    Base.metadata.create_all(
+        engine, tables=[Script.__table__, Video.__table__]
+    )
+
+    now = datetime.utcnow()
+    script_id = uuid.uuid4()
+    video_ids = [uuid.uuid4() for _ in range(args.videos)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Script),
+            [{
+                "id": script_id,
+                "student_deployment_id": 1,
+                "prompt_used": "",
+                "scene_dialogue": {},
+                "status": "complete",
+                "created_on": now,
+                "updated_on": now,
+            }],
+        )
+        conn.execute(
+            insert(Video),
+            [
+                {
+                    "id": video_id,
+                    "student_deployment_id": n,
+                    "script_id": script_id,
+                    "status": "processing",
+                    "created_on": now,
+                    "updated_on": now,
+                }
+                for n, video_id in enumerate(video_ids)
+            ],
+        )
+
+    statuses = ["processing", "completed", "failed"]
+
+    def write(rng: random.Random):
+        with engine.begin() as conn:
+            conn.execute(
+                update(Video)
+                .where(Video.id == rng.choice(video_ids))
+                .values(
+                    status=rng.choice(statuses),
+                    video_url=f"https://example.com/{rng.random()}",
+                    updated_on=datetime.utcnow(),
+                )
+            )
+            # Work done while the write lock is held
+            time.sleep(args.write_hold_ms / 1000)
+
+    def read(rng: random.Random):
+        with engine.connect() as conn:
+            conn.execute(
+                select(Video)
+                .where(Video.status == rng.choice(statuses))
+                .order_by(Video.created_on.desc())
+                .limit(100)
+            ).fetchall()
+
+    stop = threading.Event()
+    writers = [Worker(write, stop) for _ in range(args.writers)]
+    readers = [Worker(read, stop) for _ in range(args.readers)]
+    for worker in writers + readers:
+        worker.start()
+    time.sleep(args.duration)
+    stop.set()
+    for worker in writers + readers:
+        worker.join()
+    engine.dispose()
+
+    result = {}
+    for kind, workers in (("read", readers), ("write", writers)):
+        latencies = sorted(
+            latency for worker in workers for latency in worker.latencies
+        )
+        errors: Dict[str, int] = {}
+        for worker in workers:
+            for message, count in worker.errors.items():
+                errors[message] = errors.get(message, 0) + count
+        result[kind] = {
+            "ops_per_second": round(len(latencies) / args.duration, 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+            "errors": errors,
+        }
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument(
+        "--write-hold-ms",
+        type=float,
+        default=2.0,
+        help="Time each write transaction holds the lock before committing",
+    )
+    parser.add_argument("--workdir", help="Directory for the SQLite files")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fvs-sqlite-")
+    configure(workdir)
+
+    from src.database import sqlite_pragmas
+    from src.settings import settings
+
+    profiles = {
+        "default": {},
+        "tuned": sqlite_pragmas(settings),
+    }
+
+    rows = []
+    for name, pragmas in profiles.items():
+        result = run_profile(name, pragmas, args, workdir)
+        for kind in ("read", "write"):
+            stats = result[kind]
+            rows.append([
+                name,
+                kind,
+                stats["ops_per_second"],
+                stats["p50_ms"],
+                stats["p99_ms"],
+                stats["max_ms"],
+                sum(stats["errors"].values()),
+            ])
+            for message, count in stats["errors"].items():
+                print(f"{name} {kind}: {count} x {message}")
+
+    print(tabulate(
+        rows,
+        headers=["profile", "op", "ops/s", "p50 ms", "p99 ms", "max ms",
+                 "errors"],
+    ))
+
+
+if __name__ == "__main__":
+    main()
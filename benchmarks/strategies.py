@@ -0,0 +1,137 @@
+# benchmarks/strategies.py
+"""
+Compare the select_student_deployment() query strategies.
+
+"json" nests components and steps on the ITP server with JSON_ARRAYAGG,
+"flat" streams joined rows and nests them in Python. The ITP copy is
+reseeded for every size so each strategy sees the same data.
+
+Usage:
+    python -m benchmarks.strategies --steps 4 16 64 --text-size 4000
+    python -m benchmarks.strategies --itp-url mysql+pymysql://... \
+        --student-deployment-id 42
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from typing import List, Optional
+
+from benchmarks.environment import configure
+from benchmarks.run import Stage, measure, print_results
+
+STRATEGIES = ("json", "flat")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--steps",
+        type=int,
+        nargs="+",
+        default=[4, 16, 64],
+        help="Steps per component; the ITP copy is reseeded for each value",
+    )
+    parser.add_argument("--components", type=int, default=8)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--text-size", type=int, default=2000)
+    parser.add_argument(
+        "--projection",
+        choices=["full", "script"],
+        default="full",
+        help="Text columns to fetch",
+    )
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--allocation-iterations", type=int, default=3)
+    parser.add_argument(
+        "--itp-url",
+        help="Existing ITP dataset to use instead of seeding one",
+    )
+    parser.add_argument("--student-deployment-id", type=int, default=1)
+    parser.add_argument("--workdir", help="Directory for the SQLite files")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure(args.workdir, itp_url=args.itp_url)
+
+    # Imported here so the environment is configured first
+    from benchmarks import fakes  # noqa: F401 (registers JSON_ARRAYAGG)
+    from benchmarks.itp_data import (
+        ITP_TABLES,
+        create_foreign_key_indexes,
+        seed_itp,
+    )
+    from src.api.dependencies.db import select_student_deployment
+    from src.database import Base, SessionLocalMySQL, mysql_engine
+    from src.schema.itp import DeploymentProjection
+    from src.services.dialogue.script import SCRIPT_PROMPT_PROJECTION
+
+    logging.getLogger().setLevel("WARNING")
+    projection = (
+        DeploymentProjection.full()
+        if args.projection == "full"
+        else SCRIPT_PROMPT_PROJECTION
+    )
+    sizes = [None] if args.itp_url else args.steps
+
+    loop = asyncio.new_event_loop()
+    stages = {}
+    try:
+        for steps in sizes:
+            if steps is not None:
+                Base.metadata.drop_all(mysql_engine, tables=ITP_TABLES)
+                Base.metadata.create_all(mysql_engine, tables=ITP_TABLES)
+                create_foreign_key_indexes(mysql_engine)
+                itp_db = SessionLocalMySQL()
+                seed_itp(
+                    itp_db,
+                    students_per_cohort=args.students,
+                    components=args.components,
+                    steps_per_component=steps,
+                    text_size=args.text_size,
+                )
+                itp_db.close()
+
+            for strategy in STRATEGIES:
+                name = strategy if steps is None else f"{strategy} steps={steps}"
+                stage = Stage(
+                    name,
+                    lambda strategy=strategy: select_student_deployment(
+                        args.student_deployment_id,
+                        projection=projection,
+                        strategy=strategy,
+                    ),
+                )
+                stages[name] = measure(
+                    stage,
+                    args.iterations,
+                    args.warmup,
+                    args.allocation_iterations,
+                    loop,
+                )
+    finally:
+        loop.close()
+
+    results = {
+        "metadata": {
+            "itp_url": args.itp_url,
+            "components": args.components,
+            "text_size": args.text_size,
+            "projection": args.projection,
+        },
+        "stages": stages,
+    }
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 # src/api/dependencies/db.py
 import json
 
-from typing import List, Union
-from sqlalchemy import select, func
-from sqlalchemy.engine import Row
+from datetime import datetime
+from typing import List, Optional, Union
+from pydantic import TypeAdapter
+from sqlalchemy import select, func, null, or_
+from sqlalchemy.engine import Result, Row
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql import Select
 from src.models.video import DeploymentPackageExt
@@ -21,9 +23,16 @@ from src.schema.itp import (
     Student,
     Cohort,
     DeploymentPackage,
+    DeploymentProjection,
     StudentDeployment,
+    StudentDeploymentComponent,
+    DEPLOYMENT_TEXT_FIELDS,
 )
 from src.database import get_mysql_db
+from src.settings import settings
+
+# Validate the MySQL JSON aggregates straight from the raw JSON text
+components_adapter = TypeAdapter(List[StudentDeploymentComponent])
 
 
 def select_student(
@@ -188,18 +197,50 @@ def select_deployment_package(
     return DeploymentPackage.model_validate(result)
 
 
-def select_student_deployment(student_deployment_id: int, to_pydantic: bool = True):
+def select_student_deployment(
+    student_deployment_id: int,
+    to_pydantic: bool = True,
+    projection: Optional[DeploymentProjection] = None,
+    strategy: Optional[str] = None,
+):
     """
-    Fetch student deployment details from the database using SQLAlchemy ORM and MySQL JSON functions.
+    Fetch student deployment details from the database.
     Structures the result to match the StudentDeployment Pydantic model.
 
     Args:
         deployment_id (int): The ID of the deployment to fetch details for.
         to_pydantic (bool): If True, returns the results as a Pydantic model. If False, returns raw query results.
+        projection (DeploymentProjection): Text columns to fetch. Defaults to every column.
+        strategy (str): "json" builds the nested structure on the MySQL server with JSON functions,
+            "flat" streams joined rows and nests them in Python.
+            Defaults to settings.STUDENT_DEPLOYMENT_QUERY_STRATEGY.
 
     Returns:
         Union[StudentDeployment, dict]: The query results, either as a Pydantic model or a dictionary.
     """
+    projection = projection or DeploymentProjection.full()
+    strategy = strategy or settings.STUDENT_DEPLOYMENT_QUERY_STRATEGY
+
+    if strategy == "flat":
+        return _select_student_deployment_flat(
+            student_deployment_id, to_pydantic, projection
+        )
+    if strategy == "json":
+        return _select_student_deployment_json(
+            student_deployment_id, to_pydantic, projection
+        )
+    raise ValueError(f"Unknown student deployment query strategy: {strategy}")
+
+
+def _select_student_deployment_json(
+    student_deployment_id: int,
+    to_pydantic: bool,
+    projection: DeploymentProjection,
+):
+    """
+    Fetch a student deployment in one query using MySQL JSON functions.
+    Components and their steps are aggregated into JSON on the server.
+    """
     db = next(get_mysql_db())
 
     # Aliases for tables (same as before)
@@ -212,7 +253,45 @@ def select_student_deployment(student_deployment_id: int, to_pydantic: bool = Tr
     dps = aliased(ORMDeploymentPackageStep)
     dp = aliased(ORMDeploymentPackage)
 
-    # The query implementation is the same as before
+    # Key/column pairs for JSON_OBJECT, leaving out unprojected text columns
+    step_json = [
+        "step_name", dps.component_name,
+        "score", ds.score,
+        "deployment_component_id", ds.student_deployment_component_id,
+        "component_category", dps.component_category,
+    ]
+    step_text_columns = {
+        "grading": ds.grading,
+        "grading_data": ds.grading_data,
+        "objectives": ds.objectives,
+        "instructions": ds.instructions,
+    }
+    for field, column in step_text_columns.items():
+        if field in projection.step_fields:
+            step_json += [field, column]
+
+    component_json = [
+        "id", comp.id,
+        "component_category", comp.title,
+        "score", dc.score,
+    ]
+    component_text_columns = {
+        "description": comp.description,
+        "grading": dc.grading,
+    }
+    for field, column in component_text_columns.items():
+        if field in projection.component_fields:
+            component_json += [field, column]
+
+    deployment_text_columns = {
+        field: (
+            getattr(d, field)
+            if field in projection.deployment_fields
+            else null().label(field)
+        )
+        for field in sorted(DEPLOYMENT_TEXT_FIELDS)
+    }
+
     # Construct the inner query for components and steps
     components_subquery = (
         select(
@@ -230,49 +309,21 @@ def select_student_deployment(student_deployment_id: int, to_pydantic: bool = Tr
             d.id.label("deployment_id"),
             d.start_date.label("deployment_start_date"),
             d.end_date.label("deployment_end_date"),
-            d.acc_grading,
+            deployment_text_columns["acc_grading"],
             d.acc_score,
-            d.otd_grading,
+            deployment_text_columns["otd_grading"],
             d.otd_score,
-            d.opt_grading,
+            deployment_text_columns["opt_grading"],
             d.opt_score,
-            d.func_grading,
+            deployment_text_columns["func_grading"],
             d.func_score,
             d.deployment_package_id,
             # Component fields
             comp.id.label("component_id"),
             func.json_object(
-                "id",
-                comp.id,
-                "component_category",
-                comp.title,
-                "description",
-                comp.description,
-                "grading",
-                dc.grading,
-                "score",
-                dc.score,
+                *component_json,
                 "steps",
-                func.json_arrayagg(
-                    func.json_object(
-                        "step_name",
-                        dps.component_name,
-                        "grading",
-                        ds.grading,
-                        "grading_data",
-                        ds.grading_data,
-                        "score",
-                        ds.score,
-                        "objectives",
-                        ds.objectives,
-                        "instructions",
-                        ds.instructions,
-                        "deployment_component_id",
-                        ds.student_deployment_component_id,
-                        "component_category",
-                        dps.component_category,
-                    )
-                ),
+                func.json_arrayagg(func.json_object(*step_json)),
             ).label("component_json"),
             # Package fields
             func.json_object(
@@ -285,21 +336,6 @@ def select_student_deployment(student_deployment_id: int, to_pydantic: bool = Tr
                 "objectives",
                 dp.objectives,
             ).label("deployment_package_json"),
-            func.json_object(
-                "component_category",
-                comp.title,
-                "score",
-                dc.score,
-                "steps",
-                func.json_arrayagg(
-                    func.json_object(
-                        "step_name",
-                        dps.component_name,
-                        "score",
-                        ds.score
-                    )
-                ),
-            ).label("component_summary_json"),
         )
         .select_from(s)
         .join(c, s.cohort_id == c.id)
@@ -350,9 +386,6 @@ def select_student_deployment(student_deployment_id: int, to_pydantic: bool = Tr
         components_subquery.c.deployment_package_json.label(
             "deployment_package_data"
         ),
-        func.json_arrayagg(
-            components_subquery.c.component_summary_json
-        ).label("components_summary_data"),
     ).group_by(
         components_subquery.c.deployment_id,
         components_subquery.c.deployment_package_id
@@ -385,15 +418,194 @@ def select_student_deployment(student_deployment_id: int, to_pydantic: bool = Tr
         "opt_score": result.opt_score,
         "func_grading": result.func_grading,
         "func_score": result.func_score,
-        "components": json.loads(result.components_data),
-        "deployment_package": json.loads(result.deployment_package_data),
-        "components_summary": json.loads(result.components_summary_data),
     }
 
+    if not to_pydantic:
+        result_dict.update(
+            {
+                "components": json.loads(result.components_data),
+                "deployment_package": json.loads(
+                    result.deployment_package_data
+                ),
+            }
+        )
+        return result_dict
+
+    # Convert to Pydantic model, validating the JSON columns directly
+    # so the grading text is not copied through intermediate dicts.
+    # Already validated models are not revalidated by StudentDeployment.
+    return StudentDeployment(
+        **result_dict,
+        components=components_adapter.validate_json(result.components_data),
+        deployment_package=DeploymentPackage.model_validate_json(
+            result.deployment_package_data
+        ),
+    )
+
+
+def _select_student_deployment_flat(
+    student_deployment_id: int,
+    to_pydantic: bool,
+    projection: DeploymentProjection,
+):
+    """
+    Fetch a student deployment as flat rows and nest them in Python.
+    One row for the deployment header, then one streamed row per
+    component x step, so the ITP server only joins and sorts.
+    """
+    db = next(get_mysql_db())
+
+    s = aliased(ORMStudent)
+    c = aliased(ORMCohort)
+    d = aliased(ORMStudentDeployment)
+    dc = aliased(ORMStudentDeploymentComponent)
+    comp = aliased(ORMDeploymentComponent)
+    ds = aliased(ORMStudentDeploymentStep)
+    dps = aliased(ORMDeploymentPackageStep)
+    dp = aliased(ORMDeploymentPackage)
+
+    header_query = (
+        select(
+            s.first_name,
+            s.last_name,
+            s.email,
+            c.id.label("cohort_id"),
+            c.name.label("cohort_name"),
+            d.id.label("deployment_id"),
+            d.acc_score,
+            d.otd_score,
+            d.opt_score,
+            d.func_score,
+            d.deployment_package_id,
+            dp.name.label("deployment_package_name"),
+            dp.notes.label("deployment_package_notes"),
+            dp.objectives.label("deployment_package_objectives"),
+            *(
+                getattr(d, field)
+                for field in sorted(projection.deployment_fields)
+                if field in DEPLOYMENT_TEXT_FIELDS
+            ),
+        )
+        .select_from(d)
+        .join(s, s.id == d.student_id)
+        .join(c, s.cohort_id == c.id)
+        .join(dp, d.deployment_package_id == dp.id)
+        .where(d.id == student_deployment_id)
+    )
+
+    header = db.execute(header_query).fetchone()
+    if not header:
+        return None
+
+    step_text_columns = {
+        "grading": ds.grading,
+        "grading_data": ds.grading_data,
+        "objectives": ds.objectives,
+        "instructions": ds.instructions,
+    }
+    component_text_columns = {
+        "description": comp.description,
+        "grading": dc.grading,
+    }
+    step_fields = [
+        field for field in step_text_columns
+        if field in projection.step_fields
+    ]
+    component_fields = [
+        field for field in component_text_columns
+        if field in projection.component_fields
+    ]
+
+    rows_query = (
+        select(
+            comp.id.label("component_id"),
+            comp.title.label("component_category"),
+            dc.score.label("component_score"),
+            *(
+                component_text_columns[field].label(f"component_{field}")
+                for field in component_fields
+            ),
+            dps.deployment_step_id,
+            dps.component_name.label("step_name"),
+            dps.component_category.label("step_component_category"),
+            ds.score.label("step_score"),
+            ds.student_deployment_component_id,
+            *(
+                step_text_columns[field].label(f"step_{field}")
+                for field in step_fields
+            ),
+        )
+        .select_from(dc)
+        .join(comp, dc.deployment_component_id == comp.id)
+        .outerjoin(
+            dps,
+            (dps.deployment_package_id == header.deployment_package_id)
+            & (dps.deployment_component_id == dc.deployment_component_id),
+        )
+        .outerjoin(
+            ds,
+            (ds.student_deployment_id == dc.student_deployment_id)
+            & (ds.deployment_step_id == dps.deployment_step_id),
+        )
+        .where(dc.student_deployment_id == student_deployment_id)
+        .order_by(comp.id, dps.deployment_step_id)
+    )
+
+    components = {}
+    for row in db.execute(rows_query.execution_options(yield_per=500)):
+        component = components.get(row.component_id)
+        if component is None:
+            component = components[row.component_id] = {
+                "id": row.component_id,
+                "component_category": row.component_category,
+                "score": row.component_score,
+                "steps": [],
+            }
+            for field in component_fields:
+                component[field] = getattr(row, f"component_{field}")
+
+        if row.deployment_step_id is None:
+            continue
+
+        step = {
+            "step_name": row.step_name,
+            "score": row.step_score,
+            "deployment_component_id": row.student_deployment_component_id,
+            "component_category": row.step_component_category,
+        }
+        for field in step_fields:
+            step[field] = getattr(row, f"step_{field}")
+        component["steps"].append(step)
+
+    result_dict = {
+        "student": {
+            "first_name": header.first_name,
+            "last_name": header.last_name,
+            "email": header.email,
+        },
+        "cohort": {
+            "id": header.cohort_id,
+            "name": header.cohort_name,
+        },
+        "id": header.deployment_id,
+        "acc_score": header.acc_score,
+        "otd_score": header.otd_score,
+        "opt_score": header.opt_score,
+        "func_score": header.func_score,
+        "components": list(components.values()),
+        "deployment_package": {
+            "id": header.deployment_package_id,
+            "name": header.deployment_package_name,
+            "notes": header.deployment_package_notes,
+            "objectives": header.deployment_package_objectives,
+        },
+    }
+    for field in DEPLOYMENT_TEXT_FIELDS:
+        result_dict[field] = getattr(header, field, None)
+
     if not to_pydantic:
         return result_dict
 
-    # Convert to Pydantic model
     return StudentDeployment(**result_dict)
 
 
@@ -444,6 +656,103 @@ def select_cohort_scores(
     return [deployment.acc_score for deployment in results]
 
 
+def select_cohort_score_columns(
+    cohort_id: int,
+    package_id: int,
+    execute: bool = True,
+) -> Union[List[Row], Select]:
+    """
+    Fetch every score of a cohort's graded deployments for one package,
+    for comparing a student on all metrics at once.
+
+    Args:
+        cohort_id: The ID of the cohort
+        package_id: The ID of the deployment package
+        execute: If True, executes the query
+
+    Returns:
+        Rows of (acc_score, otd_score, opt_score, func_score) if execute=True
+        SQLAlchemy Select object if execute=False
+    """
+    query = (
+        select(
+            ORMStudentDeployment.acc_score,
+            ORMStudentDeployment.otd_score,
+            ORMStudentDeployment.opt_score,
+            ORMStudentDeployment.func_score,
+        )
+        .join(ORMStudent, ORMStudentDeployment.student_id == ORMStudent.id)
+        .where(
+            ORMStudent.cohort_id == cohort_id,
+            ORMStudentDeployment.deployment_package_id == package_id,
+            ORMStudentDeployment.acc_score.is_not(None),
+        )
+    )
+
+    if not execute:
+        return query
+
+    db = next(get_mysql_db())
+    return db.execute(query).all()
+
+
+def select_deployment_scores(
+    modified_since: Optional[datetime] = None,
+    execute: bool = True,
+) -> Union[Result, Select]:
+    """
+    Fetch the scores and cohort of student deployments, oldest change first.
+    Used to maintain the local cohort_scores table incrementally.
+
+    Args:
+        modified_since: Only deployments (or their students) modified at
+            or after this time. All deployments when None.
+        execute: If True, executes the query
+
+    Returns:
+        Streamed rows if execute=True
+        SQLAlchemy Select object if execute=False
+    """
+    d = aliased(ORMStudentDeployment)
+    s = aliased(ORMStudent)
+
+    query = (
+        select(
+            d.id.label("student_deployment_id"),
+            s.cohort_id,
+            d.deployment_package_id,
+            d.student_id,
+            d.acc_score,
+            d.otd_score,
+            d.opt_score,
+            d.func_score,
+            d.modified,
+            s.modified.label("student_modified"),
+        )
+        .join(s, d.student_id == s.id)
+        .order_by(d.modified, d.id)
+    )
+    if modified_since is not None:
+        # A student moving cohort only touches the student row
+        query = query.where(
+            or_(d.modified >= modified_since, s.modified >= modified_since)
+        )
+
+    if not execute:
+        return query
+
+    db = next(get_mysql_db())
+    return db.execute(query.execution_options(yield_per=1000))
+
+
+def select_latest_deployment_modified() -> Optional[datetime]:
+    """Latest modified timestamp of any student deployment"""
+    query = select(func.max(ORMStudentDeployment.modified))
+
+    db = next(get_mysql_db())
+    return db.execute(query).scalar()
+
+
 def select_deployment_package_extension(
         deployment_package_id: int,
         db
@@ -1,7 +1,7 @@
 # src/api/exceptions/handlers.py
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import HTTPException
+from src.api.responses import PydanticJSONResponse
 from src.schema.base import BaseResponse
 from src.logging_config import app_logger
 
@@ -11,7 +11,7 @@ app = FastAPI()
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return PydanticJSONResponse(
         status_code=exc.status_code,
         content=BaseResponse(
             status=False,
@@ -22,7 +22,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
                 "error_message": exc.detail,
                 "error_details": None
             }
-        ).dict()
+        )
     )
 
 
@@ -31,7 +31,7 @@ async def generic_exception_handler(request: Request, exc: Exception):
     # Log the exception
     app_logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
 
-    return JSONResponse(
+    return PydanticJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=BaseResponse(
             status=False,
@@ -42,5 +42,5 @@ async def generic_exception_handler(request: Request, exc: Exception):
                 "error_message": str(exc),
                 "error_details": None
             }
-        ).dict()
+        )
     )
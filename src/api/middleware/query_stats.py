@@ -0,0 +1,45 @@
+# src/api/middleware/query_stats.py
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.logging_config import app_logger
+from src.query_stats import (
+    DB_REQUEST_SECONDS,
+    DB_REQUEST_STATEMENTS,
+    track_queries,
+)
+
+
+class QueryStatsMiddleware:
+    """
+    Track the SQL statements issued while handling each HTTP request
+    and report them in logs and metrics.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        with track_queries(label) as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # Label by endpoint name so metrics labels stay bounded
+                route = getattr(scope.get("endpoint"), "__name__", "unmatched")
+                DB_REQUEST_STATEMENTS.observe(stats.count, route=route)
+                DB_REQUEST_SECONDS.observe(stats.total_time, route=route)
+
+                if stats.count:
+                    engines = ", ".join(
+                        f"{engine}={count}"
+                        for engine, count in stats.by_engine.items()
+                    )
+                    app_logger.debug(
+                        f"{label}: {stats.count} statements "
+                        f"({engines}) in {stats.total_time * 1000:.1f} ms",
+                        extra={"sample": "request"},
+                    )
@@ -0,0 +1,56 @@
+# src/api/responses.py
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response rendered in a single pass by pydantic-core.
+
+    Pydantic models are serialized straight to bytes by their compiled
+    serializer instead of going through jsonable_encoder and json.dumps,
+    so no intermediate dict tree is built. Routes should return this
+    response directly so FastAPI does not re-validate the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Server-sent events stream. Each model from the iterator is sent as one
+    event with a JSON data line; None sends a comment so idle connections
+    are not closed by proxies.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        events: AsyncIterator[Optional[BaseModel]],
+        event: str = "message",
+    ):
+        super().__init__(
+            self._render(events, event),
+            headers={
+                "Cache-Control": "no-cache",
+                # Stop nginx from buffering the stream
+                "X-Accel-Buffering": "no",
+            },
+        )
+
+    @staticmethod
+    async def _render(
+        events: AsyncIterator[Optional[BaseModel]], event: str
+    ) -> AsyncIterator[bytes]:
+        async for item in events:
+            if item is None:
+                yield b": keepalive\n\n"
+            else:
+                yield b"event: %s\ndata: %s\n\n" % (
+                    event.encode(), to_json(item)
+                )
@@ -0,0 +1,64 @@
+# src/api/routes/cohort.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from src.api.responses import EventStreamResponse, PydanticJSONResponse
+from src.database import get_sqlite_db
+from src.schema.cohort import LeaderboardResponse, ScoreDistributionResponse
+from src.services import cohort as cohort_handler
+from src.services import events
+from src.services import distribution as distribution_handler
+
+router = APIRouter(prefix="/cohorts")
+
+
+@router.get(
+    "/{cohort_id}/packages/{package_id}/leaderboard",
+    response_model=LeaderboardResponse,
+    response_class=PydanticJSONResponse
+)
+async def get_leaderboard(
+    cohort_id: int,
+    package_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_sqlite_db)
+):
+    leaderboard = cohort_handler.get_leaderboard(
+        cohort_id, package_id, db, limit=limit, offset=offset
+    )
+    if not leaderboard:
+        raise HTTPException(status_code=404, detail="Leaderboard not found")
+    return PydanticJSONResponse(LeaderboardResponse(data=leaderboard))
+
+
+@router.get(
+    "/{cohort_id}/packages/{package_id}/distribution",
+    response_model=ScoreDistributionResponse,
+    response_class=PydanticJSONResponse
+)
+async def get_score_distribution(
+    cohort_id: int,
+    package_id: int,
+    bins: int = Query(10, ge=1, le=100),
+    include_z_scores: bool = False,
+    db: Session = Depends(get_sqlite_db)
+):
+    distribution = distribution_handler.get_score_distribution(
+        cohort_id,
+        package_id,
+        db,
+        bins=bins,
+        include_z_scores=include_z_scores,
+    )
+    if not distribution:
+        raise HTTPException(status_code=404, detail="Distribution not found")
+    return PydanticJSONResponse(ScoreDistributionResponse(data=distribution))
+
+
+@router.get("/{cohort_id}/videos/events", response_class=EventStreamResponse)
+async def watch_cohort_videos(cohort_id: int):
+    """Server-sent `status` events for every video of a cohort"""
+    return EventStreamResponse(
+        events.get_broker().subscribe(cohort_id=cohort_id),
+        event="status",
+    )
@@ -0,0 +1,13 @@
+# src/api/routes/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from src.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose application metrics in the Prometheus text format"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
@@ -1,31 +1,69 @@
 # src/api/routes/video.py
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from src.api.responses import EventStreamResponse, PydanticJSONResponse
 from src.database import get_sqlite_db
-from src.models.video import Video
-from src.schema.video import CreateVideoRequest, VideoData, VideoResponse
+from src.schema.video import (
+    CreateVideoRequest,
+    VideoData,
+    VideoListResponse,
+    VideoResponse,
+    VideoStatus,
+)
+from src.services import events
 from src.services.dialogue import video as video_handler
 
 router = APIRouter(prefix="/videos")
 
 
-@router.post("/", response_model=VideoResponse)
+@router.post(
+    "/",
+    response_model=VideoResponse,
+    response_class=PydanticJSONResponse
+)
 async def create_video(
     request: CreateVideoRequest,
     db: Session = Depends(get_sqlite_db)
 ):
-    video: Video = await video_handler.create(
+    video: VideoData = await video_handler.create(
         request.student_deployment_id,
-        db
+        db,
+        lane=request.priority,
     )
-    return VideoResponse(
-        data=VideoData.model_validate(video)
+    return PydanticJSONResponse(VideoResponse(data=video))
+
+
+@router.get(
+    "/",
+    response_model=VideoListResponse,
+    response_class=PydanticJSONResponse
+)
+async def list_videos(
+    student_deployment_id: Optional[int] = None,
+    status: Optional[VideoStatus] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_sqlite_db)
+):
+    videos = await video_handler.list_videos(
+        db,
+        student_deployment_id=student_deployment_id,
+        status=status,
+        limit=limit,
+        offset=offset,
     )
+    return PydanticJSONResponse(VideoListResponse(data=videos))
 
 
-@router.get("/{video_id}", response_model=VideoResponse)
+@router.get(
+    "/{video_id}",
+    response_model=VideoResponse,
+    response_class=PydanticJSONResponse
+)
 async def get_video_status(
     video_id: uuid.UUID,
     db: Session = Depends(get_sqlite_db)
@@ -33,4 +71,28 @@ async def get_video_status(
     video_data = await video_handler.get(video_id, db)
     if not video_data:
         raise HTTPException(status_code=404, detail="Video not found")
-    return video_data
+    return PydanticJSONResponse(VideoResponse(data=video_data))
+
+
+@router.get("/{video_id}/events", response_class=EventStreamResponse)
+async def watch_video_status(
+    video_id: uuid.UUID,
+    db: Session = Depends(get_sqlite_db)
+):
+    """
+    Server-sent `status` events for one video: its current status, then
+    every change until it completes or fails
+    """
+    # Subscribed before reading so no change in between is missed
+    subscription = events.get_broker().subscribe(video_id=video_id)
+    video_data = await video_handler.get(video_id, db)
+    # The stream can stay open for minutes: hold no connection
+    db.close()
+    if not video_data:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    return EventStreamResponse(
+        video_handler.watch_video(video_data, subscription),
+        event="status",
+    )
@@ -1,9 +1,14 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sshtunnel import SSHTunnelForwarder
 from urllib.parse import urlparse
+from src.query_stats import instrument_engine
 from src.settings import Settings
+from src.tunnel import create_tunnel
 
 # Load settings
 settings = Settings()
@@ -11,8 +16,61 @@ settings = Settings()
 # Base for models (shared between SQLite and MySQL)
 Base = declarative_base()
 
-# SQLite setup (local database)
-sqlite_engine = create_engine(settings.DB_URL)
+
+def sqlite_pragmas(settings: Settings) -> Dict[str, Any]:
+    """PRAGMA values for local SQLite connections, from settings"""
+    # busy_timeout first so it also covers switching the journal mode
+    return {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def configure_sqlite_engine(engine: Engine, pragmas: Dict[str, Any]):
+    """
+    Apply PRAGMAs to every new connection of a SQLite engine.
+    In WAL mode readers no longer wait for writers, and busy_timeout
+    makes writers queue for the lock instead of failing with
+    "database is locked". Other backends are left untouched.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if value is not None and value != "":
+                cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def local_engine_options(settings: Settings) -> Dict[str, Any]:
+    """
+    create_engine() options for the local store. Server backends such
+    as PostgreSQL get a sized, self-healing connection pool; SQLite
+    keeps SQLAlchemy's defaults.
+    """
+    if make_url(settings.DB_URL).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Local store setup (SQLite by default, any SQLAlchemy backend via DB_URL).
+# The sqlite_* names are kept for the existing call sites.
+sqlite_engine = create_engine(settings.DB_URL, **local_engine_options(settings))
+configure_sqlite_engine(sqlite_engine, sqlite_pragmas(settings))
+instrument_engine(sqlite_engine, "sqlite")
 SessionLocalSQLite = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)
 
 
@@ -30,35 +88,79 @@ def build_mysql_connection_string_with_ssh(
     return modified_url
 
 
-# Parse the MYSQL_URL to extract the remote MySQL host and port
-parsed_mysql_url = urlparse(settings.MYSQL_URL)
-mysql_host = parsed_mysql_url.hostname
-mysql_port = parsed_mysql_url.port or 3306
+def build_mysql_connection_string_for_shared_tunnel(
+    mysql_url: str, settings: Settings
+) -> str:
+    """
+    Modifies the MySQL connection string to go through the shared tunnel
+    started with `python -m src.tunnel`, over its Unix socket or local port.
+    """
+    url = make_url(mysql_url)
+    if settings.SSH_TUNNEL_SOCKET:
+        url = url.set(host="localhost", port=None).update_query_dict(
+            {"unix_socket": settings.SSH_TUNNEL_SOCKET}
+        )
+    else:
+        url = url.set(
+            host=settings.SSH_TUNNEL_LOCAL_HOST,
+            port=settings.SSH_TUNNEL_LOCAL_PORT,
+        )
+    return url.render_as_string(hide_password=False)
+
+
+def mysql_engine_options(mysql_url: str, settings: Settings) -> Dict[str, Any]:
+    """
+    create_engine() options for the ITP database. MYSQL_MAX_CONNECTIONS
+    is split between the WEB_CONCURRENCY worker processes, without
+    overflow, so adding workers never adds connections to the ITP server.
+    """
+    if make_url(mysql_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": max(
+            1, settings.MYSQL_MAX_CONNECTIONS // max(1, settings.WEB_CONCURRENCY)
+        ),
+        "max_overflow": 0,
+        "pool_timeout": settings.MYSQL_POOL_TIMEOUT,
+        "pool_recycle": settings.MYSQL_POOL_RECYCLE,
+        # Connections through a restarted tunnel are dead; replace them
+        "pool_pre_ping": True,
+    }
+
 
 # SSH Tunnel setup for MySQL
-ssh_tunnel = SSHTunnelForwarder(
-    (settings.SSH_HOST, settings.SSH_PORT),
-    ssh_username=settings.SSH_USERNAME,
-    ssh_pkey=settings.SSH_KEY_PATH,
-    remote_bind_address=(
-        mysql_host,
-        mysql_port,
-    ),
+ssh_tunnel = None
+mysql_url_with_ssh = settings.MYSQL_URL
+
+tunnel_mode = (
+    settings.SSH_TUNNEL_MODE if settings.SSH_TUNNEL_ENABLED else "disabled"
 )
 
-# Start the SSH tunnel
-ssh_tunnel.start()
+if tunnel_mode == "embedded":
+    ssh_tunnel = create_tunnel(settings)
 
-# Build MySQL connection string with SSH tunnel
-mysql_url_with_ssh = build_mysql_connection_string_with_ssh(
-    settings.MYSQL_URL, ssh_tunnel
-)
+    # Start the SSH tunnel
+    ssh_tunnel.start()
+
+    # Build MySQL connection string with SSH tunnel
+    mysql_url_with_ssh = build_mysql_connection_string_with_ssh(
+        settings.MYSQL_URL, ssh_tunnel
+    )
+elif tunnel_mode == "external":
+    # One tunnel process shared by every worker on this host
+    mysql_url_with_ssh = build_mysql_connection_string_for_shared_tunnel(
+        settings.MYSQL_URL, settings
+    )
+elif tunnel_mode != "disabled":
+    raise ValueError(f"Unknown SSH_TUNNEL_MODE: {settings.SSH_TUNNEL_MODE}")
 
 # Create SQLAlchemy engine for MySQL
 mysql_engine = create_engine(
     mysql_url_with_ssh,
-    execution_options={"readonly": True}
+    execution_options={"readonly": True},
+    **mysql_engine_options(mysql_url_with_ssh, settings),
 )
+instrument_engine(mysql_engine, "mysql")
 SessionLocalMySQL = sessionmaker(
     autocommit=False, autoflush=False, bind=mysql_engine
 )
@@ -84,4 +186,5 @@ def get_mysql_db():
 
 # Close the SSH tunnel when the application shuts down
 def close_ssh_tunnel():
-    ssh_tunnel.stop()
+    if ssh_tunnel is not None:
+        ssh_tunnel.stop()
@@ -1,28 +1,138 @@
 # src/logging_config.py
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
 
+from datetime import datetime, timezone
+from typing import Dict
+
+from src.settings import settings
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRIBUTES = set(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, tz=timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Formatted by StructuredQueueHandler before it was enqueued
+            entry["exc_info"] = record.exc_text
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+
+        return json.dumps(entry, default=str)
+
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback out of the message.
+
+    QueueHandler.prepare() formats the whole record into `msg` and clears
+    `exc_info`, so the listener's formatter could no longer tell the
+    traceback apart. Here only the message arguments are merged and the
+    traceback is kept, formatted, in `exc_text`, which JsonFormatter and
+    logging.Formatter both pick up.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(
+                    record.exc_info
+                )
+            # Tracebacks hold their frames alive while queued
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of high-volume records.
+    Records opt in with `extra={"sample": "<key>"}` and are kept with
+    the rate configured for that key in LOG_SAMPLE_RATES.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None:
+            return True
+        rate = self.rates.get(key, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
 
 def setup_logging():
     """
     Set up logging configuration for the application.
+
+    Records are put on a queue by the calling thread and formatted and
+    written by a background listener thread, so logging never blocks
+    the event loop on stdout.
     """
     # Create a logger
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(settings.LOG_LEVEL.upper())
+
+    # Per-logger levels, e.g. {"httpx": "WARNING", "sqlalchemy": "WARNING"}
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
 
-    # Create a console handler
+    # Create a console handler, driven by the queue listener
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)  # Set the handler level
 
     # Create a formatter
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-
-    # Add the formatter to the handler
+    if settings.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
     console_handler.setFormatter(formatter)
 
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    # Drop sampled records before they are enqueued
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
     # Add the handler to the logger
-    logger.addHandler(console_handler)
+    logger.addHandler(queue_handler)
 
     return logger
 
@@ -1,15 +1,57 @@
+import asyncio
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import HTTPException
 
+from src.api.middleware.query_stats import QueryStatsMiddleware
+from src.api.routes.cohort import router as cohort_router
+from src.api.routes.metrics import router as metrics_router
 from src.api.routes.video import router as video_router
 from src.api.routes.webhooks import router as webhook_router
 from src.api.exceptions.handlers import (
     http_exception_handler,
     generic_exception_handler
 )
+from src.services.cohort import run_periodic_refresh
+from src.services.dialogue.pregeneration import run_periodic_pregeneration
+from src.services.dialogue.video import run_periodic_render_queue
+from src.services.events import run_event_relay
+from src.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if settings.LEADERBOARD_REFRESH_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            run_periodic_refresh(settings.LEADERBOARD_REFRESH_INTERVAL_SECONDS)
+        ))
+    if settings.SCRIPT_PREGENERATION_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            run_periodic_pregeneration(
+                settings.SCRIPT_PREGENERATION_INTERVAL_SECONDS
+            )
+        ))
+    if settings.HEYGEN_MAX_CONCURRENT_RENDERS > 0:
+        tasks.append(asyncio.create_task(
+            run_periodic_render_queue(
+                settings.HEYGEN_RENDER_QUEUE_POLL_SECONDS
+            )
+        ))
+    if settings.VIDEO_EVENTS_FANOUT:
+        tasks.append(asyncio.create_task(
+            run_event_relay(settings.VIDEO_EVENTS_POLL_SECONDS)
+        ))
+    yield
+    for task in tasks:
+        task.cancel()
+    # Let the jobs release their leases and close their sessions
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
-app = FastAPI(title="Feedback Video System")
+app = FastAPI(title="Feedback Video System", lifespan=lifespan)
 
 
 @app.get("/health")
@@ -18,5 +60,8 @@ async def health_check():
 
 app.include_router(video_router)
 app.include_router(webhook_router)
+app.include_router(cohort_router)
+app.include_router(metrics_router)
+app.add_middleware(QueryStatsMiddleware)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
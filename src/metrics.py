@@ -0,0 +1,277 @@
+# src/metrics.py
+"""
+Lightweight in-process metrics rendered in the Prometheus text format.
+
+Each update takes a lock and touches a single dict entry, so the
+instrumentation is cheap enough to leave enabled in production.
+"""
+import bisect
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+
+def _escape(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Base class for metrics identified by a name and label names"""
+
+    type_name = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Return (suffix, rendered labels, value) tuples"""
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            ("", _format_labels(self.labelnames, key), value)
+            for key, value in items
+        ]
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """Increment for the duration of the block"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        samples = []
+        for key, series in items:
+            cumulative = 0.0
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series[:-1]):
+                cumulative += count
+                samples.append(
+                    (
+                        "_bucket",
+                        _format_labels(
+                            self.labelnames + ("le",), key + (bound,)
+                        ),
+                        cumulative,
+                    )
+                )
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_sum", labels, series[-1]))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """Collection of metrics exposed together"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Video pipeline
+PIPELINE_STAGE_SECONDS = Histogram(
+    "video_pipeline_stage_seconds",
+    "Time spent in each stage of the video creation pipeline",
+    ["stage"],
+)
+PIPELINE_NODE_SECONDS = Histogram(
+    "video_pipeline_node_seconds",
+    "Wall time of each node of the concurrent video creation graph",
+    ["node"],
+)
+PIPELINE_JOBS_IN_FLIGHT = Gauge(
+    "video_pipeline_jobs_in_flight",
+    "Video creation jobs currently running",
+)
+PIPELINE_JOBS_TOTAL = Counter(
+    "video_pipeline_jobs_total",
+    "Video creation jobs by outcome",
+    ["outcome"],
+)
+GENERATION_QUEUE_DEPTH = Gauge(
+    "generation_queue_depth",
+    "Generation jobs waiting for a slot, by priority lane",
+    ["lane"],
+)
+GENERATION_QUEUE_WAIT_SECONDS = Histogram(
+    "generation_queue_wait_seconds",
+    "Time generation jobs waited for a slot, by priority lane",
+    ["lane"],
+)
+
+# LLM
+LLM_TOKENS_TOTAL = Counter(
+    "llm_tokens_total",
+    "Tokens used by LLM calls",
+    ["kind"],
+)
+SCRIPT_SCENES_TOTAL = Counter(
+    "script_scenes_total",
+    "Script scenes written by the LLM or reused from the previous version",
+    ["outcome"],
+)
+SCRIPT_PREGENERATIONS_TOTAL = Counter(
+    "script_pregenerations_total",
+    "Scripts generated ahead of time for newly graded deployments",
+    ["outcome"],
+)
+
+# HeyGen
+HEYGEN_ERRORS_TOTAL = Counter(
+    "heygen_errors_total",
+    "Failed HeyGen API calls by HTTP status",
+    ["endpoint", "status"],
+)
+HEYGEN_RENDERS_IN_FLIGHT = Gauge(
+    "heygen_renders_in_flight",
+    "Videos submitted to HeyGen and awaiting their completion webhook",
+)
+HEYGEN_RENDER_QUEUE_DEPTH = Gauge(
+    "heygen_render_queue_depth",
+    "Videos waiting for HeyGen render capacity",
+)
+VIDEO_EVENT_SUBSCRIBERS = Gauge(
+    "video_event_subscribers",
+    "Open video status subscriptions",
+)
+HEYGEN_WEBHOOK_LAG_SECONDS = Histogram(
+    "heygen_webhook_lag_seconds",
+    "Time from HeyGen submission to the completion webhook",
+    ["event_type"],
+    buckets=(30, 60, 120, 300, 600, 900, 1800, 3600, 7200),
+)
+
+
+def stage_timer(stage: str):
+    """Time a pipeline stage, e.g. `with stage_timer("llm"): ...`"""
+    return PIPELINE_STAGE_SECONDS.time(stage=stage)
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format"""
+    return REGISTRY.render()
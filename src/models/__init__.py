@@ -1,3 +1,10 @@
 # models/__init__.py
 from src.models.base import BaseMixin
-from src.models.video import Video
+from src.models.video import Video, VideoEventLog
+from src.models.cohort import (
+    CohortScore,
+    CohortScoreStats,
+    JobLease,
+    ScoreSketch,
+    SyncWatermark,
+)
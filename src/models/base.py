@@ -1,11 +1,10 @@
 # src/models/base.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, Uuid
 
 
 class BaseMixin:
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     created_on = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_on = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
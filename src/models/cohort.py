@@ -0,0 +1,126 @@
+# src/models/cohort.py
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+)
+
+from src.database import Base
+from src.models.types import CompressedJSON
+
+# cohort_id of the sketches covering every cohort on a package
+ALL_COHORTS = 0
+
+
+class CohortScore(Base):
+    """
+    Scores of one student deployment, materialized from the ITP database
+    together with its standing in the (cohort, package) group
+    """
+
+    __tablename__ = "cohort_scores"
+
+    student_deployment_id = Column(Integer, primary_key=True)
+    cohort_id = Column(Integer, nullable=False)
+    deployment_package_id = Column(Integer, nullable=False)
+    student_id = Column(Integer, nullable=False)
+    acc_score = Column(Float, nullable=True)
+    otd_score = Column(Float, nullable=True)
+    opt_score = Column(Float, nullable=True)
+    func_score = Column(Float, nullable=True)
+    # Competition rank by acc_score, 1 is the highest. Null when ungraded.
+    rank = Column(Integer, nullable=True)
+    # Graded deployments in the group with acc_score <= this one
+    students_below_or_equal = Column(Integer, nullable=True)
+    # ITP modified timestamp of the deployment this row was built from
+    source_modified = Column(DateTime, nullable=False)
+    updated_on = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_cohort_scores_group_rank",
+            "cohort_id",
+            "deployment_package_id",
+            "rank",
+        ),
+    )
+
+
+class CohortScoreStats(Base):
+    """Aggregates of the graded deployments of one (cohort, package) group"""
+
+    __tablename__ = "cohort_score_stats"
+
+    cohort_id = Column(Integer, primary_key=True)
+    deployment_package_id = Column(Integer, primary_key=True)
+    total_students = Column(Integer, nullable=False, default=0)
+    avg_acc_score = Column(Float, nullable=True)
+    avg_otd_score = Column(Float, nullable=True)
+    avg_opt_score = Column(Float, nullable=True)
+    avg_func_score = Column(Float, nullable=True)
+    # Incremented whenever the group's scores change
+    version = Column(Integer, nullable=False, default=1)
+    refreshed_on = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ScoreSketch(Base):
+    """
+    Quantile sketches of the graded scores of one (cohort, package) group,
+    or of every cohort on the package when cohort_id is ALL_COHORTS
+    """
+
+    __tablename__ = "score_sketches"
+
+    deployment_package_id = Column(Integer, primary_key=True)
+    cohort_id = Column(Integer, primary_key=True)
+    total_deployments = Column(Integer, nullable=False, default=0)
+    # Serialized KLLSketch per score field
+    sketches = Column(CompressedJSON, nullable=False)
+    # Incremented whenever the sketches are rebuilt
+    version = Column(Integer, nullable=False, default=1)
+    updated_on = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+
+class SyncWatermark(Base):
+    """How far a local copy has been synced from the ITP database"""
+
+    __tablename__ = "sync_watermarks"
+
+    name = Column(String, primary_key=True)
+    # Latest ITP modified timestamp applied
+    modified = Column(DateTime, nullable=False)
+    updated_on = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+
+class JobLease(Base):
+    """
+    Which worker runs a periodic job, so workers sharing the store do not
+    all run it. The holder renews the lease while it is alive; once it
+    expires, any worker may take it over.
+    """
+
+    __tablename__ = "job_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_on = Column(DateTime, nullable=False)
@@ -0,0 +1,66 @@
+# src/models/types.py
+import json
+import zlib
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_text(value: str) -> bytes:
+    return zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(value) -> str:
+    """
+    Decompress a stored value. Rows written before the column was
+    compressed come back as plain text and are returned unchanged.
+    """
+    if isinstance(value, str):
+        return value
+    try:
+        return zlib.decompress(value).decode("utf-8")
+    except zlib.error:
+        return bytes(value).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text stored zlib-compressed in a binary column"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_text(value)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON document stored zlib-compressed in a binary column"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Already serialized documents are stored as they are
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        document = json.loads(decompress_text(value))
+        # Older rows hold a JSON string containing the document
+        if isinstance(document, str):
+            document = json.loads(document)
+        return document
@@ -8,13 +8,15 @@ from sqlalchemy import (
     Integer,
     String,
     JSON,
-    ForeignKey
+    ForeignKey,
+    UniqueConstraint,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from src.database import Base
 from src.models.base import BaseMixin
+from src.models.types import CompressedJSON, CompressedText
 from src.schema.video import VideoStatus, ScriptStatus
 
 
@@ -29,9 +31,13 @@ class DeploymentPackageExt(Base):
         Integer, unique=True, nullable=False, primary_key=True
     )
     heygen_template_id = Column(
-        Integer, ForeignKey("heygen_templates.id"), nullable=True
+        Uuid, ForeignKey("heygen_templates.id"), nullable=True
     )
     prompt_template = Column(String, nullable=False)
+    # Payload sections each script scene is written from, e.g.
+    # {"scene_3": ["component:Frontend"]}. Unlisted scenes depend on
+    # every section, see src.services.dialogue.script.
+    scene_inputs = Column(JSON, nullable=True)
     created_on = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_on = Column(
         DateTime,
@@ -51,21 +57,67 @@ class Script(Base, BaseMixin):
     __tablename__ = "scripts"
 
     student_deployment_id = Column(Integer, unique=True, nullable=False)
-    prompt_used = Column(String, nullable=False)
-    scene_dialogue = Column(JSON, nullable=False)
+    # Large documents, compressed and only loaded when accessed.
+    # Both load together on first access.
+    prompt_used = deferred(
+        Column(CompressedText, nullable=False), group="content"
+    )
+    scene_dialogue = deferred(
+        Column(CompressedJSON, nullable=False), group="content"
+    )
     status = Column(String, nullable=False, default=ScriptStatus.PENDING)
+    # Incremented on every regeneration
+    version = Column(Integer, nullable=False, default=1)
+
+
+class ScriptScene(Base, BaseMixin):
+    """One version of one scene of a script"""
+
+    __tablename__ = "script_scenes"
+
+    script_id = Column(Uuid, ForeignKey("scripts.id"), nullable=False)
+    scene = Column(String, nullable=False)
+    version = Column(Integer, nullable=False)
+    dialogue = deferred(Column(CompressedText, nullable=False))
+    # Digest of the payload sections the scene was written from
+    input_fingerprint = Column(String(64), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("script_id", "scene", "version"),
+    )
 
 
-# TODO: Add heygen submission date to video
 class Video(Base, BaseMixin):
     __tablename__ = "videos"
 
     student_deployment_id = Column(Integer, nullable=False)
-    script_id = Column(UUID(as_uuid=True), ForeignKey("scripts.id"), nullable=False)
+    script_id = Column(Uuid, ForeignKey("scripts.id"), nullable=False)
     heygen_video_id = Column(String, nullable=True)
     video_url = Column(String, nullable=True)
-    status = Column(String, nullable=False, default=VideoStatus.PENDING)
+    status = Column(
+        String, nullable=False, default=VideoStatus.PENDING, index=True
+    )
     callback_id = Column(String, nullable=True)
+    submitted_on = Column(DateTime, nullable=True)
+    # Template ID and payload of a submission waiting for render capacity
+    heygen_request = deferred(Column(CompressedJSON, nullable=True))
+
+
+class VideoEventLog(Base):
+    """
+    Video status changes shared between workers that do not receive the
+    webhook, see src.services.events. Kept for VIDEO_EVENTS_RETENTION_SECONDS.
+    """
+
+    __tablename__ = "video_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Worker that published the event
+    origin = Column(String(32), nullable=False)
+    event = Column(JSON, nullable=False)
+    created_on = Column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
 
 
 class HeyGenTemplate(Base, BaseMixin):
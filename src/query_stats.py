@@ -0,0 +1,149 @@
+# src/query_stats.py
+"""
+SQLAlchemy statement instrumentation.
+
+Engine events time every statement, feed the metrics registry and log
+slow statements. While a request is being tracked, statements are also
+counted per request so repeated identical statements (N+1 patterns)
+can be reported.
+"""
+import time
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.logging_config import app_logger
+from src.metrics import Counter as MetricCounter, Histogram
+from src.settings import settings
+
+DB_STATEMENTS_TOTAL = MetricCounter(
+    "db_statements_total",
+    "SQL statements executed",
+    ["engine"],
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_seconds",
+    "SQL statement execution time",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DB_SLOW_STATEMENTS_TOTAL = MetricCounter(
+    "db_slow_statements_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS",
+    ["engine"],
+)
+DB_REPEATED_STATEMENTS_TOTAL = MetricCounter(
+    "db_repeated_statements_total",
+    "Requests repeating an identical statement REPEATED_QUERY_THRESHOLD times",
+    ["engine"],
+)
+DB_REQUEST_STATEMENTS = Histogram(
+    "db_request_statements",
+    "SQL statements issued per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+DB_REQUEST_SECONDS = Histogram(
+    "db_request_seconds",
+    "Total SQL time per HTTP request",
+    ["route"],
+)
+
+
+def _compact(statement: str, limit: int = 500) -> str:
+    """Collapse whitespace so statements fit on one log line"""
+    compacted = " ".join(statement.split())
+    return compacted if len(compacted) <= limit else compacted[:limit] + "..."
+
+
+class QueryStats:
+    """Statements issued while tracking one unit of work"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.total_time = 0.0
+        self.by_engine: Counter = Counter()
+        self.statements: Counter = Counter()
+        self.repeated: List[Tuple[str, str]] = []
+
+    def record(self, engine_name: str, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.by_engine[engine_name] += 1
+
+        key = (engine_name, statement)
+        self.statements[key] += 1
+        if self.statements[key] == settings.REPEATED_QUERY_THRESHOLD:
+            self.repeated.append(key)
+            DB_REPEATED_STATEMENTS_TOTAL.inc(engine=engine_name)
+            app_logger.warning(
+                f"Statement repeated {settings.REPEATED_QUERY_THRESHOLD} "
+                f"times in {self.label or 'one request'} (possible N+1) "
+                f"on {engine_name}: {_compact(statement)}"
+            )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Return the stats being collected for the current request, if any"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    """Collect statement counts and timings for the enclosed block"""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Time every statement executed on the engine.
+    Parameters are never logged, only their count, since they
+    carry student data.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        elapsed = time.perf_counter() - context._query_start_time
+
+        DB_STATEMENTS_TOTAL.inc(engine=name)
+        DB_STATEMENT_SECONDS.observe(elapsed, engine=name)
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            DB_SLOW_STATEMENTS_TOTAL.inc(engine=name)
+            parameter_count = (
+                len(parameters) if hasattr(parameters, "__len__") else 0
+            )
+            app_logger.warning(
+                f"Slow statement on {name} ({elapsed * 1000:.1f} ms, "
+                f"{parameter_count} parameters redacted"
+                f"{', executemany' if executemany else ''}): "
+                f"{_compact(statement)}"
+            )
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(name, statement, elapsed)
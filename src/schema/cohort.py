@@ -0,0 +1,73 @@
+# src/schema/cohort.py
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from src.schema.base import BaseResponse
+
+
+class LeaderboardEntry(BaseModel):
+    """One graded deployment in a cohort leaderboard"""
+    rank: int
+    student_deployment_id: int
+    student_id: int
+    acc_score: float
+    otd_score: Optional[float] = None
+    opt_score: Optional[float] = None
+    func_score: Optional[float] = None
+    percentile: float
+
+    class Config:
+        from_attributes = True
+
+
+class Leaderboard(BaseModel):
+    """Graded deployments of a cohort for one package, best first"""
+    cohort_id: int
+    deployment_package_id: int
+    total_students: int
+    cohort_avg_acc_score: Optional[float] = None
+    version: int
+    refreshed_on: Optional[datetime] = None
+    entries: List[LeaderboardEntry]
+
+
+class LeaderboardResponse(BaseResponse[Leaderboard]):
+    pass
+
+
+class ScoreHistogram(BaseModel):
+    """Counts of scores in equal-width bins over 0-100"""
+    bin_edges: List[float]
+    counts: List[int]
+
+
+class ScoreSummary(BaseModel):
+    """Distribution of one score column within a cohort"""
+    count: int
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    p25: Optional[float] = None
+    median: Optional[float] = None
+    p75: Optional[float] = None
+    max: Optional[float] = None
+    iqr: Optional[float] = None
+    histogram: ScoreHistogram
+
+
+class ScoreDistribution(BaseModel):
+    """Score distributions of a cohort for one package"""
+    cohort_id: int
+    deployment_package_id: int
+    version: int
+    total_deployments: int
+    metrics: Dict[str, ScoreSummary]
+    # Aligned lists: z_scores[metric][i] belongs to student_deployment_ids[i]
+    student_deployment_ids: Optional[List[int]] = None
+    z_scores: Optional[Dict[str, List[Optional[float]]]] = None
+
+
+class ScoreDistributionResponse(BaseResponse[ScoreDistribution]):
+    pass
@@ -1,6 +1,7 @@
 # src/schema/itp.py
-from typing import List, Optional
-from pydantic import BaseModel
+from functools import cached_property
+from typing import Dict, List, Optional, Set
+from pydantic import BaseModel, computed_field
 
 
 class StudentStepSummary(BaseModel):
@@ -101,14 +102,18 @@ class StudentDeployment(BaseModel):
     func_grading: Optional[str] = None
     func_score: Optional[float] = None
 
-    components_summary: Optional[List[StudentComponentSummary]] = []
-
     deployment_package: DeploymentPackage
 
     components: List[StudentDeploymentComponent]
 
     model_config = {"from_attributes": True}
 
+    @computed_field
+    @cached_property
+    def components_summary(self) -> List[StudentComponentSummary]:
+        """Summary of every component, derived on first use and cached"""
+        return [component.summary for component in self.components]
+
     def get_simple_components_text(self) -> str:
         """Return components as formatted text"""
         lines = []
@@ -165,6 +170,64 @@ class StudentDeployment(BaseModel):
         return "\n".join(lines)
 
 
+DEPLOYMENT_TEXT_FIELDS = {
+    "acc_grading", "otd_grading", "opt_grading", "func_grading"
+}
+COMPONENT_TEXT_FIELDS = {"description", "grading"}
+STEP_TEXT_FIELDS = {"grading", "grading_data", "objectives", "instructions"}
+
+
+class DeploymentProjection(BaseModel):
+    """
+    Text columns to fetch for a student deployment.
+    Ids, names and scores are always fetched; fields left out of the
+    projection are None on the resulting StudentDeployment.
+    """
+    deployment_fields: Set[str] = DEPLOYMENT_TEXT_FIELDS
+    component_fields: Set[str] = COMPONENT_TEXT_FIELDS
+    step_fields: Set[str] = STEP_TEXT_FIELDS
+
+    @classmethod
+    def full(cls) -> "DeploymentProjection":
+        """Every column, matching the historical behaviour"""
+        return cls()
+
+    @classmethod
+    def empty(cls) -> "DeploymentProjection":
+        """Only ids, names and scores"""
+        return cls(
+            deployment_fields=set(),
+            component_fields=set(),
+            step_fields=set(),
+        )
+
+    @property
+    def is_full(self) -> bool:
+        return (
+            self.deployment_fields >= DEPLOYMENT_TEXT_FIELDS
+            and self.component_fields >= COMPONENT_TEXT_FIELDS
+            and self.step_fields >= STEP_TEXT_FIELDS
+        )
+
+    def union(self, other: "DeploymentProjection") -> "DeploymentProjection":
+        """Projection fetching the fields needed by either projection"""
+        return DeploymentProjection(
+            deployment_fields=self.deployment_fields | other.deployment_fields,
+            component_fields=self.component_fields | other.component_fields,
+            step_fields=self.step_fields | other.step_fields,
+        )
+
+
+class MetricComparison(BaseModel):
+    """One of a student's scores compared to their cohort"""
+    score: Optional[float] = None
+    total_students: int
+    students_below_or_equal: int
+    cohort_avg: Optional[float] = None
+    percentile: Optional[float] = None
+    rank: str
+
+
 class CohortComparison(BaseModel):
     """Metrics comparing a student to their cohort"""
     total_students: int
@@ -172,6 +235,8 @@ class CohortComparison(BaseModel):
     cohort_avg_acc_score: float
     percentile: float
     rank: str
+    # Every score metric keyed by field name, e.g. "otd_score"
+    metrics: Dict[str, MetricComparison] = {}
 
     @property
     def formatted_percentile(self) -> str:
@@ -179,3 +244,24 @@ class CohortComparison(BaseModel):
         return (
             f"{self.percentile:.1f}" if self.percentile is not None else "N/A"
         )
+
+
+class ApproximateMetricComparison(BaseModel):
+    """One of a student's scores against a sketch of many cohorts"""
+    score: Optional[float] = None
+    total_deployments: int
+    percentile: Optional[float] = None
+
+
+class PackageComparison(BaseModel):
+    """
+    A student's scores compared to every cohort that took the package,
+    estimated from quantile sketches
+    """
+    deployment_package_id: int
+    total_deployments: int
+    # Percentiles are within this many points of the exact value
+    percentile_error: float
+    percentile: Optional[float] = None
+    # Every score metric keyed by field name, e.g. "otd_score"
+    metrics: Dict[str, ApproximateMetricComparison] = {}
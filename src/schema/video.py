@@ -1,7 +1,7 @@
 # src/schema/video.py
 import json
 
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
@@ -9,7 +9,11 @@ from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 
 from src.schema.base import BaseResponse
-from src.schema.itp import StudentDeployment, CohortComparison
+from src.schema.itp import (
+    CohortComparison,
+    PackageComparison,
+    StudentDeployment,
+)
 
 
 class VideoStatus(str, Enum):
@@ -21,6 +25,8 @@ class VideoStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     PENDING = "pending"
+    # Waiting for HeyGen render capacity, see HEYGEN_MAX_CONCURRENT_RENDERS
+    QUEUED = "queued"
 
 
 # Base Models for API Responses
@@ -36,8 +42,19 @@ class DBModelBase(TimeStampedModel):
         from_attributes = True
 
 
+class GenerationLane(str, Enum):
+    """Priority class of a video or script generation job, highest first"""
+    # Someone is waiting on the result
+    INTERACTIVE = "interactive"
+    # Bulk submissions, e.g. every deployment of a cohort
+    BATCH = "batch"
+    # Work done ahead of time, only on spare capacity
+    SPECULATIVE = "speculative"
+
+
 class CreateVideoRequest(BaseModel):
     student_deployment_id: int
+    priority: GenerationLane = GenerationLane.INTERACTIVE
 
 
 class HeyGenResponseData(BaseModel):
@@ -70,6 +87,20 @@ class VideoResponse(BaseResponse[VideoData]):
     pass
 
 
+class VideoEvent(BaseModel):
+    """Status change of a video, pushed to subscribers"""
+    video_id: UUID
+    student_deployment_id: int
+    cohort_id: Optional[int] = None
+    status: VideoStatus
+    video_url: Optional[str] = None
+    occurred_on: datetime
+
+
+class VideoListResponse(BaseResponse[List[VideoData]]):
+    pass
+
+
 class HeyGenVariableProperties(BaseModel):
     content: str
 
@@ -112,6 +143,7 @@ class Script(BaseModel):
     prompt_used: str
     scene_dialogue: Dict[str, Any] = Field(default_factory=dict)
     status: ScriptStatus = ScriptStatus.PENDING
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -132,7 +164,15 @@ class ScriptRequestPayload(BaseModel):
     """Data needed to generate a script"""
     prompt: str
     student_deployment: StudentDeployment
-    cohort_comparison: CohortComparison
+    # None when the deployment has not been graded
+    cohort_comparison: Optional[CohortComparison] = None
+    # Estimated standing among every cohort on the package
+    package_comparison: Optional[PackageComparison] = None
+    # The package's scene dependencies (DeploymentPackageExt.scene_inputs).
+    # Not part of the prompt.
+    scene_inputs: Optional[Dict[str, List[str]]] = Field(
+        default=None, exclude=True, repr=False
+    )
 
 
 class HeyGenEventData(BaseModel):
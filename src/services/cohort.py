@@ -0,0 +1,615 @@
+# src/services/cohort.py
+import asyncio
+import bisect
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.db import select_deployment_scores
+from src.database import SessionLocalSQLite
+from src.logging_config import app_logger
+from src.models.cohort import (
+    ALL_COHORTS,
+    CohortScore,
+    CohortScoreStats,
+    ScoreSketch,
+    SyncWatermark,
+)
+from src.schema.cohort import Leaderboard, LeaderboardEntry
+from src.schema.itp import (
+    ApproximateMetricComparison,
+    CohortComparison,
+    MetricComparison,
+    PackageComparison,
+    StudentDeployment,
+)
+from src.services.leases import hand_over, leased
+from src.services.sketch import KLLSketch
+from src.settings import settings
+
+COHORT_SCORES_WATERMARK = "cohort_scores"
+
+SCORE_FIELDS = ("acc_score", "otd_score", "opt_score", "func_score")
+
+Group = Tuple[int, int]
+
+
+def _get_ordinal_suffix(n: int) -> str:
+    """Return the ordinal suffix for a number."""
+    if 11 <= n % 100 <= 13:
+        return "th"
+    else:
+        return {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+
+
+def build_metric_comparison(
+    score: Optional[float],
+    total_students: int,
+    students_below_or_equal: int,
+    cohort_avg: Optional[float],
+) -> MetricComparison:
+    """Format the standing of one of a student's scores within their cohort"""
+    if score is None or total_students == 0:
+        return MetricComparison(
+            score=score,
+            total_students=total_students,
+            students_below_or_equal=0,
+            cohort_avg=(
+                round(cohort_avg, 2) if cohort_avg is not None else None
+            ),
+            percentile=None if score is None else 0.0,
+            rank="N/A",
+        )
+
+    percentile = (students_below_or_equal / total_students) * 100
+    rank_ordinal = _get_ordinal_suffix(students_below_or_equal)
+    return MetricComparison(
+        score=score,
+        total_students=total_students,
+        students_below_or_equal=students_below_or_equal,
+        cohort_avg=round(cohort_avg, 2),
+        percentile=round(percentile, 1),
+        rank=f"{students_below_or_equal}{rank_ordinal} out of {total_students}",
+    )
+
+
+def build_cohort_comparison(
+    total_students: int,
+    students_below_or_equal: int,
+    cohort_avg_acc_score: float,
+    metrics: Optional[Dict[str, MetricComparison]] = None,
+) -> CohortComparison:
+    """Format the standing of a student within their cohort"""
+    if total_students == 0:
+        return CohortComparison(
+            total_students=0,
+            students_below_or_equal=0,
+            cohort_avg_acc_score=0.0,
+            percentile=0.0,
+            rank="N/A",
+            metrics=metrics or {},
+        )
+
+    percentile = (students_below_or_equal / total_students) * 100
+    rank_ordinal = _get_ordinal_suffix(students_below_or_equal)
+    rank = f"{students_below_or_equal}{rank_ordinal} out of {total_students}"
+
+    return CohortComparison(
+        total_students=total_students,
+        students_below_or_equal=students_below_or_equal,
+        cohort_avg_acc_score=round(cohort_avg_acc_score, 2),
+        percentile=round(percentile, 1),
+        rank=rank,
+        metrics=metrics or {},
+    )
+
+
+def compare_scores(
+    student_scores: Sequence[Optional[float]],
+    cohort_scores: np.ndarray,
+) -> CohortComparison:
+    """
+    Compare a student's scores with their cohort on every metric in one
+    vectorized pass.
+
+    Args:
+        student_scores: The student's scores in SCORE_FIELDS order
+        cohort_scores: Scores of the cohort's graded deployments, shape
+            (n, len(SCORE_FIELDS)) in SCORE_FIELDS order, NaN when missing
+
+    Returns:
+        CohortComparison with the accuracy standing at the top level and
+        every metric in `metrics`
+    """
+    student = np.array(student_scores, dtype=float)
+    valid = ~np.isnan(cohort_scores)
+
+    # NaN compares False, so missing scores are never counted
+    totals = valid.sum(axis=0)
+    below_or_equal = (cohort_scores <= student).sum(axis=0)
+    sums = np.where(valid, cohort_scores, 0.0).sum(axis=0)
+    averages = np.divide(
+        sums, totals, out=np.full(sums.shape, np.nan), where=totals > 0
+    )
+
+    metrics = {}
+    for column, field in enumerate(SCORE_FIELDS):
+        average = averages[column]
+        metrics[field] = build_metric_comparison(
+            student_scores[column],
+            int(totals[column]),
+            int(below_or_equal[column]),
+            None if np.isnan(average) else float(average),
+        )
+
+    accuracy = metrics["acc_score"]
+    return build_cohort_comparison(
+        accuracy.total_students,
+        accuracy.students_below_or_equal,
+        accuracy.cohort_avg or 0.0,
+        metrics=metrics,
+    )
+
+
+def load_group_scores(
+    cohort_id: int,
+    package_id: int,
+    db: Session,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load a group's score columns from cohort_scores in one query. The
+    statement runs on the session's connection directly, skipping ORM
+    result processing.
+
+    Returns:
+        Deployment ids of shape (n,) in ascending order and scores of
+        shape (n, len(SCORE_FIELDS)) in SCORE_FIELDS order, NaN when missing
+    """
+    rows = db.connection().execute(
+        select(
+            CohortScore.student_deployment_id,
+            *(getattr(CohortScore, field) for field in SCORE_FIELDS),
+        )
+        .where(
+            CohortScore.cohort_id == cohort_id,
+            CohortScore.deployment_package_id == package_id,
+        )
+        .order_by(CohortScore.student_deployment_id)
+    ).all()
+
+    table = np.array(
+        [tuple(row) for row in rows], dtype=float
+    ).reshape(len(rows), len(SCORE_FIELDS) + 1)
+    return table[:, 0].astype(np.int64), table[:, 1:]
+
+
+def get_cohort_comparison(
+    student_deployment: StudentDeployment,
+    db: Session,
+) -> Optional[CohortComparison]:
+    """
+    Compare a student with their cohort on every metric, reading the
+    group's scores from the local cohort_scores table with one query.
+
+    Returns:
+        CohortComparison, or None when the deployment has not been
+        materialized yet or its scores changed since the last refresh
+    """
+    student_scores = [
+        getattr(student_deployment, field) for field in SCORE_FIELDS
+    ]
+    ids, scores = load_group_scores(
+        student_deployment.cohort.id,
+        student_deployment.deployment_package.id,
+        db,
+    )
+
+    position = np.searchsorted(ids, student_deployment.id)
+    if (
+        position == len(ids)
+        or ids[position] != student_deployment.id
+        or not np.array_equal(
+            scores[position],
+            np.array(student_scores, dtype=float),
+            equal_nan=True,
+        )
+    ):
+        return None
+
+    # Only graded deployments are ranked
+    graded = scores[~np.isnan(scores[:, 0])]
+    return compare_scores(student_scores, graded)
+
+
+def get_package_comparison(
+    student_deployment: StudentDeployment,
+    db: Session,
+) -> Optional[PackageComparison]:
+    """
+    Estimate where a student stands among every cohort that took their
+    package, from the package's score sketches. Costs one primary key
+    lookup however many deployments the package has.
+
+    Returns:
+        PackageComparison, or None if the package has not been sketched
+    """
+    row: Optional[ScoreSketch] = db.get(
+        ScoreSketch,
+        (student_deployment.deployment_package.id, ALL_COHORTS),
+    )
+    if row is None or not row.total_deployments:
+        return None
+
+    metrics = {}
+    rank_error = 0.0
+    for field in SCORE_FIELDS:
+        sketch = KLLSketch.from_dict(row.sketches[field])
+        score = getattr(student_deployment, field)
+        percentile = None
+        if score is not None and sketch.n:
+            percentile = round(sketch.cdf(score) * 100, 1)
+        metrics[field] = ApproximateMetricComparison(
+            score=score,
+            total_deployments=sketch.n,
+            percentile=percentile,
+        )
+        rank_error = max(rank_error, sketch.rank_error)
+
+    return PackageComparison(
+        deployment_package_id=row.deployment_package_id,
+        total_deployments=row.total_deployments,
+        percentile_error=round(rank_error * 100, 2),
+        percentile=metrics["acc_score"].percentile,
+        metrics=metrics,
+    )
+
+
+def get_leaderboard(
+    cohort_id: int,
+    package_id: int,
+    db: Session,
+    limit: int = 50,
+    offset: int = 0,
+) -> Optional[Leaderboard]:
+    """
+    Graded deployments of a cohort for one package, best first.
+
+    Returns:
+        Leaderboard, or None if the group has not been materialized
+    """
+    stats: Optional[CohortScoreStats] = db.get(
+        CohortScoreStats, (cohort_id, package_id)
+    )
+    if stats is None:
+        return None
+
+    rows = db.execute(
+        select(CohortScore)
+        .where(
+            CohortScore.cohort_id == cohort_id,
+            CohortScore.deployment_package_id == package_id,
+            CohortScore.rank.is_not(None),
+        )
+        .order_by(CohortScore.rank, CohortScore.student_deployment_id)
+        .limit(limit)
+        .offset(offset)
+    ).scalars().all()
+
+    entries = [
+        LeaderboardEntry(
+            rank=row.rank,
+            student_deployment_id=row.student_deployment_id,
+            student_id=row.student_id,
+            acc_score=row.acc_score,
+            otd_score=row.otd_score,
+            opt_score=row.opt_score,
+            func_score=row.func_score,
+            percentile=round(
+                row.students_below_or_equal / stats.total_students * 100, 1
+            ),
+        )
+        for row in rows
+    ]
+
+    return Leaderboard(
+        cohort_id=cohort_id,
+        deployment_package_id=package_id,
+        total_students=stats.total_students,
+        cohort_avg_acc_score=(
+            round(stats.avg_acc_score, 2)
+            if stats.avg_acc_score is not None else None
+        ),
+        version=stats.version,
+        refreshed_on=stats.refreshed_on,
+        entries=entries,
+    )
+
+
+def _upsert_scores(db: Session, rows: List[dict]) -> Set[Group]:
+    """
+    Write a batch of deployment scores.
+
+    Returns:
+        The groups whose membership or scores may have changed,
+        including the previous group of deployments that moved cohort
+    """
+    ids = [row["student_deployment_id"] for row in rows]
+    existing = {
+        score.student_deployment_id: score
+        for score in db.execute(
+            select(CohortScore).where(
+                CohortScore.student_deployment_id.in_(ids)
+            )
+        ).scalars()
+    }
+
+    affected: Set[Group] = set()
+    for row in rows:
+        group = (row["cohort_id"], row["deployment_package_id"])
+        score = existing.get(row["student_deployment_id"])
+        if score is None:
+            db.add(CohortScore(**row))
+            affected.add(group)
+            continue
+
+        previous_group = (score.cohort_id, score.deployment_package_id)
+        changed = previous_group != group or any(
+            getattr(score, field) != row[field] for field in SCORE_FIELDS
+        )
+        for field, value in row.items():
+            setattr(score, field, value)
+        if changed:
+            affected.add(previous_group)
+            affected.add(group)
+
+    db.flush()
+    return affected
+
+
+def _rank_group(db: Session, group: Group):
+    """Recompute ranks and aggregates of one (cohort, package) group"""
+    cohort_id, package_id = group
+    rows = db.execute(
+        select(
+            CohortScore.student_deployment_id,
+            *(getattr(CohortScore, field) for field in SCORE_FIELDS),
+        ).where(
+            CohortScore.cohort_id == cohort_id,
+            CohortScore.deployment_package_id == package_id,
+        )
+    ).all()
+
+    graded = sorted(row.acc_score for row in rows if row.acc_score is not None)
+    total = len(graded)
+
+    updates = []
+    for row in rows:
+        if row.acc_score is None:
+            rank = students_below_or_equal = None
+        else:
+            # Competition ranking: ties share the best rank
+            rank = total - bisect.bisect_right(graded, row.acc_score) + 1
+            students_below_or_equal = bisect.bisect_right(
+                graded, row.acc_score
+            )
+        updates.append({
+            "student_deployment_id": row.student_deployment_id,
+            "rank": rank,
+            "students_below_or_equal": students_below_or_equal,
+        })
+    if updates:
+        db.execute(update(CohortScore), updates)
+
+    averages: Dict[str, Optional[float]] = {}
+    for field in SCORE_FIELDS:
+        values = [
+            getattr(row, field) for row in rows
+            if row.acc_score is not None and getattr(row, field) is not None
+        ]
+        averages[f"avg_{field}"] = (
+            sum(values) / len(values) if values else None
+        )
+
+    stats = db.get(CohortScoreStats, group)
+    if stats is None:
+        stats = CohortScoreStats(
+            cohort_id=cohort_id,
+            deployment_package_id=package_id,
+            version=0,
+        )
+        db.add(stats)
+    stats.total_students = total
+    for field, value in averages.items():
+        setattr(stats, field, value)
+    stats.version += 1
+    stats.refreshed_on = datetime.utcnow()
+
+
+def _save_sketches(
+    db: Session,
+    package_id: int,
+    cohort_id: int,
+    total_deployments: int,
+    sketches: Dict[str, KLLSketch],
+):
+    row = db.get(ScoreSketch, (package_id, cohort_id))
+    if row is None:
+        row = ScoreSketch(
+            deployment_package_id=package_id,
+            cohort_id=cohort_id,
+            version=0,
+        )
+        db.add(row)
+    row.total_deployments = total_deployments
+    row.sketches = {
+        field: sketch.to_dict() for field, sketch in sketches.items()
+    }
+    row.version += 1
+
+
+def _sketch_groups(db: Session, groups: Iterable[Group]):
+    """
+    Rebuild the score sketches of (cohort, package) groups from
+    cohort_scores, then merge each touched package's cohort sketches
+    into its ALL_COHORTS sketch
+    """
+    k = settings.SCORE_SKETCH_K
+    packages: Set[int] = set()
+    for cohort_id, package_id in groups:
+        _, scores = load_group_scores(cohort_id, package_id, db)
+        graded = scores[~np.isnan(scores[:, 0])]
+        sketches = {}
+        for column, field in enumerate(SCORE_FIELDS):
+            values = graded[:, column]
+            sketches[field] = KLLSketch(k=k)
+            sketches[field].update_many(values[~np.isnan(values)])
+        _save_sketches(db, package_id, cohort_id, len(graded), sketches)
+        packages.add(package_id)
+    db.flush()
+
+    for package_id in sorted(packages):
+        cohort_rows = db.execute(
+            select(ScoreSketch).where(
+                ScoreSketch.deployment_package_id == package_id,
+                ScoreSketch.cohort_id != ALL_COHORTS,
+            )
+        ).scalars().all()
+
+        merged = {field: KLLSketch(k=k) for field in SCORE_FIELDS}
+        for row in cohort_rows:
+            for field in SCORE_FIELDS:
+                merged[field].merge(KLLSketch.from_dict(row.sketches[field]))
+        _save_sketches(
+            db,
+            package_id,
+            ALL_COHORTS,
+            sum(row.total_deployments for row in cohort_rows),
+            merged,
+        )
+
+
+def _unsketched_groups(db: Session) -> Set[Group]:
+    """Groups ranked before score sketches existed"""
+    rows = db.execute(
+        select(
+            CohortScoreStats.cohort_id,
+            CohortScoreStats.deployment_package_id,
+        )
+        .outerjoin(
+            ScoreSketch,
+            and_(
+                ScoreSketch.deployment_package_id
+                == CohortScoreStats.deployment_package_id,
+                ScoreSketch.cohort_id == CohortScoreStats.cohort_id,
+            ),
+        )
+        .where(ScoreSketch.cohort_id.is_(None))
+    ).all()
+    return {(row.cohort_id, row.deployment_package_id) for row in rows}
+
+
+def _batches(rows: Iterable, size: int) -> Iterable[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def refresh_cohort_scores(db: Session) -> int:
+    """
+    Bring the local cohort_scores table up to date with the ITP database.
+    Only deployments modified since the last refresh are read, with an
+    overlap to catch rows committed late, and only the groups they touch
+    are re-ranked.
+
+    Returns:
+        Number of deployment rows read from the ITP database
+    """
+    watermark: Optional[SyncWatermark] = db.get(
+        SyncWatermark, COHORT_SCORES_WATERMARK
+    )
+    modified_since = None
+    latest = None
+    if watermark is not None:
+        latest = watermark.modified
+        modified_since = latest - timedelta(
+            seconds=settings.LEADERBOARD_REFRESH_OVERLAP_SECONDS
+        )
+
+    count = 0
+    affected: Set[Group] = set()
+    for batch in _batches(
+        select_deployment_scores(modified_since=modified_since),
+        settings.LEADERBOARD_REFRESH_BATCH_SIZE,
+    ):
+        rows = []
+        for row in batch:
+            modified = max(row.modified, row.student_modified)
+            latest = modified if latest is None else max(latest, modified)
+            rows.append({
+                "student_deployment_id": row.student_deployment_id,
+                "cohort_id": row.cohort_id,
+                "deployment_package_id": row.deployment_package_id,
+                "student_id": row.student_id,
+                "source_modified": row.modified,
+                **{field: getattr(row, field) for field in SCORE_FIELDS},
+            })
+        affected |= _upsert_scores(db, rows)
+        count += len(rows)
+        # Keep the identity map small on a full load
+        db.expunge_all()
+
+    for group in sorted(affected):
+        _rank_group(db, group)
+    db.flush()
+    _sketch_groups(db, sorted(affected | _unsketched_groups(db)))
+
+    if latest is not None:
+        watermark = db.get(SyncWatermark, COHORT_SCORES_WATERMARK)
+        if watermark is None:
+            watermark = SyncWatermark(name=COHORT_SCORES_WATERMARK)
+            db.add(watermark)
+        watermark.modified = latest
+
+    db.commit()
+
+    app_logger.info(
+        f"Refreshed cohort scores: {count} deployments read, "
+        f"{len(affected)} groups re-ranked"
+    )
+    return count
+
+
+def _refresh_in_new_session() -> int:
+    db = SessionLocalSQLite()
+    try:
+        return refresh_cohort_scores(db)
+    finally:
+        db.close()
+
+
+async def run_periodic_refresh(interval: float):
+    """
+    Refresh cohort scores every `interval` seconds, off the event loop.
+    Only the worker holding the cohort_scores lease refreshes.
+    """
+    try:
+        while True:
+            try:
+                async with leased(COHORT_SCORES_WATERMARK, interval) as held:
+                    if held:
+                        await asyncio.to_thread(_refresh_in_new_session)
+            except Exception as e:
+                app_logger.error(f"Cohort score refresh failed: {str(e)}")
+            await asyncio.sleep(interval)
+    finally:
+        hand_over(COHORT_SCORES_WATERMARK)
@@ -1,17 +1,59 @@
 # src/services/dialogue/chains.py
+import asyncio
+
+from contextlib import asynccontextmanager
+from typing import Optional
+from weakref import WeakKeyDictionary
+
 from langchain_community.chat_models import ChatOpenAI
 from langchain.chains import LLMChain
 from langchain.prompts import ChatPromptTemplate
 from src.settings import settings
 from src.logging_config import app_logger
 
+SYSTEM_PROMPT = "You are a script generator for educational feedback videos."
+
+OUTLINE_PROMPT = """{prompt}
+
+Before the script is written, plan it. Return only a JSON object with one
+key per scene of the script, in order, each mapped to one or two sentences
+on what that scene covers."""
+
+SCENE_PROMPT = """{prompt}
+
+The script is planned as follows:
+{outline}
+{context}
+Write the dialogue of {scene} only: {scene_outline}
+Return only the spoken text of that scene, without a heading."""
+
+# One limiter per event loop: asyncio primitives cannot be shared
+# between loops
+_llm_limiters: WeakKeyDictionary = WeakKeyDictionary()
+
 
-def create_chat_model() -> ChatOpenAI:
+@asynccontextmanager
+async def llm_slot():
+    """
+    Hold one of the LLM_MAX_CONCURRENCY slots shared by every LLM call
+    of this process, e.g. `async with llm_slot(): await chain.arun(...)`
+    """
+    loop = asyncio.get_running_loop()
+    limiter = _llm_limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        _llm_limiters[loop] = limiter
+    async with limiter:
+        yield
+
+
+def create_chat_model(max_tokens: Optional[int] = None) -> ChatOpenAI:
     """Initialize ChatGPT model"""
     return ChatOpenAI(
         temperature=0,
         model_name="gpt-4o",
-        api_key=settings.OPENAI_API_KEY
+        api_key=settings.OPENAI_API_KEY,
+        max_tokens=max_tokens,
     )
 
 
@@ -24,9 +66,39 @@ def create_script_chain() -> LLMChain:
             [
                 (
                     "system",
-                    "You are a script generator for educational feedback videos.",
+                    SYSTEM_PROMPT,
                 ),
                 ("human", "{prompt}"),
             ]
         ),
     )
+
+
+def create_outline_chain() -> LLMChain:
+    """Create chain planning the scenes of a script"""
+    chat: ChatOpenAI = create_chat_model(
+        max_tokens=settings.SCRIPT_OUTLINE_MAX_TOKENS
+    )
+    return LLMChain(
+        llm=chat,
+        prompt=ChatPromptTemplate.from_messages(
+            [
+                ("system", SYSTEM_PROMPT),
+                ("human", OUTLINE_PROMPT),
+            ]
+        ),
+    )
+
+
+def create_scene_chain() -> LLMChain:
+    """Create chain writing one scene of an outlined script"""
+    chat: ChatOpenAI = create_chat_model()
+    return LLMChain(
+        llm=chat,
+        prompt=ChatPromptTemplate.from_messages(
+            [
+                ("system", SYSTEM_PROMPT),
+                ("human", SCENE_PROMPT),
+            ]
+        ),
+    )
@@ -0,0 +1,176 @@
+# src/services/dialogue/pregeneration.py
+"""
+Generate scripts ahead of time for deployments that were just graded, so
+the LLM is off the critical path when their video is requested.
+
+Each poll reads the deployments modified in the ITP database since the
+script_pregeneration watermark and runs the script generation for the
+graded ones, one at a time in the speculative lane of the generation
+scheduler, so it only uses capacity that requests leave free. With
+several workers, only the one holding the script_pregeneration lease polls.
+A script whose inputs did not change is reused by generate() without an
+LLM call, so re-reading a deployment is cheap.
+"""
+import asyncio
+
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.db import (
+    select_deployment_scores,
+    select_latest_deployment_modified,
+)
+from src.database import SessionLocalSQLite
+from src.logging_config import app_logger
+from src.metrics import SCRIPT_PREGENERATIONS_TOTAL
+from src.models.cohort import SyncWatermark
+from src.models.video import DeploymentPackageExt
+from src.services.dialogue.script import generate as generate_script
+from src.schema.video import GenerationLane
+from src.services.dialogue.video import load_script_request_payload
+from src.services.leases import hand_over, leased
+from src.services.scheduler import get_scheduler
+from src.settings import settings
+
+SCRIPT_PREGENERATION_WATERMARK = "script_pregeneration"
+
+
+class GradedDeployment(NamedTuple):
+    student_deployment_id: int
+    cohort_id: int
+    modified: datetime
+    student_modified: datetime
+
+
+def select_graded_since(
+    modified_since: datetime,
+    package_ids: set,
+) -> List[GradedDeployment]:
+    """
+    Graded deployments of packages with a prompt template, modified at or
+    after a time, oldest change first. Read in full so no ITP connection
+    is held while scripts are written.
+    """
+    return [
+        GradedDeployment(
+            row.student_deployment_id,
+            row.cohort_id,
+            row.modified,
+            row.student_modified,
+        )
+        for row in select_deployment_scores(modified_since=modified_since)
+        if row.acc_score is not None
+        and row.deployment_package_id in package_ids
+    ]
+
+
+async def pregenerate(student_deployment_id: int, db: Session) -> bool:
+    """
+    Generate or bring up to date the script of one deployment.
+
+    Returns:
+        False if the deployment no longer exists
+    """
+    payload = await load_script_request_payload(student_deployment_id, db)
+    if payload is None:
+        return False
+    await generate_script(payload, db)
+    return True
+
+
+async def pregenerate_scripts(db: Session) -> int:
+    """
+    Pre-generate scripts for deployments graded since the last poll. The
+    first poll only sets the watermark: deployments graded before the
+    poller ran are left to on-demand generation.
+
+    Returns:
+        Number of deployments processed
+    """
+    watermark: Optional[SyncWatermark] = db.get(
+        SyncWatermark, SCRIPT_PREGENERATION_WATERMARK
+    )
+    if watermark is None:
+        latest = await asyncio.to_thread(select_latest_deployment_modified)
+        if latest is not None:
+            db.add(SyncWatermark(
+                name=SCRIPT_PREGENERATION_WATERMARK, modified=latest
+            ))
+            db.commit()
+        return 0
+
+    package_ids = set(db.execute(
+        select(DeploymentPackageExt.deployment_package_id)
+    ).scalars())
+    # Same overlap as the leaderboard refresh, to catch late commits
+    graded = await asyncio.to_thread(
+        select_graded_since,
+        watermark.modified - timedelta(
+            seconds=settings.LEADERBOARD_REFRESH_OVERLAP_SECONDS
+        ),
+        package_ids,
+    )
+    scheduler = get_scheduler()
+    for deployment in graded:
+        try:
+            async with scheduler.slot(
+                GenerationLane.SPECULATIVE, deployment.cohort_id
+            ):
+                found = await pregenerate(
+                    deployment.student_deployment_id, db
+                )
+            outcome = "complete" if found else "skipped"
+        except Exception as e:
+            db.rollback()
+            outcome = "failed"
+            app_logger.error(
+                f"Script pre-generation failed for deployment "
+                f"{deployment.student_deployment_id}: {str(e)}"
+            )
+        SCRIPT_PREGENERATIONS_TOTAL.inc(outcome=outcome)
+
+    if graded:
+        watermark = db.get(SyncWatermark, SCRIPT_PREGENERATION_WATERMARK)
+        watermark.modified = max(
+            watermark.modified,
+            *(max(d.modified, d.student_modified) for d in graded),
+        )
+        db.commit()
+
+        app_logger.info(
+            f"Pre-generated scripts for {len(graded)} newly graded "
+            f"deployments"
+        )
+    return len(graded)
+
+
+async def _pregenerate_in_new_session() -> int:
+    db = SessionLocalSQLite()
+    try:
+        return await pregenerate_scripts(db)
+    finally:
+        db.close()
+
+
+async def run_periodic_pregeneration(interval: float):
+    """
+    Pre-generate scripts every `interval` seconds. Only the worker holding
+    the script_pregeneration lease polls, so each newly graded deployment
+    costs one LLM call.
+    """
+    try:
+        while True:
+            try:
+                async with leased(
+                    SCRIPT_PREGENERATION_WATERMARK, interval
+                ) as held:
+                    if held:
+                        await _pregenerate_in_new_session()
+            except Exception as e:
+                app_logger.error(f"Script pre-generation failed: {str(e)}")
+            await asyncio.sleep(interval)
+    finally:
+        hand_over(SCRIPT_PREGENERATION_WATERMARK)
@@ -1,44 +1,341 @@
 # services/dialogue/script.py
+import asyncio
+import hashlib
 import json
 
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.models.video import Script as ORMScript
+from src.models.video import Script as ORMScript, ScriptScene
+from src.schema.itp import DeploymentProjection
 from src.schema.video import Script, ScriptRequestPayload, ScriptStatus
-from src.services.dialogue.chains import create_script_chain
+from src.services.dialogue.chains import (
+    create_outline_chain,
+    create_scene_chain,
+    create_script_chain,
+    llm_slot,
+)
 from src.logging_config import app_logger
+from src.metrics import LLM_TOKENS_TOTAL, SCRIPT_SCENES_TOTAL, stage_timer
+from src.settings import settings
 
+from langchain_community.callbacks import get_openai_callback
 from langchain_core.output_parsers.json import parse_json_markdown
 
 # TODO: This needs better handling of constructed prompt.
 
+# Deployment fields the script prompt uses: everything except the raw
+# grading data of each step
+SCRIPT_PROMPT_PROJECTION = DeploymentProjection(
+    step_fields={"grading", "objectives", "instructions"}
+)
+
+# Scenes without declared inputs are rewritten whenever anything changes
+ALL_SECTIONS = ["*"]
+
+SCENE_REGENERATION_PROMPT = """
+
+This student's script was written before and some of their results have
+changed since. Rewrite only these scenes: {scenes}. Return a JSON object
+with one key per rewritten scene. The other scenes stay as they are:
+{unchanged}"""
+
+
+def payload_sections(payload: ScriptRequestPayload) -> Dict[str, Any]:
+    """
+    Split the script prompt inputs into named sections that scenes can
+    depend on. Components are keyed "component:<category>".
+    """
+    student_deployment = payload.student_deployment
+    sections: Dict[str, Any] = {
+        "prompt": payload.prompt,
+        "student": student_deployment.student.model_dump(),
+        "cohort": student_deployment.cohort.model_dump(),
+        "deployment_package": (
+            student_deployment.deployment_package.model_dump()
+        ),
+        "scores": student_deployment.model_dump(include={
+            "acc_grading", "acc_score", "otd_grading", "otd_score",
+            "opt_grading", "opt_score", "func_grading", "func_score",
+        }),
+        "cohort_comparison": (
+            payload.cohort_comparison.model_dump()
+            if payload.cohort_comparison else None
+        ),
+        "package_comparison": (
+            payload.package_comparison.model_dump()
+            if payload.package_comparison else None
+        ),
+    }
+    for component in student_deployment.components:
+        sections.setdefault(
+            f"component:{component.component_category}", []
+        ).append(component.model_dump())
+    return sections
+
+
+def scene_fingerprints(
+    sections: Dict[str, Any],
+    scenes: Iterable[str],
+    scene_inputs: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, str]:
+    """
+    Digest of the sections each scene is written from. A scene's inputs
+    are glob patterns over section names; the prompt is always an input.
+
+    Returns:
+        Fingerprint per scene
+    """
+    # Each section is serialized once, scenes combine the digests
+    digests = {
+        name: hashlib.sha256(
+            json.dumps(section, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        for name, section in sorted(sections.items())
+    }
+    scene_inputs = scene_inputs or {}
+    fingerprints = {}
+    for scene in scenes:
+        patterns = scene_inputs.get(scene, ALL_SECTIONS)
+        inputs = [
+            f"{name}={digest}" for name, digest in digests.items()
+            if name == "prompt"
+            or any(fnmatchcase(name, pattern) for pattern in patterns)
+        ]
+        fingerprints[scene] = hashlib.sha256(
+            "\n".join(inputs).encode()
+        ).hexdigest()
+    return fingerprints
+
+
+async def _run_chain(chain: Any, inputs: Dict[str, Any], stage: str) -> str:
+    """Run one LLM chain within the process-wide concurrency limit"""
+    async with llm_slot():
+        with stage_timer(stage), get_openai_callback() as usage:
+            response = await chain.arun(inputs)
+    LLM_TOKENS_TOTAL.inc(usage.prompt_tokens, kind="prompt")
+    LLM_TOKENS_TOTAL.inc(usage.completion_tokens, kind="completion")
+    return response
+
+
+async def _write_scenes_together(
+    payload: ScriptRequestPayload,
+    scenes: Optional[List[str]],
+    unchanged: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Write the scenes in a single completion"""
+    prompt: Any = payload
+    if scenes is not None:
+        prompt = str(payload) + SCENE_REGENERATION_PROMPT.format(
+            scenes=", ".join(scenes),
+            unchanged=json.dumps(unchanged),
+        )
+    response = await _run_chain(
+        create_script_chain(), {"prompt": prompt}, "llm"
+    )
+
+    # TODO: Check if response is a valid JSON
+    return parse_json_markdown(response)
+
+
+async def _write_scenes_concurrently(
+    payload: ScriptRequestPayload,
+    scenes: Optional[List[str]],
+    unchanged: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Plan the script with a short outline call, then write each scene in
+    its own completion, all at once. Latency is the outline plus the
+    slowest scene rather than the sum of every scene.
+    """
+    with stage_timer("llm"):
+        outline = parse_json_markdown(await _run_chain(
+            create_outline_chain(), {"prompt": payload}, "llm_outline"
+        ))
+        if scenes is None:
+            scenes = list(outline)
+
+        context = ""
+        if unchanged:
+            context = (
+                "\nThese scenes are already written and stay as they are:\n"
+                f"{json.dumps(unchanged)}\n"
+            )
+        dialogue = await asyncio.gather(*(
+            _run_chain(
+                create_scene_chain(),
+                {
+                    "prompt": payload,
+                    "outline": json.dumps(outline),
+                    "context": context,
+                    "scene": scene,
+                    "scene_outline": outline.get(scene, ""),
+                },
+                "llm_scene",
+            )
+            for scene in scenes
+        ))
+
+    # Assembled in outline order, as the single completion returns them
+    return {scene: text.strip() for scene, text in zip(scenes, dialogue)}
+
+
+async def write_scenes(
+    payload: ScriptRequestPayload,
+    scenes: Optional[List[str]] = None,
+    unchanged: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Write script scenes with the configured SCRIPT_GENERATION_MODE.
+
+    Args:
+        payload: Data the script is written from
+        scenes: Scenes to rewrite, or None to write a whole new script
+        unchanged: Dialogue of the scenes kept from the previous version
+
+    Returns:
+        Dialogue per scene, in the scene_dialogue format
+    """
+    mode = settings.SCRIPT_GENERATION_MODE
+    if mode == "single":
+        writer = _write_scenes_together
+    elif mode == "per_scene":
+        writer = _write_scenes_concurrently
+    else:
+        raise ValueError(f"Unknown script generation mode: {mode}")
+    return await writer(payload, scenes, unchanged or {})
+
+
+def _current_scenes(script: ORMScript, db: Session) -> Dict[str, ScriptScene]:
+    """Latest version of every scene of a script, without the dialogue"""
+    rows = db.execute(
+        select(ScriptScene)
+        .where(ScriptScene.script_id == script.id)
+        .order_by(ScriptScene.version)
+    ).scalars()
+    return {row.scene: row for row in rows}
+
 
 async def generate(
         payload: ScriptRequestPayload,
         db: Session
 ) -> Script:
-    """Generate script for a student deployment package"""
+    """
+    Generate script for a student deployment package.
 
-    chain = create_script_chain()
-    response = await chain.arun(
-        {
-            "prompt": payload
-        }
+    A deployment that already has a complete script keeps it: only the
+    scenes whose input fingerprints changed are sent back to the LLM,
+    and the script is updated in place with a new version.
+    """
+    script: Optional[ORMScript] = db.execute(
+        select(ORMScript).where(
+            ORMScript.student_deployment_id == payload.student_deployment.id
+        )
+    ).scalar_one_or_none()
+
+    sections = payload_sections(payload)
+    current = (
+        _current_scenes(script, db)
+        if script is not None and script.status == ScriptStatus.COMPLETE
+        else {}
     )
 
-    # Create a new Script object
-    # TODO: Check if response is a valid JSON
+    if current:
+        previous_dialogue = dict(script.scene_dialogue)
+        fingerprints = scene_fingerprints(
+            sections, previous_dialogue, payload.scene_inputs
+        )
+        stale = [
+            scene for scene, fingerprint in fingerprints.items()
+            if scene not in current
+            or current[scene].input_fingerprint != fingerprint
+        ]
+        SCRIPT_SCENES_TOTAL.inc(
+            len(fingerprints) - len(stale), outcome="reused"
+        )
+        if not stale:
+            return Script.model_validate(script)
+
+        unchanged = {
+            scene: dialogue for scene, dialogue in previous_dialogue.items()
+            if scene not in stale
+        }
+        rewritten = await write_scenes(payload, stale, unchanged)
+        missing = [scene for scene in stale if scene not in rewritten]
+        if missing:
+            app_logger.warning(
+                f"Script for deployment {payload.student_deployment.id} "
+                f"kept previous dialogue of scenes {missing}"
+            )
+        written = {
+            scene: rewritten[scene] for scene in stale if scene in rewritten
+        }
+        scene_dialogue = {**previous_dialogue, **written}
+    else:
+        scene_dialogue = await write_scenes(payload)
+        written = scene_dialogue
+        fingerprints = scene_fingerprints(
+            sections, scene_dialogue, payload.scene_inputs
+        )
+    SCRIPT_SCENES_TOTAL.inc(len(written), outcome="regenerated")
+
     # TODO: save complete prompt to the database
-    script = ORMScript(
-        student_deployment_id=payload.student_deployment.id,
-        scene_dialogue=json.dumps(parse_json_markdown(response)),
-        prompt_used=payload.model_dump_json(),
-        status=ScriptStatus.COMPLETE
-    )
+    prompt_used = payload.model_dump_json()
+    if script is None:
+        script = ORMScript(
+            student_deployment_id=payload.student_deployment.id,
+            version=0,
+        )
+        db.add(script)
+    script.scene_dialogue = scene_dialogue
+    script.prompt_used = prompt_used
+    script.status = ScriptStatus.COMPLETE
+    script.version = (script.version or 0) + 1
 
-    # Add the script to the database
-    db.add(script)
-    db.commit()
-    db.refresh(script)
+    # Add the script and the new scene versions to the database
+    with stage_timer("sqlite_write"):
+        try:
+            db.flush()
+            result = Script(
+                id=script.id,
+                student_deployment_id=script.student_deployment_id,
+                prompt_used=prompt_used,
+                scene_dialogue=scene_dialogue,
+                status=script.status,
+                version=script.version,
+            )
+            for scene, dialogue in written.items():
+                previous = current.get(scene)
+                db.add(ScriptScene(
+                    script_id=script.id,
+                    scene=scene,
+                    version=previous.version + 1 if previous else 1,
+                    dialogue=(
+                        dialogue if isinstance(dialogue, str)
+                        else json.dumps(dialogue)
+                    ),
+                    input_fingerprint=fingerprints[scene],
+                ))
+            db.commit()
+        except IntegrityError:
+            # Written concurrently for the same deployment, e.g. by the
+            # pre-generation and a request: use the version stored first
+            db.rollback()
+            app_logger.info(
+                f"Script for deployment {payload.student_deployment.id} "
+                f"was written concurrently, reusing it"
+            )
+            return Script.model_validate(db.execute(
+                select(ORMScript).where(
+                    ORMScript.student_deployment_id
+                    == payload.student_deployment.id
+                )
+            ).scalar_one())
 
-    return Script.model_validate(script)
+    # Built from the values in hand rather than loading
+    # and decompressing the deferred columns again
+    return result
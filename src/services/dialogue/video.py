@@ -1,11 +1,27 @@
 # src/services/dialogue/video.py
+import asyncio
 import uuid
 
-from typing import Any, Dict, Optional, List
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Optional,
+    List,
+    Sequence,
+    Union,
+)
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException
 
+from src.database import SessionLocalSQLite
+from src.models.cohort import CohortScore
 from src.models.video import (
     DeploymentPackageExt,
     HeyGenTemplate,
@@ -14,16 +30,30 @@ from src.models.video import (
 )
 from src.api.dependencies.db import (
     select_student_deployment,
-    select_cohort_scores,
+    select_cohort_score_columns,
+)
+from src.services.cohort import (
+    SCORE_FIELDS,
+    compare_scores,
+    get_cohort_comparison,
+    get_package_comparison,
+)
+from src.services import events
+from src.services.pipeline import Stage, run_stages
+from src.services.scheduler import get_scheduler
+from src.services.dialogue.script import (
+    SCRIPT_PROMPT_PROJECTION,
+    generate as generate_script,
 )
-from src.services.dialogue.script import generate as generate_script
 from src.schema.itp import (
     CohortComparison,
+    DeploymentProjection,
+    PackageComparison,
     StudentDeployment,
-    StudentStepSummary,
-    StudentComponentSummary,
+    DEPLOYMENT_TEXT_FIELDS,
 )
 from src.schema.video import (
+    GenerationLane,
     HeyGenVariable,
     HeyGenPayload,
     HeyGenResponseData,
@@ -32,62 +62,316 @@ from src.schema.video import (
     ScriptRequestPayload,
     VideoData,
     VideoDimension,
+    VideoEvent,
     VideoStatus,
 )
 from src.settings import settings
 from src.logging_config import app_logger
+from src.metrics import (
+    HEYGEN_ERRORS_TOTAL,
+    HEYGEN_RENDER_QUEUE_DEPTH,
+    HEYGEN_RENDERS_IN_FLIGHT,
+    HEYGEN_WEBHOOK_LAG_SECONDS,
+    PIPELINE_JOBS_IN_FLIGHT,
+    PIPELINE_JOBS_TOTAL,
+    stage_timer,
+)
 
 import httpx
 
 
-async def create(student_deployment_id: int, db: Session) -> VideoData:
+HEYGEN_API_URL = "https://api.heygen.com"
+
+# Statuses after which a video no longer changes
+FINAL_STATUSES = {VideoStatus.COMPLETED, VideoStatus.FAILED}
+
+# Advisory lock serializing render claims on PostgreSQL
+RENDER_CLAIM_LOCK_KEY = 0x4E59_0001
+
+
+def create_heygen_client() -> httpx.AsyncClient:
+    """Initialize HTTP client for the HeyGen API"""
+    return httpx.AsyncClient(base_url=HEYGEN_API_URL)
+
+
+async def create(
+    student_deployment_id: int,
+    db: Session,
+    lane: GenerationLane = GenerationLane.INTERACTIVE,
+) -> VideoData:
     """
     Create a video for a deployment,
-    handling script generation and HeyGen submission
+    handling script generation and HeyGen submission.
+    Waits for a slot of the generation scheduler in the given lane.
     """
+    cohort_id = get_cohort_id(student_deployment_id, db)
+    async with get_scheduler().slot(lane, cohort_id):
+        with PIPELINE_JOBS_IN_FLIGHT.track():
+            try:
+                video_data = await _create(student_deployment_id, db)
+            except Exception:
+                PIPELINE_JOBS_TOTAL.inc(outcome="error")
+                raise
 
-    script_request_payload: ScriptRequestPayload = get_script_request_payload(
-        student_deployment_id,
-        db
-    )
-    
-    # Generate script
-    script: Script = await generate_script(
-        script_request_payload,
-        db
-    )
+    PIPELINE_JOBS_TOTAL.inc(outcome=video_data.status.value)
+    return video_data
 
-    # Create video record
-    video: Video = Video(
-        student_deployment_id=student_deployment_id,
-        script_id=script.id,
-        status=VideoStatus.NOT_SUBMITTED,
-    )
-    db.add(video)
-    db.commit()
-    db.refresh(video)
 
-    # Submit to HeyGen
-    # return details from HeyGen API response
-    heygen_response: HeyGenResponseData = await submit_to_heygen(
-        template_id=settings.HEYGEN_TEMPLATE_ID,
-        script_request_payload=script_request_payload,
-        script=script,
-        db=db,
-    )
+def get_cohort_id(student_deployment_id: int, db: Session) -> Optional[int]:
+    """
+    Cohort of a deployment from the local cohort_scores table, or None
+    if the refresh has not reached it yet
+    """
+    return db.execute(
+        select(CohortScore.cohort_id).where(
+            CohortScore.student_deployment_id == student_deployment_id
+        )
+    ).scalar()
 
-    video.status = (
-        VideoStatus.PROCESSING
-        if heygen_response.success
-        else VideoStatus.FAILED
-    )
-    video.heygen_video_id = heygen_response.video_id
-    video.heygen_response = heygen_response
-    db.commit()
 
+def publish_video_status(video: Video, db: Session):
+    """
+    Push a committed status change to subscribers of the video. Best
+    effort: the change is already stored and clients can still poll.
+    """
+    try:
+        events.publish(
+            VideoEvent(
+                video_id=video.id,
+                student_deployment_id=video.student_deployment_id,
+                cohort_id=get_cohort_id(video.student_deployment_id, db),
+                status=video.status,
+                video_url=video.video_url,
+                occurred_on=datetime.utcnow(),
+            ),
+            db,
+        )
+    except Exception as e:
+        db.rollback()
+        app_logger.error(f"Failed to publish status of video {video.id}: {e}")
+
+
+async def watch_video(
+    video: VideoData,
+    subscription: events.Subscription,
+) -> AsyncIterator[Optional[VideoEvent]]:
+    """
+    Status events of one video: its current status, then every change
+    until it completes or fails. None marks an idle interval.
+
+    Args:
+        video: The video as read after `subscription` was opened
+        subscription: Subscription to the video
+    """
+    try:
+        yield VideoEvent(
+            video_id=video.id,
+            student_deployment_id=video.student_deployment_id,
+            status=video.status,
+            video_url=video.video_url,
+            occurred_on=video.updated_on,
+        )
+        if video.status in FINAL_STATUSES:
+            return
+        async for event in subscription:
+            yield event
+            if event is not None and event.status in FINAL_STATUSES:
+                return
+    finally:
+        subscription.close()
+
+
+async def _create(student_deployment_id: int, db: Session) -> VideoData:
+    """
+    Run the pipeline as a graph of stages so independent work overlaps:
+    the HeyGen template GET runs alongside everything up to the
+    submission, the remote cohort query alongside the local lookups,
+    and the end-to-end latency is the critical path
+    (deployment -> LLM -> video insert -> HeyGen POST).
+
+    The local session is only used from the event loop; ITP queries run
+    in worker threads with sessions of their own.
+    """
+    template_id = settings.HEYGEN_TEMPLATE_ID
+
+    async with create_heygen_client() as client:
+
+        async def template_info():
+            return await fetch_heygen_template_info(client, template_id)
+
+        async def template():
+            with stage_timer("sqlite_read"):
+                return get_heygen_template(template_id, db)
+
+        async def student_deployment(template):
+            deployment = await asyncio.to_thread(
+                fetch_student_deployment,
+                student_deployment_id,
+                template_projection(template),
+            )
+            if not deployment:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Student deployment not found"
+                )
+            return deployment
+
+        async def cohort_comparison(student_deployment):
+            if student_deployment.acc_score is None:
+                return None
+            comparison = get_local_cohort_comparison(student_deployment, db)
+            if comparison is None:
+                comparison = await asyncio.to_thread(
+                    get_remote_cohort_comparison, student_deployment
+                )
+            return comparison
+
+        async def package_comparison(student_deployment):
+            if student_deployment.acc_score is None:
+                return None
+            with stage_timer("package_stats"):
+                return get_package_comparison(student_deployment, db)
+
+        async def deployment_package(student_deployment):
+            return get_deployment_package_ext(student_deployment, db)
+
+        async def payload(
+            student_deployment,
+            cohort_comparison,
+            package_comparison,
+            deployment_package,
+        ):
+            return ScriptRequestPayload(
+                prompt=deployment_package.prompt_template,
+                student_deployment=student_deployment,
+                cohort_comparison=cohort_comparison,
+                package_comparison=package_comparison,
+                scene_inputs=deployment_package.scene_inputs,
+            )
+
+        async def script(payload):
+            return await generate_script(payload, db)
+
+        async def video(script):
+            with stage_timer("sqlite_write"):
+                video: Video = Video(
+                    student_deployment_id=student_deployment_id,
+                    script_id=script.id,
+                    status=VideoStatus.NOT_SUBMITTED,
+                )
+                db.add(video)
+                db.commit()
+                db.refresh(video)
+            return video
+
+        async def heygen_payload(template, payload, script):
+            return await build_heygen_payload(
+                template_id=template_id,
+                student_deployment=payload.student_deployment,
+                cohort_comparison=payload.cohort_comparison,
+                script=script,
+                db=db,
+                package_comparison=payload.package_comparison,
+                template=template,
+            )
+
+        async def submission(template_info, heygen_payload, video):
+            # Queued once the video record exists, and submitted
+            # right away if HeyGen has render capacity
+            queue_render(
+                video, template_id, template_info, heygen_payload, db
+            )
+            await submit_queued_renders(db)
+
+        results = await run_stages(
+            [
+                Stage("template_info", template_info),
+                Stage("template", template),
+                Stage("student_deployment", student_deployment, ["template"]),
+                Stage(
+                    "cohort_comparison",
+                    cohort_comparison,
+                    ["student_deployment"],
+                ),
+                Stage(
+                    "package_comparison",
+                    package_comparison,
+                    ["student_deployment"],
+                ),
+                Stage(
+                    "deployment_package",
+                    deployment_package,
+                    ["student_deployment"],
+                ),
+                Stage(
+                    "payload",
+                    payload,
+                    [
+                        "student_deployment",
+                        "cohort_comparison",
+                        "package_comparison",
+                        "deployment_package",
+                    ],
+                ),
+                Stage("script", script, ["payload"]),
+                Stage("video", video, ["script"]),
+                Stage(
+                    "heygen_payload",
+                    heygen_payload,
+                    ["template", "payload", "script"],
+                ),
+                Stage(
+                    "submission",
+                    submission,
+                    ["template_info", "heygen_payload", "video"],
+                ),
+            ],
+            job=f"Video for deployment {student_deployment_id}",
+        )
+
+    video: Video = results["video"]
+    db.refresh(video)
     return VideoData.model_validate(video)
 
 
+async def get(video_id: uuid.UUID, db: Session) -> Optional[VideoData]:
+    """Fetch a single video by id"""
+    video: Optional[Video] = db.get(Video, video_id)
+    if not video:
+        return None
+    return VideoData.model_validate(video)
+
+
+async def list_videos(
+    db: Session,
+    student_deployment_id: Optional[int] = None,
+    status: Optional[VideoStatus] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> List[VideoData]:
+    """
+    List videos, most recent first
+
+    Args:
+        db: Database session
+        student_deployment_id: Only videos for this deployment
+        status: Only videos with this status
+        limit: Maximum number of videos
+        offset: Number of videos to skip
+
+    Returns:
+        List of VideoData
+    """
+    stmt = select(Video).order_by(Video.created_on.desc())
+    if student_deployment_id is not None:
+        stmt = stmt.where(Video.student_deployment_id == student_deployment_id)
+    if status is not None:
+        stmt = stmt.where(Video.status == status)
+
+    videos = db.execute(stmt.limit(limit).offset(offset)).scalars().all()
+    return [VideoData.model_validate(video) for video in videos]
+
+
 def get_script_request_payload(
     student_deployment_id: int,
     db: Session,
@@ -103,204 +387,502 @@ def get_script_request_payload(
     Returns:
         ScriptPromptData model or None if not found
     """
-    # Get complete deployment details
-    student_deployment: StudentDeployment = select_student_deployment(
-        student_deployment_id
+    projection: DeploymentProjection = get_script_projection(
+        settings.HEYGEN_TEMPLATE_ID, db
+    )
+
+    # Get deployment details needed by the prompt and template
+    student_deployment: StudentDeployment = fetch_student_deployment(
+        student_deployment_id, projection
     )
     if not student_deployment:
         return None
 
     cohort_comparison = None
+    package_comparison = None
     if (
         student_deployment.acc_score is not None
     ):
-        # Get cohort scores
-        cohort_scores = select_cohort_scores(
-            cohort_id=student_deployment.cohort.id,
-            package_id=student_deployment.deployment_package.id
-        )
+        cohort_comparison = get_local_cohort_comparison(student_deployment, db)
+        if cohort_comparison is None:
+            cohort_comparison = get_remote_cohort_comparison(
+                student_deployment
+            )
 
-        # Calculate comparison metrics
-        cohort_comparison: CohortComparison = calculate_cohort_comparison(
-            student_deployment.acc_score, cohort_scores
-        )
+        with stage_timer("package_stats"):
+            package_comparison = get_package_comparison(
+                student_deployment, db
+            )
 
-    # construct components summary List[StudentComponentSummary]
-    # use components. construct StudentStepSummary and StudentComponentSummary
-
-    components_summary: List[StudentComponentSummary] = [
-        StudentComponentSummary(
-            component_category=comp.component_category,
-            score=comp.score,
-            steps=[
-                StudentStepSummary(
-                    step_name=step.step_name,
-                    score=step.score
-                )
-                for step in comp.steps
-            ]
-        )
-        for comp in student_deployment.components
-    ]
+    deployment_package: DeploymentPackageExt = get_deployment_package_ext(
+        student_deployment, db
+    )
 
-    student_deployment.components_summary = components_summary
+    return ScriptRequestPayload(
+        prompt=deployment_package.prompt_template,
+        student_deployment=student_deployment,
+        cohort_comparison=cohort_comparison,
+        package_comparison=package_comparison,
+        scene_inputs=deployment_package.scene_inputs,
+    )
 
-    stmt = select(DeploymentPackageExt).where(
-        DeploymentPackageExt.deployment_package_id
-        == student_deployment.deployment_package.id
+
+async def load_script_request_payload(
+    student_deployment_id: int,
+    db: Session,
+) -> Optional[ScriptRequestPayload]:
+    """
+    get_script_request_payload() for callers on the event loop: the ITP
+    queries run in worker threads and the local session stays on the loop.
+    """
+    projection: DeploymentProjection = get_script_projection(
+        settings.HEYGEN_TEMPLATE_ID, db
+    )
+    student_deployment: StudentDeployment = await asyncio.to_thread(
+        fetch_student_deployment, student_deployment_id, projection
     )
+    if not student_deployment:
+        return None
+
+    cohort_comparison = None
+    package_comparison = None
+    if student_deployment.acc_score is not None:
+        cohort_comparison = get_local_cohort_comparison(student_deployment, db)
+        if cohort_comparison is None:
+            cohort_comparison = await asyncio.to_thread(
+                get_remote_cohort_comparison, student_deployment
+            )
+        with stage_timer("package_stats"):
+            package_comparison = get_package_comparison(
+                student_deployment, db
+            )
 
-    deployment_package: DeploymentPackageExt = db.execute(stmt).scalar_one()
+    deployment_package: DeploymentPackageExt = get_deployment_package_ext(
+        student_deployment, db
+    )
 
     return ScriptRequestPayload(
         prompt=deployment_package.prompt_template,
         student_deployment=student_deployment,
         cohort_comparison=cohort_comparison,
+        package_comparison=package_comparison,
+        scene_inputs=deployment_package.scene_inputs,
     )
 
 
-def _get_ordinal_suffix(n: int) -> str:
-    """Return the ordinal suffix for a number."""
-    if 11 <= n % 100 <= 13:
-        return "th"
-    else:
-        return {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+def fetch_student_deployment(
+    student_deployment_id: int,
+    projection: DeploymentProjection,
+) -> Optional[StudentDeployment]:
+    """Fetch a deployment from the ITP database; safe to run in a thread"""
+    with stage_timer("mysql_fetch"):
+        return select_student_deployment(
+            student_deployment_id,
+            projection=projection,
+        )
 
 
-def calculate_cohort_comparison(
-    student_score: float, cohort_scores: List[float]
+def get_local_cohort_comparison(
+    student_deployment: StudentDeployment,
+    db: Session,
+) -> Optional[CohortComparison]:
+    """Materialized standing, kept fresh by the periodic refresh"""
+    with stage_timer("cohort_stats"):
+        return get_cohort_comparison(student_deployment, db)
+
+
+def get_remote_cohort_comparison(
+    student_deployment: StudentDeployment,
 ) -> CohortComparison:
     """
-    Calculate percentile and related metrics for a student within their cohort.
+    Compute the standing from the ITP database, for deployments not
+    refreshed yet; safe to run in a thread
+    """
+    with stage_timer("cohort_stats_remote"):
+        cohort_scores = select_cohort_score_columns(
+            cohort_id=student_deployment.cohort.id,
+            package_id=student_deployment.deployment_package.id
+        )
+
+        # Calculate comparison metrics
+        return calculate_cohort_comparison(student_deployment, cohort_scores)
+
+
+def get_deployment_package_ext(
+    student_deployment: StudentDeployment,
+    db: Session,
+) -> DeploymentPackageExt:
+    """Local settings of the deployment's package"""
+    stmt = select(DeploymentPackageExt).where(
+        DeploymentPackageExt.deployment_package_id
+        == student_deployment.deployment_package.id
+    )
+
+    with stage_timer("sqlite_read"):
+        return db.execute(stmt).scalar_one()
+
+
+def get_heygen_template(
+    template_id: str,
+    db: Session,
+) -> Optional[HeyGenTemplate]:
+    """Local record of a HeyGen template and its variable mappings"""
+    return db.query(
+        HeyGenTemplate
+    ).filter_by(
+        template_id=template_id
+    ).first()
+
+
+def get_script_projection(
+    template_id: str,
+    db: Session,
+) -> DeploymentProjection:
+    """
+    Projection covering what the script prompt and the HeyGen template
+    read from the student deployment.
 
     Args:
-        student_score: The student's accuracy score
-        cohort_scores: List of accuracy scores for the cohort
+        template_id: HeyGen template ID
+        db: Database session
 
     Returns:
-        CohortComparison object with calculated metrics
+        DeploymentProjection for select_student_deployment()
     """
-    total_students = len(cohort_scores)
+    if settings.STUDENT_DEPLOYMENT_PROJECTION == "full":
+        return DeploymentProjection.full()
 
-    if total_students == 0:
-        return CohortComparison(
-            total_students=0,
-            students_below_or_equal=0,
-            cohort_avg_acc_score=0.0,
-            percentile=0.0,
-            rank="N/A",
+    with stage_timer("sqlite_read"):
+        template: Optional[HeyGenTemplate] = get_heygen_template(
+            template_id, db
         )
 
-    # Count students with score <= student_score
-    students_below_or_equal = sum(
-        1 for score in cohort_scores if score <= student_score
-    )
-
-    # Calculate average score
-    cohort_avg_acc_score = sum(cohort_scores) / total_students
+    return template_projection(template)
 
-    # Calculate percentile
-    percentile = (students_below_or_equal / total_students) * 100
 
-    # Get rank ordinal
-    rank_ordinal = _get_ordinal_suffix(students_below_or_equal)
-    rank = f"{students_below_or_equal}{rank_ordinal} out of {total_students}"
+def template_projection(
+    template: Optional[HeyGenTemplate],
+) -> DeploymentProjection:
+    """Projection covering the script prompt and a template's mappings"""
+    if settings.STUDENT_DEPLOYMENT_PROJECTION == "full":
+        return DeploymentProjection.full()
 
-    return CohortComparison(
-        total_students=total_students,
-        students_below_or_equal=students_below_or_equal,
-        cohort_avg_acc_score=round(cohort_avg_acc_score, 2),
-        percentile=round(percentile, 1),
-        rank=rank,
+    mappings = (
+        template.variable_mappings.get("mappings", []) if template else []
     )
+    return SCRIPT_PROMPT_PROJECTION.union(get_deployment_projection(mappings))
 
 
-async def submit_to_heygen(
-    template_id: uuid.UUID,
-    script_request_payload: ScriptRequestPayload,
-    script: Script,
-    db: Session,
-    options: Optional[Dict[str, Any]] = None,
-) -> HeyGenResponseData:
+def calculate_cohort_comparison(
+    student_deployment: StudentDeployment,
+    cohort_scores: Sequence[Sequence[Optional[float]]],
+) -> CohortComparison:
     """
-    Submit a video generation request to HeyGen
+    Calculate percentile and related metrics for a student within their
+    cohort, for every score metric.
 
     Args:
-        template_id: HeyGen template ID
-        script_prompt_data: All data needed for script generation
-        script: The generated script
-        db: Database session
-        options: Additional options for HeyGen API
+        student_deployment: The student's deployment with its scores
+        cohort_scores: Scores of the cohort's graded deployments, one row
+            per deployment in SCORE_FIELDS order
 
     Returns:
-        HeyGenResponseData with details about the submitted video
+        CohortComparison object with calculated metrics
     """
-    # Build payload using template-driven mapping with options
-    payload: HeyGenPayload = await build_heygen_payload(
-        template_id=template_id,
-        student_deployment=script_request_payload.student_deployment,
-        cohort_comparison=script_request_payload.cohort_comparison,
-        script=script,
-        db=db,
-        options=options,
-    )
+    scores = np.array(
+        [tuple(row) for row in cohort_scores], dtype=float
+    ).reshape(len(cohort_scores), len(SCORE_FIELDS))
 
-    # Set up API request
-    headers = {
-        "X-Api-Key": settings.HEYGEN_API_KEY,
-        "Content-Type": "application/json"
-    }
+    return compare_scores(
+        [getattr(student_deployment, field) for field in SCORE_FIELDS],
+        scores,
+    )
 
-    async with httpx.AsyncClient() as client:
-        # Get template info
-        template_url = f"https://api.heygen.com/v2/template/{template_id}"
-        template_response = await client.get(template_url, headers=headers)
 
-        if not template_response.is_success:
-            app_logger.error(
-                f"Failed to fetch template: {template_response.status_code}"
-            )
-            return HeyGenResponseData(
+def queue_render(
+    video: Video,
+    template_id: Union[uuid.UUID, str],
+    template_info: Optional[Dict[str, Any]],
+    payload: HeyGenPayload,
+    db: Session,
+):
+    """
+    Queue a video for submission to HeyGen with its variables filtered
+    against the template, or fail it if the template could not be fetched
+    """
+    with stage_timer("sqlite_write"):
+        if template_info is None:
+            video.status = VideoStatus.FAILED
+            video.heygen_response = HeyGenResponseData(
                 success=False,
                 error="Failed to fetch template information",
                 status=VideoStatus.FAILED,
             )
+        else:
+            video.status = VideoStatus.QUEUED
+            video.heygen_request = {
+                "template_id": str(template_id),
+                "payload": filter_heygen_variables(
+                    template_info, payload
+                ).model_dump(mode="json"),
+            }
+        db.commit()
+    publish_video_status(video, db)
+
+
+def _render_cutoff() -> datetime:
+    """Renders submitted before this no longer hold capacity"""
+    return datetime.utcnow() - timedelta(
+        seconds=settings.HEYGEN_RENDER_TIMEOUT_SECONDS
+    )
+
+
+def count_renders_in_flight(db: Session) -> int:
+    """Videos submitted to HeyGen and still awaiting their webhook"""
+    return db.execute(
+        select(func.count()).select_from(Video).where(
+            Video.status == VideoStatus.PROCESSING,
+            Video.submitted_on >= _render_cutoff(),
+        )
+    ).scalar()
 
-        template_info = template_response.json()
 
-        # Filter payload to only include valid variables
-        filtered_payload: HeyGenPayload = filter_heygen_variables(
-            template_info,
-            payload
+def _claim_render(video_id: uuid.UUID, db: Session) -> bool:
+    """
+    Mark a queued video as submitted if HeyGen has a render slot for it.
+    The capacity check and the update are one statement, so workers
+    sharing the store never claim more than HEYGEN_MAX_CONCURRENT_RENDERS.
+    """
+    if db.bind.dialect.name == "postgresql":
+        # Unlike SQLite, concurrent PostgreSQL transactions could each see
+        # the same free slot: take turns for the rest of the transaction
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": RENDER_CLAIM_LOCK_KEY},
         )
 
-        # Submit request
-        generate_url = f"https://api.heygen.com/v2/template/{template_id}/generate"
-        response = await client.post(
-            generate_url, headers=headers, json=filtered_payload.dict()
+    stmt = update(Video).where(
+        Video.id == video_id,
+        Video.status == VideoStatus.QUEUED,
+    )
+    if settings.HEYGEN_MAX_CONCURRENT_RENDERS > 0:
+        rendering = aliased(Video)
+        in_flight = select(func.count()).select_from(rendering).where(
+            rendering.status == VideoStatus.PROCESSING,
+            rendering.submitted_on >= _render_cutoff(),
+        ).scalar_subquery()
+        stmt = stmt.where(in_flight < settings.HEYGEN_MAX_CONCURRENT_RENDERS)
+
+    result = db.execute(
+        stmt.values(
+            status=VideoStatus.PROCESSING,
+            submitted_on=datetime.utcnow(),
+        ).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+# One lock per event loop: asyncio primitives cannot be shared
+# between loops
+_render_queue_locks: WeakKeyDictionary = WeakKeyDictionary()
+
+
+async def submit_queued_renders(db: Session) -> int:
+    """
+    Submit queued videos to HeyGen, oldest first, while it has render
+    capacity. Called after a video is queued and whenever a render
+    completes or fails.
+
+    Returns:
+        Number of videos submitted
+    """
+    loop = asyncio.get_running_loop()
+    lock = _render_queue_locks.get(loop)
+    if lock is None:
+        lock = asyncio.Lock()
+        _render_queue_locks[loop] = lock
+
+    submitted = 0
+    async with lock:
+        queued = db.execute(
+            select(Video.id)
+            .where(Video.status == VideoStatus.QUEUED)
+            .order_by(Video.created_on)
+        ).scalars().all()
+
+        if queued:
+            async with create_heygen_client() as client:
+                for video_id in queued:
+                    if not _claim_render(video_id, db):
+                        if db.get(Video, video_id).status == (
+                            VideoStatus.QUEUED
+                        ):
+                            # Still queued: no capacity left
+                            break
+                        # Claimed by another worker
+                        continue
+
+                    await _submit_claimed_render(
+                        db.get(Video, video_id), client, db
+                    )
+                    submitted += 1
+
+        HEYGEN_RENDERS_IN_FLIGHT.set(count_renders_in_flight(db))
+        HEYGEN_RENDER_QUEUE_DEPTH.set(len(queued) - submitted)
+
+    return submitted
+
+
+async def _submit_claimed_render(
+    video: Video,
+    client: httpx.AsyncClient,
+    db: Session,
+):
+    """
+    Post a claimed video to HeyGen. Any failure fails the video, which
+    frees its slot, so the rest of the queue is still drained.
+    """
+    request = video.heygen_request
+    try:
+        heygen_response: HeyGenResponseData = await post_heygen_payload(
+            client,
+            request["template_id"],
+            HeyGenPayload(**request["payload"]),
+        )
+    except Exception as e:
+        app_logger.error(f"Failed to submit video {video.id}: {e!r}")
+        heygen_response = HeyGenResponseData(
+            success=False, error=str(e) or repr(e), status=VideoStatus.FAILED
         )
 
-        response_data = response.json()
+    with stage_timer("sqlite_write"):
+        video.heygen_video_id = heygen_response.video_id
+        video.heygen_response = heygen_response
+        if heygen_response.success:
+            video.heygen_request = None
+        else:
+            # Frees the slot claimed for it
+            video.status = VideoStatus.FAILED
+        db.commit()
+    publish_video_status(video, db)
 
-        if not response.is_success or (
-            "error" in response_data and response_data["error"]
-        ):
-            error_msg = response_data.get("error", "Unknown error")
-            app_logger.error(f"HeyGen API error: {error_msg}")
-            return HeyGenResponseData(
-                success=False, error=error_msg, status=VideoStatus.FAILED
+
+async def run_periodic_render_queue(interval: float):
+    """
+    Submit queued videos every `interval` seconds, for capacity freed by
+    renders that timed out or webhooks handled by a worker that could not
+    submit
+    """
+    while True:
+        db = SessionLocalSQLite()
+        try:
+            await submit_queued_renders(db)
+        except Exception as e:
+            app_logger.error(f"HeyGen render queue failed: {str(e)}")
+        finally:
+            db.close()
+        await asyncio.sleep(interval)
+
+
+def heygen_headers() -> Dict[str, str]:
+    """Headers of every HeyGen API request"""
+    return {
+        "X-Api-Key": settings.HEYGEN_API_KEY,
+        "Content-Type": "application/json"
+    }
+
+
+async def fetch_heygen_template_info(
+    client: httpx.AsyncClient,
+    template_id: uuid.UUID,
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a template's definition from HeyGen
+
+    Returns:
+        The template response, or None if it could not be fetched
+    """
+    template_url = f"/v2/template/{template_id}"
+    try:
+        with stage_timer("heygen_template_get"):
+            template_response = await client.get(
+                template_url, headers=heygen_headers()
             )
+    except httpx.HTTPError as e:
+        HEYGEN_ERRORS_TOTAL.inc(endpoint="template", status="error")
+        app_logger.error(f"Failed to fetch template: {e!r}")
+        return None
+
+    if not template_response.is_success:
+        HEYGEN_ERRORS_TOTAL.inc(
+            endpoint="template",
+            status=template_response.status_code
+        )
+        app_logger.error(
+            f"Failed to fetch template: {template_response.status_code}"
+        )
+        return None
 
-        # Process successful response
-        heygen_video_id = response_data.get("data", {}).get("video_id")
+    try:
+        return template_response.json()
+    except ValueError as e:
+        app_logger.error(f"Failed to decode template: {e!r}")
+        return None
+
+
+async def post_heygen_payload(
+    client: httpx.AsyncClient,
+    template_id: Union[uuid.UUID, str],
+    payload: HeyGenPayload,
+) -> HeyGenResponseData:
+    """
+    Submit a video generation request whose variables were already
+    filtered against the template
 
+    Returns:
+        HeyGenResponseData with details about the submitted video
+    """
+    generate_url = f"/v2/template/{template_id}/generate"
+    try:
+        with stage_timer("heygen_generate_post"):
+            response = await client.post(
+                generate_url,
+                headers=heygen_headers(),
+                json=payload.dict(),
+            )
+        response_data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        # No response to read a video id from: nothing will call back
+        HEYGEN_ERRORS_TOTAL.inc(endpoint="generate", status="error")
+        app_logger.error(f"HeyGen API request failed: {e!r}")
         return HeyGenResponseData(
-            success=True,
-            video_id=heygen_video_id,
-            status=VideoStatus.PROCESSING,
-            response=response_data,
+            success=False, error=str(e) or repr(e), status=VideoStatus.FAILED
+        )
+
+    if not response.is_success or (
+        "error" in response_data and response_data["error"]
+    ):
+        HEYGEN_ERRORS_TOTAL.inc(
+            endpoint="generate",
+            status=response.status_code
+        )
+        error_msg = response_data.get("error", "Unknown error")
+        app_logger.error(f"HeyGen API error: {error_msg}")
+        return HeyGenResponseData(
+            success=False, error=error_msg, status=VideoStatus.FAILED
         )
 
+    # Process successful response
+    heygen_video_id = response_data.get("data", {}).get("video_id")
+
+    return HeyGenResponseData(
+        success=True,
+        video_id=heygen_video_id,
+        status=VideoStatus.PROCESSING,
+        response=response_data,
+    )
+
 
 async def build_heygen_payload(
     template_id: uuid.UUID,
@@ -309,6 +891,8 @@ async def build_heygen_payload(
     script: Script,
     db: Session,
     options: Optional[Dict[str, Any]] = None,
+    package_comparison: Optional[PackageComparison] = None,
+    template: Optional[HeyGenTemplate] = None,
 ) -> HeyGenPayload:
     """
     Build HeyGen payload using template-driven mapping
@@ -320,6 +904,9 @@ async def build_heygen_payload(
         db: Database session
         options: Additional options
         for HeyGen API (dimension, include_gif, etc.)
+        package_comparison: Estimated standing among every cohort
+        on the package
+        template: The template's local record, when already loaded
 
     Returns:
         Complete HeyGen payload with all parameters
@@ -333,11 +920,8 @@ async def build_heygen_payload(
         options = options or {"dimension": {"width": 1920, "height": 720}}
 
     # Get template from database
-    template = db.query(
-        HeyGenTemplate
-    ).filter_by(
-        template_id=template_id
-    ).first()
+    if template is None:
+        template = get_heygen_template(template_id, db)
     if not template:
         raise ValueError(f"Template {template_id} not found")
 
@@ -371,11 +955,13 @@ async def build_heygen_payload(
         )
 
     if "cohort_comparison" in required_models:
-        context_builder.register_model(
-            "cohort_comparison",
-            cohort_comparison,
-            # Use empty dict if None
-            dict_method="dict" if cohort_comparison else None,
+        context_builder.register_comparison(
+            "cohort_comparison", cohort_comparison
+        )
+
+    if "package_comparison" in required_models:
+        context_builder.register_comparison(
+            "package_comparison", package_comparison
         )
 
     if "script" in required_models:
@@ -445,6 +1031,56 @@ def get_required_models(mappings: List[Dict]) -> set[str]:
     }
 
 
+# StudentDeployment methods that only read names and scores
+SUMMARY_METHODS = {
+    "get_simple_components_text",
+    "get_simple_steps_text",
+    "get_top_and_bottom_steps_text",
+}
+
+
+def get_deployment_projection(mappings: List[Dict]) -> DeploymentProjection:
+    """
+    Derive the student deployment text columns read by template mappings
+
+    Args:
+        mappings: List of mapping dictionaries
+
+    Returns:
+        DeploymentProjection with the fields the mappings need
+    """
+    projection = DeploymentProjection.empty()
+
+    for mapping in mappings:
+        source_model = mapping.get("source_model")
+        field = mapping.get("source_field", "").split(".")[0]
+
+        if source_model == "student_deployment":
+            if field in DEPLOYMENT_TEXT_FIELDS:
+                projection = projection.union(
+                    DeploymentProjection(
+                        deployment_fields={field},
+                        component_fields=set(),
+                        step_fields=set(),
+                    )
+                )
+            elif field == "components":
+                projection = projection.union(
+                    DeploymentProjection(deployment_fields=set())
+                )
+
+        elif source_model == "special":
+            config = mapping.get("transformation_config") or {}
+            if (
+                config.get("object") == "student_deployment"
+                and field not in SUMMARY_METHODS
+            ):
+                # Unknown method, it may read anything
+                return DeploymentProjection.full()
+
+    return projection
+
+
 def extract_variable_value(mapping: Dict, context: Dict) -> Any:
     """
     Extract and transform value based on variable mapping
@@ -661,6 +1297,29 @@ class ContextBuilder:
             # Fall back to __dict__ if no dict method available
             self._context[name] = model_obj.__dict__
 
+    def register_comparison(
+        self,
+        name: str,
+        comparison: Optional[Union[CohortComparison, PackageComparison]],
+    ):
+        """
+        Register a cohort or package comparison. Every metric is also
+        exposed at the top level, so mappings can read e.g.
+        "otd_score.percentile" as well as "metrics.otd_score.percentile".
+
+        Args:
+            name: The key to use in the context
+            comparison: The comparison, or None for an empty context
+        """
+        if comparison is None:
+            self._context[name] = {}
+            return
+
+        context = comparison.dict()
+        for field, metric in context["metrics"].items():
+            context.setdefault(field, metric)
+        self._context[name] = context
+
     def get_context(self):
         """Get the built context dictionary"""
         return self._context
@@ -698,27 +1357,30 @@ async def submit_to_heygen_by_deployment_id(
         )
 
     # Fetch script prompt data (if needed for HeyGen submission)
-    script_request_payload: ScriptRequestPayload = get_script_request_payload(
-        student_deployment_id, db
+    script_request_payload: Optional[ScriptRequestPayload] = (
+        get_script_request_payload(student_deployment_id, db)
     )
+    if script_request_payload is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Student deployment not found"
+        )
 
-    # Submit to HeyGen
-    heygen_response: HeyGenResponseData = await submit_to_heygen(
-        template_id=settings.HEYGEN_TEMPLATE_ID,
-        script_prompt_data=script_request_payload,
+    template_id = settings.HEYGEN_TEMPLATE_ID
+    payload: HeyGenPayload = await build_heygen_payload(
+        template_id=template_id,
+        student_deployment=script_request_payload.student_deployment,
+        cohort_comparison=script_request_payload.cohort_comparison,
         script=script,
         db=db,
+        package_comparison=script_request_payload.package_comparison,
     )
+    async with create_heygen_client() as client:
+        template_info = await fetch_heygen_template_info(client, template_id)
 
-    # Update video status and HeyGen details
-    video.status = (
-        VideoStatus.PROCESSING
-        if heygen_response.success
-        else VideoStatus.FAILED
-    )
-    video.heygen_video_id = heygen_response.video_id
-    video.heygen_response = heygen_response
-    db.commit()
+    # Through the render queue, like a new video
+    queue_render(video, template_id, template_info, payload, db)
+    await submit_queued_renders(db)
     db.refresh(video)
 
     return VideoData.model_validate(video)
@@ -774,8 +1436,24 @@ async def heygen_event_handler(
 
         # Commit changes to the database
         db.commit()
+        publish_video_status(video, db)
 
-        app_logger.info(f"Processed {event_type} for video {heygen_video_id}")
+        if video.submitted_on:
+            HEYGEN_WEBHOOK_LAG_SECONDS.observe(
+                (datetime.utcnow() - video.submitted_on).total_seconds(),
+                event_type=event_type,
+            )
+
+        # The render's slot is free: submit the next queued video
+        try:
+            await submit_queued_renders(db)
+        except Exception as e:
+            app_logger.error(f"Failed to submit queued renders: {e}")
+
+        app_logger.info(
+            f"Processed {event_type} for video {heygen_video_id}",
+            extra={"sample": "webhook"},
+        )
         return True
 
     except Exception as e:
@@ -0,0 +1,167 @@
+# src/services/distribution.py
+import warnings
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sqlalchemy.orm import Session
+
+from src.models.cohort import CohortScoreStats
+from src.schema.cohort import ScoreDistribution, ScoreHistogram, ScoreSummary
+from src.services.cohort import SCORE_FIELDS, load_group_scores
+
+# Scores are graded on 0-100; histogram bins span that range
+SCORE_MIN = 0.0
+SCORE_MAX = 100.0
+
+# Distributions kept per process, keyed by group and options and
+# invalidated when the group's version changes
+CACHE_SIZE = 256
+_cache: "OrderedDict[Tuple, Tuple[int, ScoreDistribution]]" = OrderedDict()
+
+
+def _optional(values: np.ndarray, decimals: int = 2) -> List[Optional[float]]:
+    """Round and convert to floats, NaN becoming None"""
+    return [
+        None if value != value else value
+        for value in np.round(values, decimals).tolist()
+    ]
+
+
+def compute_distribution(
+    ids: np.ndarray,
+    scores: np.ndarray,
+    bins: int = 10,
+    include_z_scores: bool = False,
+) -> Tuple[Dict[str, ScoreSummary], Optional[Dict[str, List[Optional[float]]]]]:
+    """
+    Summary statistics, histograms and optionally z-scores for every
+    score column at once. Missing scores are ignored per column.
+    """
+    edges = np.linspace(SCORE_MIN, SCORE_MAX, bins + 1)
+    bin_edges = [float(edge) for edge in np.round(edges, 4)]
+
+    if len(scores) == 0:
+        # A group whose last deployment moved to another cohort: no
+        # statistics, and the reductions below do not accept no rows
+        metrics = {
+            field: ScoreSummary(
+                count=0,
+                histogram=ScoreHistogram(
+                    bin_edges=bin_edges, counts=[0] * bins
+                ),
+            )
+            for field in SCORE_FIELDS
+        }
+        z_scores = (
+            {field: [] for field in SCORE_FIELDS}
+            if include_z_scores else None
+        )
+        return metrics, z_scores
+
+    valid = ~np.isnan(scores)
+    counts = valid.sum(axis=0)
+
+    with warnings.catch_warnings():
+        # All-NaN columns yield NaN, reported as None
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(scores, axis=0)
+        std = np.nanstd(scores, axis=0)
+        minimum = np.nanmin(scores, axis=0)
+        maximum = np.nanmax(scores, axis=0)
+        p25, median, p75 = np.nanpercentile(scores, [25, 50, 75], axis=0)
+
+    # One bincount for all columns: offset each column's bin indexes
+    width = (SCORE_MAX - SCORE_MIN) / bins
+    bin_index = np.clip(
+        ((np.nan_to_num(scores) - SCORE_MIN) // width).astype(np.int64),
+        0,
+        bins - 1,
+    )
+    offsets = np.arange(scores.shape[1]) * bins
+    histograms = np.bincount(
+        (bin_index + offsets)[valid], minlength=bins * scores.shape[1]
+    ).reshape(scores.shape[1], bins)
+
+    stats = {
+        "mean": _optional(mean),
+        "std": _optional(std),
+        "min": _optional(minimum),
+        "p25": _optional(p25),
+        "median": _optional(median),
+        "p75": _optional(p75),
+        "max": _optional(maximum),
+        "iqr": _optional(p75 - p25),
+    }
+    metrics = {
+        field: ScoreSummary(
+            count=int(counts[column]),
+            **{name: values[column] for name, values in stats.items()},
+            histogram=ScoreHistogram(
+                bin_edges=bin_edges,
+                counts=histograms[column].tolist(),
+            ),
+        )
+        for column, field in enumerate(SCORE_FIELDS)
+    }
+
+    z_scores = None
+    if include_z_scores:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (scores - mean) / np.where(std > 0, std, np.nan)
+        z_scores = {
+            field: _optional(z[:, column], 3)
+            for column, field in enumerate(SCORE_FIELDS)
+        }
+
+    return metrics, z_scores
+
+
+def get_score_distribution(
+    cohort_id: int,
+    package_id: int,
+    db: Session,
+    bins: int = 10,
+    include_z_scores: bool = False,
+) -> Optional[ScoreDistribution]:
+    """
+    Score distributions of a cohort for one package, computed from the
+    local cohort_scores table and cached until the group changes.
+
+    Returns:
+        ScoreDistribution, or None if the group has not been materialized
+    """
+    stats: Optional[CohortScoreStats] = db.get(
+        CohortScoreStats, (cohort_id, package_id)
+    )
+    if stats is None:
+        return None
+
+    key = (cohort_id, package_id, bins, include_z_scores)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == stats.version:
+        _cache.move_to_end(key)
+        return cached[1]
+
+    ids, scores = load_group_scores(cohort_id, package_id, db)
+    metrics, z_scores = compute_distribution(
+        ids, scores, bins, include_z_scores
+    )
+    distribution = ScoreDistribution(
+        cohort_id=cohort_id,
+        deployment_package_id=package_id,
+        version=stats.version,
+        total_deployments=len(ids),
+        metrics=metrics,
+        student_deployment_ids=ids.tolist() if include_z_scores else None,
+        z_scores=z_scores,
+    )
+
+    _cache[key] = (stats.version, distribution)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return distribution
@@ -0,0 +1,255 @@
+# src/services/events.py
+"""
+In-process publish/subscribe of video status changes.
+
+The worker that commits a status change publishes it to its own
+subscribers right away. With VIDEO_EVENTS_FANOUT the event is also
+written to the video_events table of the shared local store; every
+worker polls that table and publishes the events of the other workers,
+so a subscriber sees a change whichever worker received the webhook.
+"""
+import asyncio
+import time
+import uuid
+
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from src.database import SessionLocalSQLite
+from src.logging_config import app_logger
+from src.metrics import VIDEO_EVENT_SUBSCRIBERS
+from src.models.video import VideoEventLog
+from src.schema.video import VideoEvent
+from src.services.leases import hand_over, leased
+from src.settings import settings
+
+# Identifies this worker's rows in video_events
+WORKER_ID = uuid.uuid4().hex
+
+# Events buffered per subscriber; a subscriber that falls further behind
+# loses the oldest
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Events re-read on every relay poll, to catch rows committed late
+RELAY_WINDOW_SECONDS = 10
+
+# How often expired events are deleted, by one worker
+PRUNE_INTERVAL_SECONDS = 60
+EVENTS_LEASE = "video_events"
+
+Topic = Tuple[str, object]
+
+
+def _topics(event: VideoEvent) -> Tuple[Topic, ...]:
+    topics: Tuple[Topic, ...] = (("video", event.video_id),)
+    if event.cohort_id is not None:
+        topics += (("cohort", event.cohort_id),)
+    return topics
+
+
+class Subscription:
+    """
+    Events of one topic, registered from creation so nothing published
+    after it is missed. Iterating yields each event, or None after
+    VIDEO_EVENTS_KEEPALIVE_SECONDS without one.
+    """
+
+    def __init__(self, broker: "VideoEventBroker", topic: Topic):
+        self._broker = broker
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+        broker._add(self)
+
+    def put(self, event: VideoEvent):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def __aiter__(self) -> AsyncIterator[Optional[VideoEvent]]:
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        self.queue.get(),
+                        settings.VIDEO_EVENTS_KEEPALIVE_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._broker._remove(self)
+
+
+class VideoEventBroker:
+    """Subscribers of this worker, by topic"""
+
+    def __init__(self):
+        self._subscriptions: Dict[Topic, Set[Subscription]] = {}
+
+    def _add(self, subscription: Subscription):
+        self._subscriptions.setdefault(
+            subscription.topic, set()
+        ).add(subscription)
+        VIDEO_EVENT_SUBSCRIBERS.inc()
+
+    def _remove(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.topic, set())
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            self._subscriptions.pop(subscription.topic, None)
+        VIDEO_EVENT_SUBSCRIBERS.dec()
+
+    def subscribe(
+        self,
+        video_id: Optional[uuid.UUID] = None,
+        cohort_id: Optional[int] = None,
+    ) -> Subscription:
+        """Subscribe to one video or to every video of a cohort"""
+        if video_id is not None:
+            return Subscription(self, ("video", video_id))
+        return Subscription(self, ("cohort", cohort_id))
+
+    def deliver(self, event: VideoEvent):
+        """Hand an event to this worker's subscribers"""
+        for topic in _topics(event):
+            for subscription in self._subscriptions.get(topic, ()):
+                subscription.put(event)
+
+
+# One broker per event loop: its queues belong to that loop
+_brokers: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def get_broker() -> VideoEventBroker:
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        broker = VideoEventBroker()
+        _brokers[loop] = broker
+    return broker
+
+
+def publish(event: VideoEvent, db: Session):
+    """
+    Publish a committed status change to this worker's subscribers and,
+    with VIDEO_EVENTS_FANOUT, to the other workers through the local store
+    """
+    get_broker().deliver(event)
+
+    if settings.VIDEO_EVENTS_FANOUT:
+        db.add(VideoEventLog(
+            origin=WORKER_ID, event=event.model_dump(mode="json")
+        ))
+        db.commit()
+
+
+class EventRelay:
+    """
+    Delivers the events other workers logged to this worker's subscribers.
+
+    Row ids are not committed in order on PostgreSQL: an event can become
+    visible after one with a higher id was read. Every poll therefore
+    re-reads the last RELAY_WINDOW_SECONDS of events as well as any row
+    past the highest id read, and skips the rows already relayed.
+    """
+
+    def __init__(self, db: Session):
+        # Only events published from now on
+        self.after_id = db.execute(
+            select(func.max(VideoEventLog.id))
+        ).scalar() or 0
+        self.relayed: Dict[int, datetime] = {}
+        self.poll(db, deliver=False)
+
+    def poll(self, db: Session, deliver: bool = True) -> int:
+        """
+        Returns:
+            Number of events delivered
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=RELAY_WINDOW_SECONDS)
+        rows = db.execute(
+            select(VideoEventLog)
+            .where(or_(
+                VideoEventLog.id > self.after_id,
+                VideoEventLog.created_on >= cutoff,
+            ))
+            .order_by(VideoEventLog.id)
+        ).scalars().all()
+
+        broker = get_broker()
+        delivered = 0
+        for row in rows:
+            if row.id in self.relayed:
+                continue
+            self.relayed[row.id] = row.created_on
+            self.after_id = max(self.after_id, row.id)
+            if deliver and row.origin != WORKER_ID:
+                broker.deliver(VideoEvent.model_validate(row.event))
+                delivered += 1
+
+        # Rows this old are no longer re-read
+        self.relayed = {
+            row_id: created_on
+            for row_id, created_on in self.relayed.items()
+            if created_on >= cutoff
+        }
+        return delivered
+
+
+def prune_events(db: Session) -> int:
+    """
+    Delete events past their retention
+
+    Returns:
+        Number of events deleted
+    """
+    result = db.execute(delete(VideoEventLog).where(
+        VideoEventLog.created_on < datetime.utcnow() - timedelta(
+            seconds=settings.VIDEO_EVENTS_RETENTION_SECONDS
+        )
+    ))
+    db.commit()
+    return result.rowcount
+
+
+async def run_event_relay(interval: float):
+    """
+    Relay other workers' events every `interval` seconds. Expired events
+    are pruned every PRUNE_INTERVAL_SECONDS by the worker holding the
+    video_events lease.
+    """
+    db = SessionLocalSQLite()
+    try:
+        relay = EventRelay(db)
+    finally:
+        db.close()
+
+    next_prune = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            db = SessionLocalSQLite()
+            try:
+                relay.poll(db)
+                if time.monotonic() >= next_prune:
+                    next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+                    async with leased(
+                        EVENTS_LEASE, PRUNE_INTERVAL_SECONDS
+                    ) as held:
+                        if held:
+                            prune_events(db)
+            except Exception as e:
+                app_logger.error(f"Video event relay failed: {str(e)}")
+            finally:
+                db.close()
+    finally:
+        hand_over(EVENTS_LEASE)
@@ -0,0 +1,129 @@
+# src/services/leases.py
+"""
+Leases that let one of the workers sharing the local store run a
+periodic job, instead of every worker and node running it.
+
+A lease is a row of job_leases naming its holder until an expiry. It is
+taken or renewed with one conditional UPDATE, so concurrent workers never
+both get it on SQLite or PostgreSQL, and a holder that stops renewing it
+loses it once it expires.
+"""
+import asyncio
+import os
+import socket
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.database import SessionLocalSQLite
+from src.logging_config import app_logger
+from src.models.cohort import JobLease
+from src.settings import settings
+
+# Identifies this worker as a lease holder
+HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(name: str, seconds: float, db: Session) -> bool:
+    """
+    Take a lease, or renew it if this worker holds it, for `seconds`.
+
+    Returns:
+        False if another worker holds the lease
+    """
+    now = datetime.utcnow()
+    expires_on = now + timedelta(seconds=seconds)
+    result = db.execute(
+        update(JobLease)
+        .where(
+            JobLease.name == name,
+            or_(JobLease.holder == HOLDER, JobLease.expires_on < now),
+        )
+        .values(holder=HOLDER, expires_on=expires_on)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount == 1:
+        return True
+
+    exists = db.execute(
+        select(JobLease.name).where(JobLease.name == name)
+    ).scalar()
+    if exists:
+        return False
+    # First use of the lease: whoever inserts it first holds it
+    db.add(JobLease(name=name, holder=HOLDER, expires_on=expires_on))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def release_lease(name: str, db: Session):
+    """Let another worker take a lease this worker holds"""
+    db.execute(
+        update(JobLease)
+        .where(JobLease.name == name, JobLease.holder == HOLDER)
+        .values(expires_on=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _in_new_session(fn, *args):
+    db = SessionLocalSQLite()
+    try:
+        return fn(*args, db)
+    finally:
+        db.close()
+
+
+def hand_over(name: str):
+    """
+    Release a lease this worker may hold, e.g. when shutting down, so
+    another worker takes the job over without waiting for the expiry
+    """
+    try:
+        _in_new_session(release_lease, name)
+    except Exception as e:
+        app_logger.error(f"Failed to release the {name} lease: {e}")
+
+
+@asynccontextmanager
+async def leased(name: str, interval: float) -> AsyncIterator[bool]:
+    """
+    Hold the lease of a job run every `interval` seconds for the duration
+    of the block, e.g.
+    `async with leased("cohort_scores", interval) as held: if held: ...`
+
+    The lease is renewed while the block runs and outlasts the next
+    interval, so the holder keeps the job until it stops or hand_over()
+    is called.
+    """
+    seconds = interval + settings.JOB_LEASE_SECONDS
+    if not _in_new_session(acquire_lease, name, seconds):
+        yield False
+        return
+
+    async def renew():
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                if not _in_new_session(acquire_lease, name, seconds):
+                    app_logger.warning(f"Lost the {name} lease")
+                    return
+            except Exception as e:
+                app_logger.error(f"Failed to renew the {name} lease: {e}")
+
+    renewal = asyncio.ensure_future(renew())
+    try:
+        yield True
+    finally:
+        renewal.cancel()
@@ -0,0 +1,119 @@
+# src/services/pipeline.py
+"""
+Run the stages of a job as a dependency graph: every stage starts as soon
+as the stages it requires have finished, so independent work (a remote
+query, an LLM call, an HTTP request) overlaps and the job takes as long
+as its critical path.
+"""
+import asyncio
+import time
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, Sequence
+
+from src.logging_config import app_logger
+from src.metrics import PIPELINE_NODE_SECONDS
+
+
+class Stage:
+    """
+    One node of the graph. `run` is awaited with the results of the
+    required stages as keyword arguments, e.g.
+    `Stage("script", generate, requires=("payload",))`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., Awaitable[Any]],
+        requires: Iterable[str] = (),
+    ):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, requires={self.requires!r})"
+
+
+def _check_graph(stages: Sequence[Stage]):
+    """Reject duplicate names, unknown requirements and cycles"""
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names in {names}")
+
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = set(stage.requires) - set(by_name)
+        if unknown:
+            raise ValueError(
+                f"Stage {stage.name} requires unknown stages {sorted(unknown)}"
+            )
+
+    done: set = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if set(s.requires) <= done]
+        if not ready:
+            raise ValueError(
+                f"Cycle between stages {[s.name for s in remaining]}"
+            )
+        done.update(s.name for s in ready)
+        remaining = [s for s in remaining if s.name not in done]
+
+
+async def run_stages(
+    stages: Sequence[Stage],
+    job: str = "pipeline",
+) -> Dict[str, Any]:
+    """
+    Run a graph of stages concurrently.
+
+    Each stage's wall time is recorded in video_pipeline_node_seconds and
+    the timeline (start and end offsets in ms) is logged at debug level.
+    The first stage to fail cancels the others and its exception is
+    raised.
+
+    Args:
+        stages: The stages, in any order
+        job: Name of the job in the timeline log
+
+    Returns:
+        Result of every stage by name
+    """
+    _check_graph(stages)
+
+    started = time.perf_counter()
+    tasks: Dict[str, asyncio.Task] = {}
+    timeline: Dict[str, tuple] = {}
+
+    async def run(stage: Stage) -> Any:
+        inputs = {
+            name: await tasks[name] for name in stage.requires
+        }
+        start = time.perf_counter()
+        try:
+            return await stage.run(**inputs)
+        finally:
+            end = time.perf_counter()
+            PIPELINE_NODE_SECONDS.observe(end - start, node=stage.name)
+            timeline[stage.name] = (
+                round((start - started) * 1000, 1),
+                round((end - started) * 1000, 1),
+            )
+
+    # Tasks only start running at the next await, once all of them exist
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        # Let cancelled stages unwind before the error propagates
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    finally:
+        app_logger.debug(f"{job} timeline (ms): {timeline}")
+
+    return {name: task.result() for name, task in tasks.items()}
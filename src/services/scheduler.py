@@ -0,0 +1,168 @@
+# src/services/scheduler.py
+"""
+Admission control in front of video and script generation.
+
+At most GENERATION_MAX_CONCURRENCY jobs run at once per process. Waiting
+jobs are granted a slot by lane, interactive before batch before
+speculative, so a one-off regeneration never queues behind a whole
+cohort. Speculative jobs hold at most GENERATION_SPECULATIVE_SLOTS slots.
+
+Within a lane, cohorts share the slots by weighted fair queuing
+(self-clocked: the lane's virtual time is the finish tag of the last job
+granted). Each job is tagged max(virtual time, the cohort's last tag) +
+1 / weight and the smallest tag goes first, so a cohort with 500 queued
+jobs and one with 5 take turns instead of the second waiting for all of
+the first, and a cohort that was idle gets no credit for it.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from src.metrics import GENERATION_QUEUE_DEPTH, GENERATION_QUEUE_WAIT_SECONDS
+from src.schema.video import GenerationLane
+from src.settings import settings
+
+# Lanes in the order they are served
+LANES = [
+    GenerationLane.INTERACTIVE,
+    GenerationLane.BATCH,
+    GenerationLane.SPECULATIVE,
+]
+
+
+class GenerationScheduler:
+    """
+    Grants generation slots by lane and fair share, e.g.
+    `async with scheduler.slot(GenerationLane.BATCH, cohort_id): ...`
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        speculative_slots: int,
+        cohort_weights: Optional[Dict[int, float]] = None,
+    ):
+        self.capacity = capacity
+        self.speculative_slots = speculative_slots
+        self.cohort_weights = cohort_weights or {}
+        self._running = 0
+        self._running_speculative = 0
+        self._order = itertools.count()
+        # Per lane: heap of (finish tag, arrival, waiter)
+        self._queues: Dict[GenerationLane, List[Tuple]] = {
+            lane: [] for lane in LANES
+        }
+        self._waiting: Dict[GenerationLane, int] = {lane: 0 for lane in LANES}
+        self._virtual_time: Dict[GenerationLane, float] = {
+            lane: 0.0 for lane in LANES
+        }
+        self._last_tag: Dict[GenerationLane, Dict[Optional[int], float]] = {
+            lane: {} for lane in LANES
+        }
+
+    def depth(self, lane: GenerationLane) -> int:
+        """Jobs waiting in a lane"""
+        return self._waiting[lane]
+
+    def _set_waiting(self, lane: GenerationLane, change: int):
+        self._waiting[lane] += change
+        GENERATION_QUEUE_DEPTH.set(self._waiting[lane], lane=lane.value)
+
+    def _next_lane(self) -> Optional[GenerationLane]:
+        for lane in LANES:
+            queue = self._queues[lane]
+            # Waiters cancelled while queued are dropped here
+            while queue and queue[0][2].cancelled():
+                heapq.heappop(queue)
+            if not queue:
+                continue
+            if (
+                lane == GenerationLane.SPECULATIVE
+                and self._running_speculative >= self.speculative_slots
+            ):
+                continue
+            return lane
+        return None
+
+    def _dispatch(self):
+        """Grant free slots to the first waiters in lane order"""
+        while self._running < self.capacity:
+            lane = self._next_lane()
+            if lane is None:
+                return
+            tag, _, waiter = heapq.heappop(self._queues[lane])
+            self._virtual_time[lane] = tag
+            if not self._queues[lane]:
+                # Lane drained: every cohort starts level next time
+                self._last_tag[lane].clear()
+            self._running += 1
+            if lane == GenerationLane.SPECULATIVE:
+                self._running_speculative += 1
+            self._set_waiting(lane, -1)
+            waiter.set_result(None)
+
+    async def acquire(self, lane: GenerationLane, cohort_id: Optional[int]):
+        """Wait for a slot; every acquire() must be paired with release()"""
+        weight = self.cohort_weights.get(cohort_id, 1.0)
+        last_tags = self._last_tag[lane]
+        tag = max(
+            self._virtual_time[lane], last_tags.get(cohort_id, 0.0)
+        ) + 1.0 / weight
+        last_tags[cohort_id] = tag
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queues[lane], (tag, next(self._order), waiter))
+        self._set_waiting(lane, 1)
+
+        start = time.perf_counter()
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self._set_waiting(lane, -1)
+            else:
+                # Granted just as the job was cancelled: pass it on
+                self.release(lane)
+            raise
+        GENERATION_QUEUE_WAIT_SECONDS.observe(
+            time.perf_counter() - start, lane=lane.value
+        )
+
+    def release(self, lane: GenerationLane):
+        self._running -= 1
+        if lane == GenerationLane.SPECULATIVE:
+            self._running_speculative -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, lane: GenerationLane, cohort_id: Optional[int]):
+        """Hold a generation slot for the duration of the block"""
+        await self.acquire(lane, cohort_id)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+
+# One scheduler per event loop: its futures belong to that loop
+_schedulers: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def get_scheduler() -> GenerationScheduler:
+    """This process' scheduler, created from the settings on first use"""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = GenerationScheduler(
+            capacity=settings.GENERATION_MAX_CONCURRENCY,
+            speculative_slots=settings.GENERATION_SPECULATIVE_SLOTS,
+            cohort_weights=settings.GENERATION_COHORT_WEIGHTS,
+        )
+        _schedulers[loop] = scheduler
+    return scheduler
@@ -0,0 +1,138 @@
+# src/services/sketch.py
+"""
+KLL quantile sketch (Karnin, Lang and Liberty, "Optimal Quantile
+Approximation in Streams", 2016).
+
+A sketch summarizes any number of values in O(k) space. Items at level h
+stand for 2**h original values; when a level fills up it is sorted and
+every other item is promoted to the next level. Sketches built
+separately merge into a sketch of the combined values with the same
+error guarantee, so per-cohort sketches combine into a per-package one
+without reading the underlying rows again.
+"""
+import math
+import random
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+DEFAULT_K = 200
+
+# Capacity ratio between a level and the one above it
+CAPACITY_RATIO = 2 / 3
+
+
+def normalized_rank_error(k: int) -> float:
+    """
+    A-priori rank error of a KLL sketch as a fraction of the total count,
+    holding with 99% confidence (the estimate used by Apache DataSketches)
+    """
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of a stream of floats"""
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * CAPACITY_RATIO ** depth))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self):
+        """Compact the lowest level over capacity into the one above"""
+        for level, items in enumerate(self.levels):
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+
+            items.sort()
+            # An odd item out stays behind at this level
+            keep = items[:len(items) % 2]
+            pairs = items[len(keep):]
+            offset = self._rng.randint(0, 1)
+            self.levels[level + 1].extend(pairs[offset::2])
+            self.levels[level] = keep
+            return
+
+    def update(self, value: float):
+        self.levels[0].append(float(value))
+        self.n += 1
+        if self._size() >= self._max_size():
+            self._compress()
+
+    def update_many(self, values: Iterable[float]):
+        values = [float(value) for value in values]
+        self.levels[0].extend(values)
+        self.n += len(values)
+        while self._size() >= self._max_size():
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """Add the values summarized by another sketch to this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        while self._size() >= self._max_size():
+            self._compress()
+
+    def rank(self, value: float) -> float:
+        """Estimated number of summarized values <= value"""
+        return float(sum(
+            np.searchsorted(np.sort(items), value, side="right") << level
+            for level, items in enumerate(self.levels)
+            if items
+        ))
+
+    def cdf(self, value: float) -> float:
+        """Estimated fraction of summarized values <= value"""
+        return min(1.0, self.rank(value) / self.n) if self.n else 0.0
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Estimated value at a fraction of the summarized values"""
+        if not self.n:
+            return None
+        values = np.concatenate([
+            np.asarray(items, dtype=float) for items in self.levels
+        ])
+        weights = np.concatenate([
+            np.full(len(items), 1 << level)
+            for level, items in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, fraction * cumulative[-1])
+        return float(values[order][min(position, len(values) - 1)])
+
+    @property
+    def rank_error(self) -> float:
+        """Error bound of cdf(); exact while nothing has been compacted"""
+        return 0.0 if len(self.levels) == 1 else normalized_rank_error(self.k)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "levels": [sorted(items) for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [list(items) for items in data["levels"]] or [[]]
+        return sketch
@@ -1,3 +1,6 @@
+from typing import Dict, Optional
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -9,23 +12,126 @@ class Settings(BaseSettings):
     API_VERSION: str
     DEBUG: bool = False
 
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    # "json" or "text"
+    LOG_FORMAT: str = "json"
+    # Per-logger levels as JSON, e.g. {"httpx": "WARNING"}
+    LOG_LEVELS: Dict[str, str] = {}
+    # Fraction of sampled records kept per sample key, e.g. {"webhook": 0.1}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
     # Databases
+    # Local store: SQLite by default, or e.g. postgresql+psycopg://...
+    # so several app nodes can share one store
     DB_URL: str
     MYSQL_URL: str
+    # Connections to the ITP server across all worker processes
+    MYSQL_MAX_CONNECTIONS: int = 15
+    MYSQL_POOL_TIMEOUT: float = 30.0
+    MYSQL_POOL_RECYCLE: int = 1800
+    # Worker processes per host, as read by uvicorn and gunicorn
+    WEB_CONCURRENCY: int = 1
+    # Connection pool of the local store (not used for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 250.0
+    # Identical statements within one request before warning about N+1
+    REPEATED_QUERY_THRESHOLD: int = 5
+    # "template" fetches only the text columns the prompt and the active
+    # HeyGen template use, "full" fetches every column
+    STUDENT_DEPLOYMENT_PROJECTION: str = "template"
+    # "json" aggregates deployments on the ITP server,
+    # "flat" streams joined rows and nests them in Python
+    STUDENT_DEPLOYMENT_QUERY_STRATEGY: str = "json"
+
+    # Local cohort leaderboard, refreshed from the ITP database.
+    # Set the interval to 0 to disable the periodic refresh.
+    LEADERBOARD_REFRESH_INTERVAL_SECONDS: float = 300.0
+    # Re-read changes this far behind the watermark to catch late commits
+    LEADERBOARD_REFRESH_OVERLAP_SECONDS: int = 300
+    LEADERBOARD_REFRESH_BATCH_SIZE: int = 1000
+    # Periodic jobs over the shared store (the leaderboard refresh, script
+    # pre-generation) run on one worker at a time. If it stops, another
+    # takes over within an interval plus this many seconds.
+    JOB_LEASE_SECONDS: float = 60.0
+    # Accuracy of the score sketches behind package-wide percentiles:
+    # rank error is about 1.3% at 200 and shrinks roughly as 1/k
+    SCORE_SKETCH_K: int = 200
+
+    # SQLite PRAGMAs applied to every new connection of the local
+    # store when it is SQLite. An empty value leaves the SQLite default in place.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = 5000
+    # Bytes of the database file to memory-map
+    SQLITE_MMAP_SIZE: Optional[int] = 256 * 1024 * 1024
+    # Pages per connection, or KiB when negative
+    SQLITE_CACHE_SIZE: Optional[int] = -64 * 1024
+    SQLITE_TEMP_STORE: str = "MEMORY"
 
     # SSH Tunnel
     SSH_HOST: str
     SSH_PORT: int = 22
     SSH_USERNAME: str
     SSH_KEY_PATH: str
+    # Disable to connect to MYSQL_URL directly (e.g. a local ITP copy),
+    # same as SSH_TUNNEL_MODE=disabled
+    SSH_TUNNEL_ENABLED: bool = True
+    # "embedded": each process opens its own tunnel
+    # "external": connect through one shared tunnel (python -m src.tunnel)
+    # "disabled": connect to MYSQL_URL directly
+    SSH_TUNNEL_MODE: str = "embedded"
+    # Where the shared tunnel listens: a Unix socket, else host and port
+    SSH_TUNNEL_SOCKET: Optional[str] = None
+    SSH_TUNNEL_LOCAL_HOST: str = "127.0.0.1"
+    SSH_TUNNEL_LOCAL_PORT: int = 3307
+    SSH_KEEPALIVE: float = 30.0
 
     # OpenAI
     OPENAI_API_KEY: str
+    # LLM calls in flight at once per process
+    LLM_MAX_CONCURRENCY: int = 4
+    # "single" writes every scene in one completion, "per_scene" plans the
+    # scenes with a short outline call and writes them concurrently
+    SCRIPT_GENERATION_MODE: str = "single"
+    SCRIPT_OUTLINE_MAX_TOKENS: int = 800
+    # Video and script generation jobs running at once per process. Queued
+    # jobs run interactive first, then batch, then speculative, and
+    # round-robin across cohorts within a lane, in proportion to the
+    # cohort's weight (1 unless listed, e.g. {"12": 2.0}).
+    GENERATION_MAX_CONCURRENCY: int = 4
+    # Slots speculative jobs may hold, leaving the rest for requests
+    GENERATION_SPECULATIVE_SLOTS: int = 1
+    GENERATION_COHORT_WEIGHTS: Dict[int, float] = {}
+    # Generate scripts ahead of time for deployments graded since the last
+    # poll, in the speculative lane. Off by default as it spends
+    # LLM tokens on videos that may never be requested.
+    SCRIPT_PREGENERATION_INTERVAL_SECONDS: float = 0.0
+
+    # Video status subscriptions. Status changes reach subscribers of the
+    # worker that made them; with fan-out they are also written to the
+    # local store and picked up by every other worker.
+    VIDEO_EVENTS_FANOUT: bool = False
+    VIDEO_EVENTS_POLL_SECONDS: float = 1.0
+    VIDEO_EVENTS_RETENTION_SECONDS: int = 3600
+    # Comment sent on idle streams so proxies keep them open
+    VIDEO_EVENTS_KEEPALIVE_SECONDS: float = 15.0
 
     # HeyGen
     HEYGEN_API_KEY: str
     HEYGEN_TEMPLATE_ID: str
     HEYGEN_WEBHOOK_SECRET: str
+    # Renders HeyGen runs at once for the account (0 for no limit). Videos
+    # past the limit are queued and submitted as completion webhooks come in.
+    HEYGEN_MAX_CONCURRENT_RENDERS: int = 0
+    # A render without a webhook after this long no longer holds capacity
+    HEYGEN_RENDER_TIMEOUT_SECONDS: int = 3600
+    # How often queued videos are checked, in case a webhook was missed
+    HEYGEN_RENDER_QUEUE_POLL_SECONDS: float = 60.0
 
     # Descript
     DESCRIPT_API_KEY: str
@@ -33,5 +139,18 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
+    @field_validator(
+        "SQLITE_BUSY_TIMEOUT_MS",
+        "SQLITE_MMAP_SIZE",
+        "SQLITE_CACHE_SIZE",
+        mode="before",
+    )
+    @classmethod
+    def empty_pragma_as_default(cls, value):
+        """An empty value, e.g. SQLITE_MMAP_SIZE=, keeps the SQLite default"""
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
 
 settings = Settings()
@@ -0,0 +1,85 @@
+# src/tunnel.py
+"""
+SSH tunnel to the ITP MySQL server.
+
+With SSH_TUNNEL_MODE=embedded every process opens its own tunnel. To share
+one tunnel between several workers, run it once per host (or as a sidecar
+container) and start the workers with SSH_TUNNEL_MODE=external:
+
+    python -m src.tunnel
+"""
+import os
+import signal
+import threading
+
+from typing import Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from sshtunnel import SSHTunnelForwarder
+
+from src.logging_config import app_logger
+from src.settings import Settings, settings
+
+# Seconds between checks that the shared tunnel is still forwarding
+HEALTH_CHECK_INTERVAL = 30
+
+
+def mysql_remote_address(mysql_url: str) -> Tuple[str, int]:
+    """The MySQL host and port as seen from the SSH server"""
+    parsed_url = urlparse(mysql_url)
+    return parsed_url.hostname, parsed_url.port or 3306
+
+
+def shared_bind_address(settings: Settings) -> Union[str, Tuple[str, int]]:
+    """Where the shared tunnel listens: a Unix socket path or (host, port)"""
+    if settings.SSH_TUNNEL_SOCKET:
+        return settings.SSH_TUNNEL_SOCKET
+    return settings.SSH_TUNNEL_LOCAL_HOST, settings.SSH_TUNNEL_LOCAL_PORT
+
+
+def create_tunnel(
+    settings: Settings,
+    local_bind_address: Optional[Union[str, Tuple[str, int]]] = None,
+) -> SSHTunnelForwarder:
+    """
+    Build an SSH tunnel to the MySQL server in MYSQL_URL.
+    Without a local bind address the tunnel listens on a random port.
+    """
+    return SSHTunnelForwarder(
+        (settings.SSH_HOST, settings.SSH_PORT),
+        ssh_username=settings.SSH_USERNAME,
+        ssh_pkey=settings.SSH_KEY_PATH,
+        remote_bind_address=mysql_remote_address(settings.MYSQL_URL),
+        local_bind_address=local_bind_address,
+        set_keepalive=settings.SSH_KEEPALIVE,
+    )
+
+
+def main():
+    bind_address = shared_bind_address(settings)
+    if isinstance(bind_address, str) and os.path.exists(bind_address):
+        # Left behind by a previous run
+        os.remove(bind_address)
+
+    tunnel = create_tunnel(settings, bind_address)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    tunnel.start()
+    app_logger.info(f"SSH tunnel to ITP MySQL listening on {bind_address}")
+
+    try:
+        while not stop.wait(HEALTH_CHECK_INTERVAL):
+            tunnel.check_tunnels()
+            if not tunnel.is_active or not all(tunnel.tunnel_is_up.values()):
+                app_logger.warning("SSH tunnel is down, restarting")
+                tunnel.restart()
+    finally:
+        tunnel.stop()
+        app_logger.info("SSH tunnel stopped")
+
+
+if __name__ == "__main__":
+    main()